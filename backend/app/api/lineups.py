@@ -1,9 +1,18 @@
 from typing import Optional
 
-from app.core.dependencies import get_db, login_required
-from app.exceptions.base import ResourceNotFound, ValidationError
-from app.schemas import ErrorResponse, LineupCreate
+from app.core.dependencies import get_db, get_pagination_params, login_required
+from app.exceptions.base import PermissionDenied, ResourceNotFound, ValidationError
+from app.schemas import (
+    ErrorResponse,
+    LineupBulkCreate,
+    LineupCompletionRequest,
+    LineupCreate,
+    LineupSimulationRequest,
+)
 from app.services.lineup_service import LineupService
+from app.services.scoring_service import ScoringService
+from app.services.simulation_service import SimulationService
+from app.utils.pagination import PaginationError
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
@@ -26,7 +35,7 @@ async def create_lineup(
         starting_players = [p.model_dump() for p in data.starting_players]
         bench_players = [p.model_dump() for p in data.bench_players]
 
-        new_lineup = LineupService.create_lineup(
+        new_lineup = await LineupService.create_lineup_queued(
             db,
             user_id=user_id,
             name=name,
@@ -35,7 +44,43 @@ async def create_lineup(
             bench_players=bench_players,
         )
 
-        return {"message": "阵容创建成功", "lineup": new_lineup.to_dict()}
+        return {"message": "阵容创建成功", "lineup": new_lineup}
+
+    except ValidationError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+
+@router.post(
+    "/bulk",
+    response_model=dict,
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+async def create_lineups_bulk(
+    data: LineupBulkCreate,
+    user_id: int = Depends(login_required),
+    db: Session = Depends(get_db),
+):
+    try:
+        lineups = LineupService.create_lineups_bulk(
+            db,
+            user_id=user_id,
+            lineups=[lineup.model_dump() for lineup in data.lineups],
+        )
+        return {
+            "message": "阵容批量创建成功",
+            "count": len(lineups),
+            "lineups": lineups,
+        }
 
     except ValidationError as e:
         db.rollback()
@@ -51,24 +96,135 @@ async def create_lineup(
         )
 
 
+@router.post(
+    "/validate",
+    response_model=dict,
+    responses={500: {"model": ErrorResponse}},
+)
+async def validate_lineups(
+    data: LineupBulkCreate,
+    user_id: int = Depends(login_required),
+    db: Session = Depends(get_db),
+):
+    try:
+        results = LineupService.validate_lineups(
+            db, [lineup.model_dump() for lineup in data.lineups]
+        )
+        return {
+            "results": results,
+            "valid_count": sum(1 for result in results if result["valid"]),
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+
 @router.get(
     "/by-date",
     response_model=dict,
     responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
 )
 async def get_lineups_by_date(
+    date: str = Query(..., description="日期"),
+    user_id: Optional[int] = Query(None, description="用户ID"),
+    min_salary: Optional[int] = Query(None, ge=0, description="最低总薪资"),
+    mine_only: bool = Query(False, description="只看我的阵容"),
+    sort_by: str = Query(
+        "created_at",
+        pattern="^(created_at|total_salary|actual_score)$",
+        description="排序字段",
+    ),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="排序顺序"),
+    pagination: dict = Depends(get_pagination_params),
+    current_user_id: int = Depends(login_required),
+    db: Session = Depends(get_db),
+):
+    try:
+        return LineupService.get_lineups_by_date(
+            db,
+            date,
+            current_user_id,
+            page=pagination["page"],
+            per_page=pagination["per_page"],
+            user_id=user_id,
+            min_salary=min_salary,
+            mine_only=mine_only,
+            sort_by=sort_by,
+            sort_order=sort_order,
+        )
+    except (ValidationError, PaginationError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+
+@router.get(
+    "/mine",
+    response_model=dict,
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+async def get_my_lineups(
+    date_from: Optional[str] = Query(None, description="起始日期"),
+    date_to: Optional[str] = Query(None, description="结束日期"),
+    pagination: dict = Depends(get_pagination_params),
+    current_user_id: int = Depends(login_required),
+    db: Session = Depends(get_db),
+):
+    try:
+        return LineupService.get_user_lineups(
+            db,
+            current_user_id,
+            page=pagination["page"],
+            per_page=pagination["per_page"],
+            date_from=date_from,
+            date_to=date_to,
+        )
+    except (ValidationError, PaginationError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+
+@router.get(
+    "/ownership",
+    response_model=dict,
+    responses={
+        400: {"model": ErrorResponse},
+        403: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+)
+async def get_lineup_ownership(
     date: str = Query(..., description="日期"),
     current_user_id: int = Depends(login_required),
     db: Session = Depends(get_db),
 ):
     try:
-        lineups = LineupService.get_lineups_by_date(db, date, current_user_id)
-        return {"lineups": lineups}
+        return LineupService.get_ownership(db, date, current_user_id)
     except ValidationError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e),
         )
+    except PermissionDenied as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e),
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -83,11 +239,17 @@ async def get_lineups_by_date(
 )
 async def get_best_lineup_endpoint(
     date: Optional[str] = None,
+    risk: Optional[float] = Query(
+        None,
+        ge=-1,
+        le=1,
+        description="风险系数，正数偏好稳定，负数偏好上限，不传则使用当日实际评分",
+    ),
     user_id: int = Depends(login_required),
     db: Session = Depends(get_db),
 ):
     try:
-        formatted_lineup = LineupService.get_best_lineup(db, date)
+        formatted_lineup = LineupService.get_best_lineup(db, date, risk)
         return {"message": "获取今日最佳阵容成功", "best_lineup": formatted_lineup}
     except ResourceNotFound as e:
         raise HTTPException(
@@ -99,3 +261,188 @@ async def get_best_lineup_endpoint(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e),
         )
+
+
+@router.get(
+    "/best/sensitivity",
+    response_model=dict,
+    responses={404: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+def get_best_lineup_sensitivity(
+    date: Optional[str] = None,
+    near_miss_limit: int = Query(10, ge=0, le=50, description="分析的落选球员数量"),
+    user_id: int = Depends(login_required),
+    db: Session = Depends(get_db),
+):
+    try:
+        report = LineupService.get_best_lineup_sensitivity(db, date, near_miss_limit)
+        return {"message": "获取最佳阵容敏感度分析成功", **report}
+    except ResourceNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+
+@router.post(
+    "/complete",
+    response_model=dict,
+    responses={
+        400: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+)
+async def complete_lineup(
+    data: LineupCompletionRequest,
+    user_id: int = Depends(login_required),
+    db: Session = Depends(get_db),
+):
+    try:
+        lineup, metrics = LineupService.complete_lineup(
+            db,
+            date=data.date,
+            locked_starters=data.locked_starters,
+            locked_bench=data.locked_bench,
+            excluded_player_ids=data.excluded_player_ids,
+        )
+        return {"message": "阵容补全成功", "lineup": lineup, "metrics": metrics}
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except ResourceNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+
+@router.post(
+    "/simulate",
+    response_model=dict,
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+async def simulate_lineup(
+    data: LineupSimulationRequest,
+    user_id: int = Depends(login_required),
+    db: Session = Depends(get_db),
+):
+    try:
+        opponent = None
+        if data.opponent is not None:
+            opponent = (data.opponent.starter_ids, data.opponent.bench_ids)
+
+        result = SimulationService.simulate_lineup(
+            db,
+            starter_ids=data.lineup.starter_ids,
+            bench_ids=data.lineup.bench_ids,
+            opponent=opponent,
+            date_str=data.date,
+            trials=data.trials,
+            seed=data.seed,
+        )
+        return result
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+
+@router.get(
+    "/simulate/by-date",
+    response_model=dict,
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+async def simulate_lineups_by_date(
+    date: str = Query(..., description="日期"),
+    trials: int = Query(10000, ge=100, le=20000, description="试验次数"),
+    seed: Optional[int] = Query(None, description="随机种子"),
+    current_user_id: int = Depends(login_required),
+    db: Session = Depends(get_db),
+):
+    try:
+        lineups = SimulationService.simulate_lineups_by_date(
+            db, date, current_user_id, trials=trials, seed=seed
+        )
+        return {"lineups": lineups, "trials": trials}
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+
+@router.get(
+    "/most-missed",
+    response_model=dict,
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+async def get_most_missed_players(
+    date_from: Optional[str] = Query(None, description="起始日期"),
+    date_to: Optional[str] = Query(None, description="结束日期"),
+    limit: int = Query(20, ge=1, le=100, description="返回数量"),
+    db: Session = Depends(get_db),
+):
+    try:
+        players = ScoringService.get_most_missed_players(
+            db, date_from=date_from, date_to=date_to, limit=limit
+        )
+        return {"players": players}
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+
+@router.get(
+    "/standings",
+    response_model=dict,
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+async def get_standings(
+    pagination: dict = Depends(get_pagination_params),
+    db: Session = Depends(get_db),
+):
+    try:
+        return ScoringService.get_standings(
+            db, page=pagination["page"], per_page=pagination["per_page"]
+        )
+    except PaginationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
@@ -4,27 +4,66 @@ from app.core.dependencies import get_db, get_pagination_params
 from app.exceptions.base import ValidationError
 from app.schemas import ErrorResponse
 from app.services.player_service import PlayerService
-from app.utils.pagination import paginate
+from app.services.search_service import SearchService
+from app.utils.pagination import PaginationError
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 router = APIRouter()
 
 
-@router.get("/list-players")
+@router.get(
+    "/list-players",
+    response_model=dict,
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
 async def get_players(
     salary_min: int = Query(0, ge=0, description="最低薪资"),
     salary_max: int = Query(60000000, ge=0, description="最高薪资"),
     teams: Optional[List[str]] = Query(None, description="球队列表"),
+    sort_by: str = Query(
+        "salary", pattern="^(salary|name|rating)$", description="排序字段"
+    ),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="排序顺序"),
     pagination: dict = Depends(get_pagination_params),
     db: Session = Depends(get_db),
 ):
     try:
-        players = PlayerService.get_players(
-            db, salary_min=salary_min, salary_max=salary_max, teams=teams
+        return PlayerService.get_players(
+            db,
+            salary_min=salary_min,
+            salary_max=salary_max,
+            teams=teams,
+            page=pagination["page"],
+            per_page=pagination["per_page"],
+            sort_by=sort_by,
+            sort_order=sort_order,
         )
+    except (ValidationError, PaginationError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
 
-        return paginate(players, pagination["page"], pagination["per_page"], "players")
+@router.get(
+    "/players/search",
+    response_model=dict,
+    responses={500: {"model": ErrorResponse}},
+)
+async def search_players(
+    q: str = Query(..., min_length=1, max_length=100, description="查询文本"),
+    limit: int = Query(10, ge=1, le=50, description="返回数量"),
+    db: Session = Depends(get_db),
+):
+    try:
+        players = SearchService.search_players(db, q, limit)
+        return {"query": q, "players": players}
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,9 +1,30 @@
 from app.schemas import ErrorResponse, SalaryCapResponse
+from app.services.rule_engine import get_rule_plan
 from fastapi import APIRouter, HTTPException, status
 
 router = APIRouter()
 
-SALARY_CAP = 187895000
+
+@router.get(
+    "/",
+    response_model=dict,
+    responses={500: {"model": ErrorResponse}},
+)
+async def get_rules():
+    try:
+        plan = get_rule_plan()
+        return {
+            "rules": plan.to_dict(),
+            "salary_cap": plan.salary_cap,
+            "starter_slots": plan.starter_slots,
+            "bench_size": plan.bench_size,
+            "max_per_team": plan.max_per_team,
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
 
 
 @router.get(
@@ -13,7 +34,7 @@ SALARY_CAP = 187895000
 )
 async def get_salary_cap():
     try:
-        return SalaryCapResponse(salary_cap=SALARY_CAP)
+        return SalaryCapResponse(salary_cap=get_rule_plan().salary_cap)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
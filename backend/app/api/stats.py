@@ -17,12 +17,27 @@ async def get_player_average_stats_leaderboard(
     sort_order: str = Query("desc", description="排序顺序"),
     sort_by: str = Query("rating", description="排序字段"),
     teams: List[str] = Query(None, description="球队列表"),
+    window: Optional[int] = Query(None, ge=1, le=100, description="最近场次"),
+    date_from: Optional[str] = Query(None, alias="from", description="起始日期"),
+    date_to: Optional[str] = Query(None, alias="to", description="结束日期"),
+    per: str = Query("game", pattern="^(game|36min)$", description="统计口径"),
+    min_games: Optional[int] = Query(None, ge=1, description="最少场次"),
+    min_minutes: Optional[int] = Query(None, ge=1, description="最少总上场分钟"),
     pagination: dict = Depends(get_pagination_params),
     db: Session = Depends(get_db),
 ):
     try:
         players_with_score = StatsService.get_player_average_stats_leaderboard(
-            db, sort_order=sort_order, sort_by=sort_by, teams=teams
+            db,
+            sort_order=sort_order,
+            sort_by=sort_by,
+            teams=teams,
+            window=window,
+            date_from=date_from,
+            date_to=date_to,
+            per=per,
+            min_games=min_games,
+            min_minutes=min_minutes,
         )
 
         return paginate_with_metadata(
@@ -31,6 +46,11 @@ async def get_player_average_stats_leaderboard(
             pagination["per_page"],
             "players",
         )
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -89,15 +109,70 @@ async def get_player_game_stats_by_id(player_id: int, db: Session = Depends(get_
         )
 
 
+@router.get(
+    "/player/{player_id}/game-log",
+    response_model=dict,
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+async def get_player_game_log(
+    player_id: int,
+    date_from: Optional[str] = Query(None, alias="from", description="起始日期"),
+    date_to: Optional[str] = Query(None, alias="to", description="结束日期"),
+    limit: int = Query(20, ge=1, le=200, description="每页场次"),
+    cursor: Optional[str] = Query(None, description="分页游标"),
+    fields: Optional[List[str]] = Query(None, description="返回的列"),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="排序顺序"),
+    db: Session = Depends(get_db),
+):
+    try:
+        return StatsService.get_player_game_log(
+            db,
+            player_id,
+            date_from=date_from,
+            date_to=date_to,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+            sort_order=sort_order,
+        )
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+
 @router.get(
     "/player/{player_id}/average-stats",
     response_model=dict,
-    responses={404: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+    responses={
+        400: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
 )
-async def get_player_average_stats(player_id: int, db: Session = Depends(get_db)):
+async def get_player_average_stats(
+    player_id: int,
+    window: Optional[int] = Query(None, ge=1, le=100, description="最近场次"),
+    date_from: Optional[str] = Query(None, alias="from", description="起始日期"),
+    date_to: Optional[str] = Query(None, alias="to", description="结束日期"),
+    db: Session = Depends(get_db),
+):
     try:
-        average_stats = StatsService.get_player_average_stats(db, player_id)
+        average_stats = StatsService.get_player_average_stats(
+            db, player_id, window=window, date_from=date_from, date_to=date_to
+        )
         return average_stats
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     except ResourceNotFound as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -110,6 +185,62 @@ async def get_player_average_stats(player_id: int, db: Session = Depends(get_db)
         )
 
 
+@router.get(
+    "/players/average-stats",
+    response_model=dict,
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+async def get_players_average_stats(
+    player_ids: Optional[List[int]] = Query(None, description="球员ID列表"),
+    window: Optional[int] = Query(None, ge=1, le=100, description="最近场次"),
+    date_from: Optional[str] = Query(None, alias="from", description="起始日期"),
+    date_to: Optional[str] = Query(None, alias="to", description="结束日期"),
+    db: Session = Depends(get_db),
+):
+    try:
+        return StatsService.get_players_average_stats(
+            db,
+            player_ids or [],
+            window=window,
+            date_from=date_from,
+            date_to=date_to,
+        )
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+
+@router.get(
+    "/value-frontier",
+    response_model=dict,
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+async def get_salary_frontier(
+    game_date: Optional[str] = Query(None, description="比赛日期，为空时使用赛季平均"),
+    frontier_only: bool = Query(False, description="只返回前沿上的球员"),
+    db: Session = Depends(get_db),
+):
+    try:
+        return StatsService.get_salary_frontier(db, game_date, frontier_only)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+
 @router.get(
     "/value-for-money",
     response_model=dict,
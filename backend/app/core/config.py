@@ -33,5 +33,7 @@ class Settings:
         )
         self.database_url = f"sqlite:///{db_path}"
 
+        self.lineup_rules_file = os.getenv("LINEUP_RULES_FILE", "")
+
 
 settings = Settings()
@@ -1,9 +1,19 @@
 from app.core.config import settings
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
 
+
+@event.listens_for(engine, "connect")
+def _configure_sqlite(dbapi_connection, connection_record):
+    """开启WAL使读请求不阻塞写入，并在锁冲突时等待而不是立即报错"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -11,3 +21,56 @@ Base = declarative_base()
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    _create_missing_indexes()
+    _create_version_triggers()
+
+
+def _add_missing_columns():
+    """为已存在的表补加模型中新增的可空列"""
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(
+                    text(
+                        f'ALTER TABLE "{table.name}" '
+                        f'ADD COLUMN "{column.name}" {column_type}'
+                    )
+                )
+
+
+def _create_missing_indexes():
+    """为已存在的表补建模型中新增的索引"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def _create_version_triggers(bind=None):
+    """
+    为标记为 versioned 的表创建触发器，数据变化时递增 data_versions 中的版本号
+
+    Args:
+        bind: 目标数据库引擎，默认为应用的引擎
+    """
+    with (bind or engine).begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not table.info.get("versioned"):
+                continue
+            for operation in ("INSERT", "UPDATE", "DELETE"):
+                connection.execute(
+                    text(
+                        f'CREATE TRIGGER IF NOT EXISTS "{table.name}_version_'
+                        f'{operation.lower()}" AFTER {operation} ON "{table.name}" '
+                        "BEGIN "
+                        "INSERT INTO data_versions (table_name, version) "
+                        f"VALUES ('{table.name}', 1) "
+                        "ON CONFLICT (table_name) DO UPDATE SET version = version + 1; "
+                        "END"
+                    )
+                )
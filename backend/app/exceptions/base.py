@@ -39,3 +39,10 @@ class ConflictError(ScoutsLensException):
 
     status_code = 409
     detail = "Conflict"
+
+
+class PermissionDenied(ScoutsLensException):
+    """权限不足异常"""
+
+    status_code = 403
+    detail = "Permission denied"
@@ -1,12 +1,23 @@
+from app.models.consistency import PlayerConsistency
+from app.models.data_version import DataVersion
 from app.models.game_stats import PlayerGameStats
 from app.models.lineup import Lineup, LineupPlayer
 from app.models.player import PlayerInformation
+from app.models.scoring import DailyOptimalScore, PlayerMissedValue
+from app.models.standing import UserStanding
+from app.models.team import Team
 from app.models.user import User
 
 __all__ = [
     "User",
     "PlayerInformation",
+    "Team",
     "Lineup",
     "LineupPlayer",
     "PlayerGameStats",
+    "UserStanding",
+    "DailyOptimalScore",
+    "PlayerMissedValue",
+    "PlayerConsistency",
+    "DataVersion",
 ]
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from app.db.session import Base
+from sqlalchemy import Column, DateTime, Float, Integer
+
+
+class PlayerConsistency(Base):
+    """球员单场评分稳定性模型"""
+
+    __tablename__ = "player_consistency"
+
+    player_id = Column(Integer, primary_key=True)
+    games = Column(Integer, nullable=False)
+    rating_mean = Column(Float, nullable=False)
+    rating_std = Column(Float, nullable=False)
+    rating_p10 = Column(Float, nullable=False)
+    rating_p90 = Column(Float, nullable=False)
+    boom_rate = Column(Float, nullable=False)
+    bust_rate = Column(Float, nullable=False)
+    computed_at = Column(DateTime, default=lambda: datetime.utcnow())
+
+    def to_dict(self):
+        return {
+            "player_id": self.player_id,
+            "games": self.games,
+            "rating_mean": round(self.rating_mean, 2),
+            "rating_std": round(self.rating_std, 2),
+            "rating_p10": round(self.rating_p10, 2),
+            "rating_p90": round(self.rating_p90, 2),
+            "boom_rate": round(self.boom_rate, 4),
+            "bust_rate": round(self.bust_rate, 4),
+            "computed_at": self.computed_at.isoformat() if self.computed_at else None,
+        }
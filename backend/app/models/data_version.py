@@ -0,0 +1,16 @@
+from app.db.session import Base
+from sqlalchemy import Column, Integer, String
+
+
+class DataVersion(Base):
+    """
+    表数据版本模型
+
+    标记为 versioned 的表在 init_db 时创建触发器，任何插入、更新或删除
+    都会递增该表对应行的版本号，进程内缓存据此识别原地修改。
+    """
+
+    __tablename__ = "data_versions"
+
+    table_name = Column(String(255), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -1,11 +1,15 @@
 from app.db.session import Base
-from sqlalchemy import Boolean, Column, Date, Integer, String
+from sqlalchemy import Boolean, Column, Date, Index, Integer, String
 
 
 class PlayerGameStats(Base):
     """球员比赛数据模型"""
 
     __tablename__ = "player_game_stats"
+    __table_args__ = (
+        Index("ix_player_game_stats_person_id_game_date", "personId", "game_date"),
+        {"info": {"versioned": True}},
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     personId = Column(Integer, nullable=False)
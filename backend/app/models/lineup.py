@@ -1,7 +1,17 @@
 from datetime import datetime
 
 from app.db.session import Base
-from sqlalchemy import Boolean, Column, Date, DateTime, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
 from sqlalchemy.orm import relationship
 
 
@@ -16,12 +26,26 @@ class Lineup(Base):
     date = Column(Date, nullable=False)
     total_salary = Column(Integer, nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.utcnow())
+    actual_score = Column(Float, nullable=True)
+    rank = Column(Integer, nullable=True)
+    gap_to_optimal = Column(Float, nullable=True)
+    roster_fingerprint = Column(String(40), nullable=True)
+    player_set_fingerprint = Column(String(40), nullable=True)
 
     players = relationship(
         "LineupPlayer", backref="lineup", cascade="all, delete-orphan"
     )
 
-    def to_dict(self):
+    __table_args__ = (
+        Index("ix_lineups_date_created_at", "date", "created_at"),
+        Index("ix_lineups_user_id_date", "user_id", "date"),
+        Index("ix_lineups_date_roster_fingerprint", "date", "roster_fingerprint"),
+        Index(
+            "ix_lineups_date_player_set_fingerprint", "date", "player_set_fingerprint"
+        ),
+    )
+
+    def to_dict(self, include_players: bool = True):
         return {
             "id": self.id,
             "user_id": self.user_id,
@@ -29,7 +53,12 @@ class Lineup(Base):
             "date": self.date.isoformat() if self.date else None,
             "total_salary": self.total_salary,
             "created_at": self.created_at.isoformat() if self.created_at else None,
-            "players": [player.to_dict() for player in self.players],
+            "actual_score": self.actual_score,
+            "rank": self.rank,
+            "gap_to_optimal": self.gap_to_optimal,
+            "players": (
+                [player.to_dict() for player in self.players] if include_players else []
+            ),
         }
 
 
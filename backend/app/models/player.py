@@ -6,13 +6,14 @@ class PlayerInformation(Base):
     """球员信息模型"""
 
     __tablename__ = "player_information"
+    __table_args__ = {"info": {"versioned": True}}
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     player_id = Column(Integer, nullable=False)
     full_name = Column(String(255), nullable=False)
-    team_name = Column(String(255), nullable=False)
+    team_name = Column(String(255), nullable=False, index=True)
     position = Column(String(10), nullable=False)
-    salary = Column(Integer, nullable=False)
+    salary = Column(Integer, nullable=False, index=True)
 
     def to_dict(self):
         return {
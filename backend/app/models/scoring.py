@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from app.db.session import Base
+from sqlalchemy import Column, Date, DateTime, Float, Integer, String
+
+
+class DailyOptimalScore(Base):
+    """每日最佳阵容得分模型"""
+
+    __tablename__ = "daily_optimal_scores"
+
+    date = Column(Date, primary_key=True)
+    optimal_score = Column(Float, nullable=False)
+    total_salary = Column(Integer, nullable=False)
+    computed_at = Column(DateTime, default=lambda: datetime.utcnow())
+
+    def to_dict(self):
+        return {
+            "date": self.date.isoformat() if self.date else None,
+            "optimal_score": round(self.optimal_score, 2),
+            "total_salary": self.total_salary,
+            "computed_at": self.computed_at.isoformat() if self.computed_at else None,
+        }
+
+
+class PlayerMissedValue(Base):
+    """最佳阵容球员的错失价值模型"""
+
+    __tablename__ = "player_missed_values"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(Date, nullable=False, index=True)
+    player_id = Column(Integer, nullable=False, index=True)
+    full_name = Column(String(255), nullable=False)
+    role = Column(String(10), nullable=False)
+    rating = Column(Float, nullable=False)
+    value = Column(Float, nullable=False)
+    lineups_missed = Column(Integer, nullable=False)
+    missed_value = Column(Float, nullable=False)
+
+    def to_dict(self):
+        return {
+            "date": self.date.isoformat() if self.date else None,
+            "player_id": self.player_id,
+            "full_name": self.full_name,
+            "role": self.role,
+            "rating": round(self.rating, 2),
+            "value": round(self.value, 2),
+            "lineups_missed": self.lineups_missed,
+            "missed_value": round(self.missed_value, 2),
+        }
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from app.db.session import Base
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer
+
+
+class UserStanding(Base):
+    """用户累计积分榜模型"""
+
+    __tablename__ = "user_standings"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    lineups_scored = Column(Integer, nullable=False, default=0)
+    total_score = Column(Float, nullable=False, default=0.0)
+    wins = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=lambda: datetime.utcnow())
+
+    def to_dict(self):
+        return {
+            "user_id": self.user_id,
+            "lineups_scored": self.lineups_scored,
+            "total_score": round(self.total_score, 2),
+            "average_score": (
+                round(self.total_score / self.lineups_scored, 2)
+                if self.lineups_scored
+                else 0.0
+            ),
+            "wins": self.wins,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
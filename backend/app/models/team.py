@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from app.db.session import Base
+from sqlalchemy import Column, DateTime, Integer, String
+
+
+class Team(Base):
+    """球队模型，ID一经分配不再变化"""
+
+    __tablename__ = "teams"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    team_name = Column(String(255), unique=True, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.utcnow())
+
+    def to_dict(self):
+        return {"team_id": self.id, "team_name": self.team_name}
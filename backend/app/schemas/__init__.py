@@ -6,10 +6,14 @@ from app.schemas.common import (
     TeamResponse,
 )
 from app.schemas.lineup import (
+    LineupBulkCreate,
+    LineupCompletionRequest,
     LineupCreate,
     LineupPlayerCreate,
     LineupPlayerResponse,
     LineupResponse,
+    LineupSimulationRequest,
+    SimulatedLineup,
 )
 from app.schemas.player import PlayerInfo
 from app.schemas.stats import (
@@ -30,8 +34,12 @@ __all__ = [
     "PlayerInfo",
     "LineupPlayerCreate",
     "LineupCreate",
+    "LineupBulkCreate",
+    "LineupCompletionRequest",
     "LineupPlayerResponse",
     "LineupResponse",
+    "SimulatedLineup",
+    "LineupSimulationRequest",
     "TeamResponse",
     "Pagination",
     "PaginatedResponse",
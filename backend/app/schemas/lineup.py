@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -23,6 +23,38 @@ class LineupCreate(BaseModel):
     bench_players: List[LineupPlayerCreate] = Field(default_factory=list)
 
 
+class LineupBulkCreate(BaseModel):
+    """阵容批量创建请求"""
+
+    lineups: List[LineupCreate] = Field(..., min_length=1, max_length=500)
+
+
+class LineupCompletionRequest(BaseModel):
+    """阵容补全请求"""
+
+    date: str
+    locked_starters: Dict[str, int] = Field(default_factory=dict)
+    locked_bench: List[int] = Field(default_factory=list)
+    excluded_player_ids: List[int] = Field(default_factory=list)
+
+
+class SimulatedLineup(BaseModel):
+    """模拟阵容"""
+
+    starter_ids: List[int] = Field(default_factory=list)
+    bench_ids: List[int] = Field(default_factory=list)
+
+
+class LineupSimulationRequest(BaseModel):
+    """阵容模拟请求"""
+
+    lineup: SimulatedLineup
+    opponent: Optional[SimulatedLineup] = None
+    date: Optional[str] = None
+    trials: int = Field(20000, ge=100, le=100000)
+    seed: Optional[int] = None
+
+
 class LineupPlayerResponse(BaseModel):
     """阵容球员响应"""
 
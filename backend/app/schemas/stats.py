@@ -76,6 +76,6 @@ class ValueForMoneyPlayer(BaseModel):
 
 
 class SalaryCapResponse(BaseModel):
-    """薪资帽响应"""
+    """薪资帽响应，规则中没有薪资限制时 salary_cap 为 None"""
 
-    salary_cap: int
+    salary_cap: Optional[int] = None
@@ -1,55 +1,157 @@
+import asyncio
+import hashlib
 import time
-from abc import ABC, abstractmethod
 from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 
 from app.core.logger import logger
-from app.models import Lineup, LineupPlayer, User
-from app.services.optimization_service import get_best_lineup
-from sqlalchemy.orm import Session
-
-
-class Rule(ABC):
-    """规则基类"""
-
-    def __init__(self, description: str):
-        self.description = description
-
-    @abstractmethod
-    def verify(self, starting_players: list, bench_players: list) -> bool:
-        pass
-
+from app.models import (
+    DailyOptimalScore,
+    Lineup,
+    LineupPlayer,
+    PlayerGameStats,
+    User,
+)
+from app.services.optimization_service import (
+    get_best_lineup,
+    get_completed_lineup,
+    get_lineup_sensitivity,
+    get_risk_adjusted_lineup,
+    sensitivity_cache,
+)
+from app.services.player_cache import player_directory
+from app.services.rule_engine import get_rule_plan
+from app.services.stats_service import game_score_expression
+from app.services.write_queue import lineup_write_queue
+from app.utils.pagination import paginate_query
+from sqlalchemy import (
+    and_,
+    case,
+    func,
+    insert,
+    literal,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.orm import Session, selectinload
+
+
+def roster_fingerprints(starting_players: list, bench_players: list) -> Tuple[str, str]:
+    """
+    计算阵容指纹
+
+    精确指纹由排序后的"球员ID:位置"生成，替补位置记为BENCH；球员集合指纹只由
+    排序后的球员ID生成，用于发现首发位置不同但球员相同的近似重复阵容。
+
+    Args:
+        starting_players: 首发球员列表
+        bench_players: 替补球员列表
+
+    Returns:
+        (精确指纹, 球员集合指纹)
+    """
+    entries = [(p.get("player_id"), p.get("slot")) for p in starting_players]
+    entries += [(p.get("player_id"), "BENCH") for p in bench_players]
+    roster = ",".join(f"{pid}:{slot}" for pid, slot in sorted(entries, key=str))
+    player_set = ",".join(str(pid) for pid in sorted(pid for pid, _ in entries))
+    return (
+        hashlib.sha1(roster.encode()).hexdigest(),
+        hashlib.sha1(player_set.encode()).hexdigest(),
+    )
+
+
+class LineupValidator:
+    """
+    基于数据库中球员信息的阵容验证器
+
+    从球员缓存中取出所有待验证阵容涉及的球员，之后用数据库中的薪资、位置、
+    姓名和球队替换客户端提交的值，再执行规则验证。
+    """
+
+    def __init__(self, players: Dict[int, Dict]):
+        self.players = players
+
+    @classmethod
+    def load(cls, db: Session, lineups: List[Tuple[list, list]]) -> "LineupValidator":
+        """
+        从球员缓存中取出多个阵容中全部球员的权威数据
 
-class SalaryRule(Rule):
-    """薪资规则"""
+        Args:
+            db: 数据库会话
+            lineups: (首发球员, 替补球员)列表
 
-    def __init__(self, max_salary: int):
-        super().__init__("薪资限制")
-        self.max_salary = max_salary
+        Returns:
+            阵容验证器
+        """
+        player_ids = {
+            p.get("player_id")
+            for starting_players, bench_players in lineups
+            for p in starting_players + bench_players
+        }
+        players = {
+            player_id: {
+                "player_id": record.player_id,
+                "full_name": record.full_name,
+                "team_name": record.team_name,
+                "position": record.position,
+                "salary": record.salary,
+            }
+            for player_id, record in player_directory.get(db)
+            .get_many(player_ids)
+            .items()
+        }
+        return cls(players)
 
-    def verify(self, starting_players: list, bench_players: list) -> bool:
-        total_salary = sum(p.get("salary", 0) for p in starting_players + bench_players)
-        return total_salary <= self.max_salary
+    def resolve(self, starting_players: list, bench_players: list) -> Tuple[list, list]:
+        """
+        用权威数据替换客户端提交的球员信息，只保留客户端的首发位置
 
+        Args:
+            starting_players: 首发球员列表
+            bench_players: 替补球员列表
 
-class PlayerCountRule(Rule):
-    """球员数量规则"""
+        Returns:
+            (首发球员, 替补球员)
 
-    def __init__(self, starting_player_count: int, bench_player_count: int):
-        super().__init__("球员数量限制")
-        self.starting_player_count = starting_player_count
-        self.bench_player_count = bench_player_count
+        Raises:
+            ValidationError: 存在未知球员
+        """
+        from app.exceptions.base import ValidationError
+
+        resolved = []
+        for players, is_starting in ((starting_players, True), (bench_players, False)):
+            group = []
+            for player in players:
+                info = self.players.get(player.get("player_id"))
+                if info is None:
+                    raise ValidationError(f"球员不存在: {player.get('player_id')}")
+                group.append(
+                    {**info, "slot": player.get("slot") if is_starting else None}
+                )
+            resolved.append(group)
+        return resolved[0], resolved[1]
+
+    def validate(self, starting_players: list, bench_players: list) -> Tuple[bool, str]:
+        """
+        验证单个阵容
 
-    def verify(self, starting_players: list, bench_players: list) -> bool:
-        starting_players = len(starting_players)
-        bench_players = len(bench_players)
-        return (
-            self.starting_player_count == starting_players
-            and self.bench_player_count == bench_players
-        )
+        Args:
+            starting_players: 首发球员列表
+            bench_players: 替补球员列表
 
+        Returns:
+            (是否有效, 错误消息)
+        """
+        from app.exceptions.base import ValidationError
 
-SALARY_CAP = 187895000
+        try:
+            starting_players, bench_players = self.resolve(
+                starting_players, bench_players
+            )
+        except ValidationError as e:
+            return False, str(e)
+        return LineupService.verify_lineup(starting_players, bench_players)
 
 
 class LineupService:
@@ -58,28 +160,39 @@ class LineupService:
     @staticmethod
     def verify_lineup(starting_players: list, bench_players: list) -> Tuple[bool, str]:
         """
-        验证阵容
+        验证阵容，球员信息应已由 LineupValidator 替换为数据库中的值
 
         Args:
             starting_players: 首发球员列表
             bench_players: 替补球员列表
 
         Returns:
-            (是否有效, 错误消息)
+            (是否有效, 错误消息)，返回第一条未通过的规则
         """
-        salary_rule = SalaryRule(SALARY_CAP)
-        player_count_rule = PlayerCountRule(5, 7)
+        return get_rule_plan().evaluate(starting_players, bench_players)
 
-        valid, err_msg = True, ""
+    @staticmethod
+    def validate_lineups(db: Session, lineups: List[Dict]) -> List[Dict]:
+        """
+        批量验证阵容，所有阵容共享一次球员数据查询
 
-        if not salary_rule.verify(starting_players, bench_players):
-            err_msg = "阵容薪资超过限制"
-            valid = False
-        if not player_count_rule.verify(starting_players, bench_players):
-            err_msg = "球员数量不符合规则"
-            valid = False
+        Args:
+            db: 数据库会话
+            lineups: 阵容列表，每项包含starting_players和bench_players
 
-        return valid, err_msg
+        Returns:
+            每个阵容的验证结果，顺序与输入一致
+        """
+        pairs = [
+            (lineup.get("starting_players", []), lineup.get("bench_players", []))
+            for lineup in lineups
+        ]
+        validator = LineupValidator.load(db, pairs)
+        results = []
+        for index, (starting_players, bench_players) in enumerate(pairs):
+            valid, err_msg = validator.validate(starting_players, bench_players)
+            results.append({"index": index, "valid": valid, "message": err_msg})
+        return results
 
     @staticmethod
     def calculate_total_salary(starting_players: list, bench_players: list) -> int:
@@ -96,19 +209,19 @@ class LineupService:
         return sum(p.get("salary", 0) for p in starting_players + bench_players)
 
     @staticmethod
-    def create_lineup(
-        db: Session,
+    def _prepare_lineup(
+        validator: LineupValidator,
         user_id: int,
         name: Optional[str],
         date_str: str,
         starting_players: list,
         bench_players: list,
-    ) -> Lineup:
+    ) -> Tuple[Dict, List[Dict]]:
         """
-        创建阵容
+        验证阵容并生成待插入的阵容行和球员行
 
         Args:
-            db: 数据库会话
+            validator: 已加载相关球员数据的阵容验证器
             user_id: 用户ID
             name: 阵容名称
             date_str: 日期字符串
@@ -116,79 +229,248 @@ class LineupService:
             bench_players: 替补球员
 
         Returns:
-            阵容对象
+            (阵容行, 球员行列表)，球员行尚未填写lineup_id
 
         Raises:
             ValidationError: 参数验证失败
         """
+        from app.exceptions.base import ValidationError
+
         if not name:
             timestamp = int(time.time())
             name = f"阵容_{date_str}_{timestamp}"
 
         if not date_str:
-            from app.exceptions.base import ValidationError
-
             raise ValidationError("比赛日期不能为空")
 
         try:
             lineup_date = datetime.strptime(date_str, "%Y-%m-%d").date()
         except ValueError:
-            from app.exceptions.base import ValidationError
-
             raise ValidationError("日期格式不正确，请使用 YYYY-MM-DD 格式")
 
         if not starting_players and not bench_players:
-            from app.exceptions.base import ValidationError
-
             raise ValidationError("阵容至少需要一名球员")
 
+        starting_players, bench_players = validator.resolve(
+            starting_players, bench_players
+        )
         valid, err_msg = LineupService.verify_lineup(starting_players, bench_players)
         if not valid:
-            from app.exceptions.base import ValidationError
-
             raise ValidationError(err_msg)
 
-        new_lineup = Lineup(
-            user_id=user_id,
-            name=name,
-            date=lineup_date,
-            total_salary=LineupService.calculate_total_salary(
+        lineup_row = {
+            "user_id": user_id,
+            "name": name,
+            "date": lineup_date,
+            "total_salary": LineupService.calculate_total_salary(
                 starting_players, bench_players
             ),
+            "created_at": datetime.utcnow(),
+        }
+        (
+            lineup_row["roster_fingerprint"],
+            lineup_row["player_set_fingerprint"],
+        ) = roster_fingerprints(starting_players, bench_players)
+        player_rows = [
+            {
+                "player_id": player.get("player_id"),
+                "full_name": player.get("full_name"),
+                "team_name": player.get("team_name"),
+                "position": player.get("position"),
+                "salary": player.get("salary"),
+                "slot": player.get("slot") if is_starting else None,
+                "is_starting": is_starting,
+            }
+            for players, is_starting in (
+                (starting_players, True),
+                (bench_players, False),
+            )
+            for player in players
+        ]
+        return lineup_row, player_rows
+
+    @staticmethod
+    def _insert_lineups(
+        db: Session, prepared: List[Tuple[Dict, List[Dict]]]
+    ) -> List[Dict]:
+        """
+        用两条批量INSERT写入阵容及其球员，并在一个短事务内提交
+
+        Args:
+            db: 数据库会话
+            prepared: _prepare_lineup 生成的(阵容行, 球员行列表)
+
+        Returns:
+            与 Lineup.to_dict 结构一致的阵容字典列表
+        """
+        lineup_rows = [lineup_row for lineup_row, _ in prepared]
+        lineup_ids = db.scalars(
+            insert(Lineup).returning(Lineup.id, sort_by_parameter_order=True),
+            lineup_rows,
+        ).all()
+
+        player_rows = []
+        for lineup_id, (_, players) in zip(lineup_ids, prepared):
+            for player in players:
+                player["lineup_id"] = lineup_id
+                player_rows.append(player)
+        player_ids = (
+            db.scalars(
+                insert(LineupPlayer).returning(
+                    LineupPlayer.id, sort_by_parameter_order=True
+                ),
+                player_rows,
+            ).all()
+            if player_rows
+            else []
         )
-        db.add(new_lineup)
-        db.flush()
-
-        for player in starting_players:
-            lineup_player = LineupPlayer(
-                lineup_id=new_lineup.id,
-                player_id=player.get("player_id"),
-                full_name=player.get("full_name"),
-                team_name=player.get("team_name"),
-                position=player.get("position"),
-                salary=player.get("salary"),
-                slot=player.get("slot"),
-                is_starting=True,
+        db.commit()
+
+        for player, player_id in zip(player_rows, player_ids):
+            player["id"] = player_id
+
+        results = []
+        for lineup_id, (lineup_row, players) in zip(lineup_ids, prepared):
+            results.append(
+                {
+                    "id": lineup_id,
+                    "user_id": lineup_row["user_id"],
+                    "name": lineup_row["name"],
+                    "date": lineup_row["date"].isoformat(),
+                    "total_salary": lineup_row["total_salary"],
+                    "created_at": lineup_row["created_at"].isoformat(),
+                    "actual_score": None,
+                    "rank": None,
+                    "gap_to_optimal": None,
+                    "players": players,
+                }
             )
-            db.add(lineup_player)
-
-        for player in bench_players:
-            lineup_player = LineupPlayer(
-                lineup_id=new_lineup.id,
-                player_id=player.get("player_id"),
-                full_name=player.get("full_name"),
-                team_name=player.get("team_name"),
-                position=player.get("position"),
-                salary=player.get("salary"),
-                slot=None,
-                is_starting=False,
+        return results
+
+    @staticmethod
+    def create_lineup(
+        db: Session,
+        user_id: int,
+        name: Optional[str],
+        date_str: str,
+        starting_players: list,
+        bench_players: list,
+    ) -> Dict:
+        """
+        创建阵容
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            name: 阵容名称
+            date_str: 日期字符串
+            starting_players: 首发球员
+            bench_players: 替补球员
+
+        Returns:
+            阵容字典
+
+        Raises:
+            ValidationError: 参数验证失败
+        """
+        validator = LineupValidator.load(db, [(starting_players, bench_players)])
+        prepared = LineupService._prepare_lineup(
+            validator, user_id, name, date_str, starting_players, bench_players
+        )
+        lineup = LineupService._insert_lineups(db, [prepared])[0]
+        logger.info(f"阵容创建成功: lineup_id={lineup['id']}, user_id={user_id}")
+        return lineup
+
+    @staticmethod
+    async def create_lineup_queued(
+        db: Session,
+        user_id: int,
+        name: Optional[str],
+        date_str: str,
+        starting_players: list,
+        bench_players: list,
+    ) -> Dict:
+        """
+        通过单写入者队列创建阵容，与其他并发提交合并为一次事务
+
+        写入队列未启动时(如脚本中调用)直接写入。
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            name: 阵容名称
+            date_str: 日期字符串
+            starting_players: 首发球员
+            bench_players: 替补球员
+
+        Returns:
+            阵容字典，返回时所在事务已提交
+
+        Raises:
+            ValidationError: 参数验证失败
+        """
+        if not lineup_write_queue.running:
+            return LineupService.create_lineup(
+                db, user_id, name, date_str, starting_players, bench_players
             )
-            db.add(lineup_player)
 
-        db.commit()
-        db.refresh(new_lineup)
-        logger.info(f"阵容创建成功: lineup_id={new_lineup.id}, user_id={user_id}")
-        return new_lineup
+        validator = LineupValidator.load(db, [(starting_players, bench_players)])
+        prepared = LineupService._prepare_lineup(
+            validator, user_id, name, date_str, starting_players, bench_players
+        )
+        lineup = await asyncio.wrap_future(lineup_write_queue.submit(prepared))
+        logger.info(f"阵容创建成功: lineup_id={lineup['id']}, user_id={user_id}")
+        return lineup
+
+    @staticmethod
+    def create_lineups_bulk(
+        db: Session, user_id: int, lineups: List[Dict]
+    ) -> List[Dict]:
+        """
+        批量创建阵容，全部验证通过后在同一事务内写入
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            lineups: 阵容列表，每项包含name、date、starting_players和bench_players
+
+        Returns:
+            阵容字典列表，顺序与输入一致
+
+        Raises:
+            ValidationError: 任一阵容验证失败时整体不写入
+        """
+        from app.exceptions.base import ValidationError
+
+        if not lineups:
+            raise ValidationError("阵容列表不能为空")
+
+        validator = LineupValidator.load(
+            db,
+            [
+                (lineup.get("starting_players", []), lineup.get("bench_players", []))
+                for lineup in lineups
+            ],
+        )
+        prepared = []
+        for index, lineup in enumerate(lineups, start=1):
+            try:
+                prepared.append(
+                    LineupService._prepare_lineup(
+                        validator,
+                        user_id,
+                        lineup.get("name"),
+                        lineup.get("date"),
+                        lineup.get("starting_players", []),
+                        lineup.get("bench_players", []),
+                    )
+                )
+            except ValidationError as e:
+                raise ValidationError(f"第{index}个阵容无效: {e}")
+
+        results = LineupService._insert_lineups(db, prepared)
+        logger.info(f"批量创建阵容成功: count={len(results)}, user_id={user_id}")
+        return results
 
     @staticmethod
     def can_view_lineup(
@@ -207,6 +489,19 @@ class LineupService:
         """
         if lineup_user_id == current_user_id:
             return True
+        return LineupService.is_locked(lineup_date)
+
+    @staticmethod
+    def is_locked(lineup_date: date) -> bool:
+        """
+        判断指定日期的阵容是否已锁定（北京时间当天7点后）
+
+        Args:
+            lineup_date: 阵容日期
+
+        Returns:
+            是否已锁定
+        """
         now = datetime.utcnow() + timedelta(hours=8)
         today = now.date()
         if lineup_date < today:
@@ -220,17 +515,31 @@ class LineupService:
         db: Session,
         date: str,
         current_user_id: int,
-    ) -> List[Dict]:
+        page: int = 1,
+        per_page: int = 10,
+        user_id: Optional[int] = None,
+        min_salary: Optional[int] = None,
+        mine_only: bool = False,
+        sort_by: str = "created_at",
+        sort_order: str = "desc",
+    ) -> Dict:
         """
-        获取指定日期的阵容列表
+        分页获取指定日期的阵容列表
 
         Args:
             db: 数据库会话
             date: 日期字符串
             current_user_id: 当前用户ID
+            page: 页码
+            per_page: 每页数量
+            user_id: 只返回该用户的阵容
+            min_salary: 最低总薪资
+            mine_only: 只返回当前用户的阵容
+            sort_by: 排序字段，created_at、total_salary或actual_score
+            sort_order: 排序顺序
 
         Returns:
-            阵容列表
+            包含阵容列表和分页信息的字典
 
         Raises:
             ValidationError: 日期格式无效
@@ -247,79 +556,422 @@ class LineupService:
 
             raise ValidationError("日期格式不正确，请使用 YYYY-MM-DD 格式")
 
-        lineups = (
-            db.query(Lineup)
-            .filter_by(date=date_obj)
-            .order_by(Lineup.created_at.desc())
-            .all()
+        filters = [Lineup.date == date_obj]
+        if mine_only:
+            filters.append(Lineup.user_id == current_user_id)
+        elif user_id is not None:
+            filters.append(Lineup.user_id == user_id)
+        if min_salary is not None:
+            filters.append(Lineup.total_salary >= min_salary)
+
+        query = (
+            db.query(Lineup, User.username)
+            .outerjoin(User, User.id == Lineup.user_id)
+            .filter(*filters)
         )
 
-        result = []
-        for lineup in lineups:
-            lineup_dict = lineup.to_dict()
-            user = db.query(User).get(lineup.user_id)
-            if user:
-                lineup_dict["username"] = user.username
-            else:
-                lineup_dict["username"] = "未知用户"
-
-            if LineupService.can_view_lineup(
-                lineup.user_id, current_user_id, lineup.date
-            ):
-                lineup_dict["can_view"] = True
-            else:
-                lineup_dict["can_view"] = False
-                lineup_dict["players"] = []
-            result.append(lineup_dict)
-
-        return result
+        if sort_by == "actual_score":
+            # 尚未计分的日期(包括当天)没有存储得分，按实时汇总的得分排序
+            scores = LineupService._actual_score_subquery(db, date_obj)
+            query = query.outerjoin(scores, scores.c.lineup_id == Lineup.id)
+            query = query.add_columns(scores.c.actual_score)
+            sort_column = func.coalesce(Lineup.actual_score, scores.c.actual_score, 0)
+        elif sort_by == "total_salary":
+            sort_column = Lineup.total_salary
+        else:
+            sort_column = Lineup.created_at
+
+        if sort_order == "asc":
+            query = query.order_by(sort_column.asc().nulls_last(), Lineup.id.asc())
+        else:
+            query = query.order_by(sort_column.desc().nulls_last(), Lineup.id.desc())
+
+        def serialize(rows) -> List[Dict]:
+            visible = {
+                row[0].id: LineupService.can_view_lineup(
+                    row[0].user_id, current_user_id, row[0].date
+                )
+                for row in rows
+            }
+            # 只为可查看的阵容加载球员，锁定前他人的阵容不读取球员行
+            players = LineupService._load_lineup_players(
+                db, [lineup_id for lineup_id, can_view in visible.items() if can_view]
+            )
+
+            result = []
+            for row in rows:
+                lineup, username = row[0], row[1]
+                can_view = visible[lineup.id]
+                lineup_dict = lineup.to_dict(include_players=False)
+                lineup_dict["players"] = players.get(lineup.id, [])
+                lineup_dict["username"] = username if username else "未知用户"
+                lineup_dict["can_view"] = can_view
+                if (
+                    sort_by == "actual_score"
+                    and can_view
+                    and lineup_dict["actual_score"] is None
+                ):
+                    lineup_dict["actual_score"] = round(row[2] or 0, 2)
+                result.append(lineup_dict)
+            return result
+
+        return paginate_query(
+            query,
+            page,
+            per_page,
+            "lineups",
+            count_query=db.query(func.count(Lineup.id)).filter(*filters),
+            transform=serialize,
+            date=date,
+        )
 
     @staticmethod
-    def get_best_lineup(
+    def _load_lineup_players(db: Session, lineup_ids: List[int]) -> Dict[int, List]:
+        """
+        一次IN查询加载多个阵容的球员
+
+        Args:
+            db: 数据库会话
+            lineup_ids: 阵容ID列表
+
+        Returns:
+            阵容ID -> 球员字典列表
+        """
+        players: Dict[int, List] = {}
+        if not lineup_ids:
+            return players
+        rows = (
+            db.query(LineupPlayer)
+            .filter(LineupPlayer.lineup_id.in_(lineup_ids))
+            .order_by(LineupPlayer.id)
+        )
+        for player in rows:
+            players.setdefault(player.lineup_id, []).append(player.to_dict())
+        return players
+
+    @staticmethod
+    def _actual_score_subquery(db: Session, date_obj: date):
+        """
+        按阵容实时汇总指定日期实际得分的子查询，首发系数为2，替补系数为1
+
+        Args:
+            db: 数据库会话
+            date_obj: 比赛日期
+
+        Returns:
+            包含 lineup_id 和 actual_score 列的子查询
+        """
+        return (
+            db.query(
+                LineupPlayer.lineup_id.label("lineup_id"),
+                func.sum(
+                    case((LineupPlayer.is_starting, 2), else_=1)
+                    * game_score_expression()
+                ).label("actual_score"),
+            )
+            .join(Lineup, Lineup.id == LineupPlayer.lineup_id)
+            .join(
+                PlayerGameStats,
+                and_(
+                    PlayerGameStats.personId == LineupPlayer.player_id,
+                    PlayerGameStats.game_date == Lineup.date,
+                ),
+            )
+            .filter(Lineup.date == date_obj)
+            .group_by(LineupPlayer.lineup_id)
+            .subquery()
+        )
+
+    @staticmethod
+    def get_user_lineups(
         db: Session,
-        date: Optional[str],
+        current_user_id: int,
+        page: int = 1,
+        per_page: int = 10,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
     ) -> Dict:
         """
-        获取最佳阵容
+        分页获取当前用户的历史阵容及汇总表现
+
+        得分、排名、与最佳阵容的差距均由计分流程预先保存，这里只做读取，
+        查询由(user_id, date)索引支撑。
 
         Args:
             db: 数据库会话
-            date: 日期
+            current_user_id: 当前用户ID
+            page: 页码
+            per_page: 每页数量
+            date_from: 起始日期(含)
+            date_to: 结束日期(含)
 
         Returns:
-            最佳阵容数据
+            包含阵容列表、分页信息和汇总表现的字典
 
         Raises:
-            ResourceNotFound: 无法计算最佳阵容
+            ValidationError: 日期格式无效
         """
-        now = datetime.utcnow() + timedelta(hours=8)
-        target_date = date if date else now.date().strftime("%Y-%m-%d")
-        best_lineup_data = get_best_lineup(target_date)
+        from app.exceptions.base import ValidationError
 
-        if not best_lineup_data:
-            from app.exceptions.base import ResourceNotFound
+        filters = [Lineup.user_id == current_user_id]
+        try:
+            if date_from:
+                filters.append(
+                    Lineup.date >= datetime.strptime(date_from, "%Y-%m-%d").date()
+                )
+            if date_to:
+                filters.append(
+                    Lineup.date <= datetime.strptime(date_to, "%Y-%m-%d").date()
+                )
+        except ValueError:
+            raise ValidationError("日期格式不正确，请使用 YYYY-MM-DD 格式")
 
-            raise ResourceNotFound(
-                f"无法计算{target_date}最佳阵容，可能是因为当日没有比赛或数据不足"
+        summary = (
+            db.query(
+                func.count(Lineup.id).label("lineups"),
+                func.count(Lineup.actual_score).label("scored"),
+                func.avg(Lineup.actual_score).label("average_score"),
+                func.max(Lineup.actual_score).label("best_score"),
+                func.min(Lineup.rank).label("best_rank"),
+                func.sum(case((Lineup.rank == 1, 1), else_=0)).label("wins"),
+                func.avg(Lineup.gap_to_optimal).label("average_gap"),
+            )
+            .select_from(Lineup)
+            .filter(*filters)
+            .one()
+        )
+
+        query = (
+            db.query(Lineup, DailyOptimalScore.optimal_score)
+            .outerjoin(DailyOptimalScore, DailyOptimalScore.date == Lineup.date)
+            .options(selectinload(Lineup.players))
+            .filter(*filters)
+            .order_by(Lineup.date.desc(), Lineup.created_at.desc(), Lineup.id.desc())
+        )
+
+        def serialize(rows) -> List[Dict]:
+            result = []
+            for lineup, optimal_score in rows:
+                lineup_dict = lineup.to_dict()
+                lineup_dict["optimal_score"] = optimal_score
+                result.append(lineup_dict)
+            return result
+
+        def rounded(value):
+            return round(value, 2) if value is not None else None
+
+        return paginate_query(
+            query,
+            page,
+            per_page,
+            "lineups",
+            count_query=db.query(func.count(Lineup.id)).filter(*filters),
+            transform=serialize,
+            summary={
+                "lineups": summary.lineups,
+                "scored": summary.scored,
+                "average_score": rounded(summary.average_score),
+                "best_score": summary.best_score,
+                "best_rank": summary.best_rank,
+                "wins": summary.wins or 0,
+                "average_gap_to_optimal": rounded(summary.average_gap),
+            },
+        )
+
+    @staticmethod
+    def backfill_fingerprints(db: Session, batch_size: int = 500) -> int:
+        """
+        为尚无指纹的历史阵容补算指纹
+
+        新阵容在写入时已计算指纹，本方法只用于一次性迁移旧数据，
+        由 scripts/backfill_fingerprints.py 调用。按ID分批处理，每批提交一次。
+
+        Args:
+            db: 数据库会话
+            batch_size: 每批处理的阵容数量
+
+        Returns:
+            补算的阵容数量
+        """
+        total = 0
+        last_id = 0
+        while True:
+            lineups = (
+                db.query(Lineup)
+                .options(selectinload(Lineup.players))
+                .filter(Lineup.roster_fingerprint.is_(None), Lineup.id > last_id)
+                .order_by(Lineup.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not lineups:
+                return total
+
+            updates = []
+            for lineup in lineups:
+                players = [player.to_dict() for player in lineup.players]
+                roster, player_set = roster_fingerprints(
+                    [p for p in players if p["is_starting"]],
+                    [p for p in players if not p["is_starting"]],
+                )
+                updates.append(
+                    {
+                        "id": lineup.id,
+                        "roster_fingerprint": roster,
+                        "player_set_fingerprint": player_set,
+                    }
+                )
+            db.execute(update(Lineup), updates)
+            db.commit()
+            total += len(updates)
+            last_id = lineups[-1].id
+
+    @staticmethod
+    def get_ownership(db: Session, date_str: str, current_user_id: int) -> Dict:
+        """
+        获取指定日期的球员持有率和重复阵容分组
+
+        持有率由一次按球员分组的聚合查询得到，重复阵容由按指纹分组的聚合查询
+        得到，不做阵容两两比较。只读取数据，尚未补算指纹的旧阵容不参与
+        重复分组。阵容锁定前不可查看。
+
+        Args:
+            db: 数据库会话
+            date_str: 日期字符串
+            current_user_id: 当前用户ID
+
+        Returns:
+            持有率和重复阵容分组
+
+        Raises:
+            ValidationError: 日期格式无效
+            PermissionDenied: 阵容尚未锁定
+        """
+        from app.exceptions.base import PermissionDenied, ValidationError
+
+        if not date_str:
+            raise ValidationError("日期参数不能为空")
+        try:
+            date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            raise ValidationError("日期格式不正确，请使用 YYYY-MM-DD 格式")
+
+        if not LineupService.is_locked(date_obj):
+            raise PermissionDenied("阵容锁定后才能查看持有率")
+
+        total_lineups = (
+            db.query(func.count(Lineup.id)).filter(Lineup.date == date_obj).scalar()
+        )
+        if not total_lineups:
+            return {
+                "date": date_str,
+                "total_lineups": 0,
+                "unique_rosters": 0,
+                "players": [],
+                "duplicates": [],
+            }
+
+        ownership = (
+            db.query(
+                LineupPlayer.player_id,
+                func.max(LineupPlayer.full_name).label("full_name"),
+                func.max(LineupPlayer.team_name).label("team_name"),
+                func.count(LineupPlayer.id).label("lineups"),
+                func.sum(case((LineupPlayer.is_starting, 1), else_=0)).label("starts"),
+            )
+            .join(Lineup, Lineup.id == LineupPlayer.lineup_id)
+            .filter(Lineup.date == date_obj)
+            .group_by(LineupPlayer.player_id)
+            .order_by(func.count(LineupPlayer.id).desc(), LineupPlayer.player_id)
+            .all()
+        )
+        players = [
+            {
+                "player_id": row.player_id,
+                "full_name": row.full_name,
+                "team_name": row.team_name,
+                "lineups": row.lineups,
+                "starts": row.starts,
+                "ownership": round(row.lineups / total_lineups * 100, 2),
+                "start_rate": round(row.starts / total_lineups * 100, 2),
+            }
+            for row in ownership
+        ]
+
+        groups = union_all(
+            *(
+                select(
+                    literal(kind).label("kind"),
+                    column.label("fingerprint"),
+                    func.count(Lineup.id).label("lineups"),
+                    func.count(func.distinct(Lineup.user_id)).label("users"),
+                    func.group_concat(Lineup.id).label("lineup_ids"),
+                )
+                .where(Lineup.date == date_obj, column.isnot(None))
+                .group_by(column)
+                .having(func.count(Lineup.id) > 1)
+                for kind, column in (
+                    ("exact", Lineup.roster_fingerprint),
+                    ("player_set", Lineup.player_set_fingerprint),
+                )
             )
+        )
+        duplicates = [
+            {
+                "kind": row.kind,
+                "fingerprint": row.fingerprint,
+                "lineups": row.lineups,
+                "users": row.users,
+                "lineup_ids": sorted(int(i) for i in row.lineup_ids.split(",")),
+            }
+            for row in db.execute(groups.order_by(groups.c.lineups.desc()))
+        ]
+
+        return {
+            "date": date_str,
+            "total_lineups": total_lineups,
+            "unique_rosters": total_lineups
+            - sum(d["lineups"] - 1 for d in duplicates if d["kind"] == "exact"),
+            "players": players,
+            "duplicates": duplicates,
+        }
+
+    @staticmethod
+    def format_roster(
+        db: Session,
+        roster: Dict,
+        target_date: str,
+        name: str,
+        created_at: datetime,
+    ) -> Dict:
+        """
+        将求解结果格式化为阵容响应结构
 
+        Args:
+            db: 数据库会话
+            roster: 求解得到的阵容数据
+            target_date: 日期字符串
+            name: 阵容名称
+            created_at: 生成时间
+
+        Returns:
+            格式化后的阵容数据
+        """
         formatted_lineup = {
             "id": 0,
             "user_id": 0,
-            "name": f"{target_date}最佳阵容",
+            "name": name,
             "date": target_date,
-            "total_salary": best_lineup_data["total_salary"],
-            "created_at": now.isoformat(),
+            "total_salary": roster["total_salary"],
+            "created_at": created_at.isoformat(),
             "players": [],
-            "total_rating": best_lineup_data["total_rating"],
+            "total_rating": roster["total_rating"],
         }
 
-        from app.models import PlayerInformation
+        players = player_directory.get(db)
 
-        for slot, player in best_lineup_data["starters"].items():
-            player_info = (
-                db.query(PlayerInformation).filter_by(player_id=player["id"]).first()
-            )
+        for slot, player in roster["starters"].items():
+            player_info = players.get(player["id"])
             team_name = player_info.team_name if player_info else ""
             formatted_lineup["players"].append(
                 {
@@ -335,11 +987,11 @@ class LineupService:
                     "rating": player["rating"],
                 }
             )
+            if "rating_std" in player:
+                formatted_lineup["players"][-1]["rating_std"] = player["rating_std"]
 
-        for player in best_lineup_data["bench"]:
-            player_info = (
-                db.query(PlayerInformation).filter_by(player_id=player["id"]).first()
-            )
+        for player in roster["bench"]:
+            player_info = players.get(player["id"])
             team_name = player_info.team_name if player_info else ""
             formatted_lineup["players"].append(
                 {
@@ -355,5 +1007,142 @@ class LineupService:
                     "rating": player["rating"],
                 }
             )
+            if "rating_std" in player:
+                formatted_lineup["players"][-1]["rating_std"] = player["rating_std"]
 
         return formatted_lineup
+
+    @staticmethod
+    def get_best_lineup(
+        db: Session,
+        date: Optional[str],
+        risk: Optional[float] = None,
+    ) -> Dict:
+        """
+        获取最佳阵容
+
+        Args:
+            db: 数据库会话
+            date: 日期
+            risk: 风险系数，None表示按当日实际评分求解，否则按历史评分的
+                均值和方差求解风险调整阵容
+
+        Returns:
+            最佳阵容数据
+
+        Raises:
+            ResourceNotFound: 无法计算最佳阵容
+        """
+        now = datetime.utcnow() + timedelta(hours=8)
+        target_date = date if date else now.date().strftime("%Y-%m-%d")
+        if risk is None:
+            best_lineup_data = get_best_lineup(target_date)
+        else:
+            best_lineup_data = get_risk_adjusted_lineup(target_date, risk)
+
+        if not best_lineup_data:
+            from app.exceptions.base import ResourceNotFound
+
+            raise ResourceNotFound(
+                f"无法计算{target_date}最佳阵容，可能是因为当日没有比赛或数据不足"
+            )
+
+        formatted_lineup = LineupService.format_roster(
+            db, best_lineup_data, target_date, f"{target_date}最佳阵容", now
+        )
+        if risk is not None:
+            formatted_lineup["risk"] = risk
+            formatted_lineup["total_rating_std"] = best_lineup_data["total_rating_std"]
+        return formatted_lineup
+
+    @staticmethod
+    def complete_lineup(
+        db: Session,
+        date: str,
+        locked_starters: Dict[str, int],
+        locked_bench: List[int],
+        excluded_player_ids: List[int],
+    ) -> Tuple[Dict, Dict]:
+        """
+        在锁定球员的基础上补全阵容
+
+        Args:
+            db: 数据库会话
+            date: 日期
+            locked_starters: 已锁定的首发球员，位置 -> 球员ID
+            locked_bench: 已锁定的替补球员ID列表
+            excluded_player_ids: 排除的球员ID列表
+
+        Returns:
+            (补全后的阵容数据, 求解指标)
+
+        Raises:
+            ValidationError: 日期或锁定球员不合法
+            ResourceNotFound: 无法补全阵容
+        """
+        try:
+            datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            from app.exceptions.base import ValidationError
+
+            raise ValidationError("日期格式不正确，请使用 YYYY-MM-DD 格式")
+
+        roster = get_completed_lineup(
+            date, locked_starters, locked_bench, excluded_player_ids
+        )
+        if not roster:
+            from app.exceptions.base import ResourceNotFound
+
+            raise ResourceNotFound(
+                f"无法补全{date}阵容，可能是因为当日没有比赛或剩余薪资不足"
+            )
+
+        now = datetime.utcnow() + timedelta(hours=8)
+        formatted_lineup = LineupService.format_roster(
+            db, roster, date, f"{date}补全阵容", now
+        )
+        return formatted_lineup, roster["metrics"]
+
+    @staticmethod
+    def get_best_lineup_sensitivity(
+        db: Session,
+        date: Optional[str],
+        near_miss_limit: int = 10,
+    ) -> Dict:
+        """
+        获取最佳阵容及其敏感度分析
+
+        Args:
+            db: 数据库会话
+            date: 日期
+            near_miss_limit: 分析的落选球员数量
+
+        Returns:
+            包含最佳阵容、入选球员阈值和落选球员阈值的字典
+
+        Raises:
+            ResourceNotFound: 无法计算最佳阵容
+        """
+        now = datetime.utcnow() + timedelta(hours=8)
+        target_date = date if date else now.date().strftime("%Y-%m-%d")
+        report = sensitivity_cache.get(
+            db,
+            (target_date, near_miss_limit, get_rule_plan()),
+            lambda: get_lineup_sensitivity(target_date, near_miss_limit),
+        )
+
+        if not report:
+            from app.exceptions.base import ResourceNotFound
+
+            raise ResourceNotFound(
+                f"无法计算{target_date}最佳阵容，可能是因为当日没有比赛或数据不足"
+            )
+
+        return {
+            "best_lineup": LineupService.format_roster(
+                db, report["lineup"], target_date, f"{target_date}最佳阵容", now
+            ),
+            "players": report["players"],
+            "near_misses": report["near_misses"],
+            "metrics": report["metrics"],
+        }
@@ -1,10 +1,33 @@
+import time
 from datetime import date
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import pulp
 from app.db.session import SessionLocal
+from app.exceptions.base import ValidationError
 from app.models import PlayerGameStats, PlayerInformation
-from app.services.stats_service import calculate_player_score
+from app.services.player_cache import player_directory
+from app.services.rule_engine import get_rule_plan
+from app.services.stats_service import (
+    calculate_player_score,
+    get_player_rating_moments,
+)
+from app.utils.cache import VersionedLRUCache, table_version
+
+MIN_HISTORY_GAMES = 3
+# 敏感度分析中判断上下界重合的容差
+SENSITIVITY_TOLERANCE = 1e-6
+
+_game_stats_version = table_version(PlayerGameStats)
+_player_information_version = table_version(PlayerInformation)
+
+# 敏感度分析需要数十次求解，结果只依赖当日比赛数据、球员信息和规则，
+# 按日期缓存，键中包含规则计划以便规则重新加载后不复用旧结果
+sensitivity_cache = VersionedLRUCache(
+    "lineup_sensitivity",
+    lambda db: (_game_stats_version(db), _player_information_version(db)),
+    maxsize=32,
+)
 
 
 def get_player_data(target_date_str: str) -> List[Dict]:
@@ -24,12 +47,10 @@ def get_player_data(target_date_str: str) -> List[Dict]:
 
     db = SessionLocal()
     try:
+        players = player_directory.get(db)
         stats = (
             db.query(
-                PlayerInformation.player_id,
-                PlayerInformation.full_name,
-                PlayerInformation.salary,
-                PlayerInformation.position,
+                PlayerGameStats.personId,
                 PlayerGameStats.threePointersMade,
                 PlayerGameStats.twoPointersMade,
                 PlayerGameStats.freeThrowsMade,
@@ -38,51 +59,48 @@ def get_player_data(target_date_str: str) -> List[Dict]:
                 PlayerGameStats.assists,
                 PlayerGameStats.steals,
                 PlayerGameStats.blocks,
-                (
-                    PlayerGameStats.twoPointersAttempted
-                    + PlayerGameStats.threePointersAttempted
-                ).label("field_goals_attempted"),
-                (
-                    PlayerGameStats.twoPointersMade + PlayerGameStats.threePointersMade
-                ).label("field_goals_made"),
+                PlayerGameStats.twoPointersAttempted,
+                PlayerGameStats.threePointersAttempted,
                 PlayerGameStats.freeThrowsAttempted,
                 PlayerGameStats.turnovers,
                 PlayerGameStats.foulsPersonal,
                 PlayerGameStats.IS_WINNER,
                 PlayerGameStats.minutes,
             )
-            .join(
-                PlayerGameStats, PlayerInformation.player_id == PlayerGameStats.personId
-            )
             .filter(PlayerGameStats.game_date == target_date)
             .all()
         )
 
         player_data = []
         for stat in stats:
+            player = players.get(stat.personId)
+            if player is None:
+                continue
             rating = calculate_player_score(
-                three_pointers=stat[4],
-                two_pointers=stat[5],
-                free_throws=stat[6],
-                offensive_rebounds=stat[7],
-                defensive_rebounds=stat[8],
-                assists=stat[9],
-                steals=stat[10],
-                blocks=stat[11],
-                field_goals_attempted=stat[12],
-                field_goals_made=stat[13],
-                free_throws_attempted=stat[14],
-                turnovers=stat[15],
-                personal_fouls=stat[16],
-                team_won=stat[17],
-                minutes_played=stat[18],
+                three_pointers=stat.threePointersMade,
+                two_pointers=stat.twoPointersMade,
+                free_throws=stat.freeThrowsMade,
+                offensive_rebounds=stat.reboundsOffensive,
+                defensive_rebounds=stat.reboundsDefensive,
+                assists=stat.assists,
+                steals=stat.steals,
+                blocks=stat.blocks,
+                field_goals_attempted=stat.twoPointersAttempted
+                + stat.threePointersAttempted,
+                field_goals_made=stat.twoPointersMade + stat.threePointersMade,
+                free_throws_attempted=stat.freeThrowsAttempted,
+                turnovers=stat.turnovers,
+                personal_fouls=stat.foulsPersonal,
+                team_won=stat.IS_WINNER,
+                minutes_played=stat.minutes,
             )
             player_data.append(
                 {
-                    "id": stat[0],
-                    "name": stat[1],
-                    "salary": stat[2],
-                    "position": stat[3],
+                    "id": player.player_id,
+                    "name": player.full_name,
+                    "salary": player.salary,
+                    "position": player.position,
+                    "team": player.team_name,
                     "rating": rating,
                 }
             )
@@ -94,119 +112,691 @@ def get_player_data(target_date_str: str) -> List[Dict]:
 
 def get_position_map() -> Dict:
     """
-    获取位置映射表
+    获取位置映射表，来自规则配置中的首发位置规则
 
     Returns:
         位置映射字典
     """
-    return {
-        "Guard": ["PG", "SG"],
-        "Guard-Forward": ["SG", "SF"],
-        "Forward-Guard": ["SG", "SF"],
-        "Forward": ["SF", "PF"],
-        "Forward-Center": ["PF", "C"],
-        "Center-Forward": ["PF", "C"],
-        "Center": ["C"],
+    return get_rule_plan().position_map
+
+
+def _build_roster_model(
+    players_data: List[Dict],
+    starter_slots: List[str],
+    bench_size: int,
+    salary_cap: Optional[int],
+    sense: int = pulp.LpMaximize,
+    risk: float = 0.0,
+    team_counts: Optional[Dict[str, int]] = None,
+) -> Tuple[pulp.LpProblem, Dict, pulp.LpAffineExpression, pulp.LpAffineExpression]:
+    """
+    构建阵容模型的变量和约束（不含目标函数）
+
+    先为每名球员预计算可担任的位置、薪资和各角色的目标系数，再一次性
+    生成变量列表，目标函数和约束直接由(变量, 系数)列表构造，避免逐项
+    相加和成员检查带来的开销。
+
+    加权评分表达式为 Σ(w·评分 - risk·w²·方差)。决策变量为0/1变量，
+    因此在球员表现相互独立时，该式恰好是阵容总分的均值减去risk倍方差。
+
+    Args:
+        players_data: 球员数据列表，可包含rating_std字段
+        starter_slots: 需要填充的首发位置
+        bench_size: 需要填充的替补人数
+        salary_cap: 薪资上限，None表示不加薪资约束
+        sense: 优化方向
+        risk: 风险系数，正数偏好稳定，负数偏好上限
+        team_counts: 模型外已占用的各队名额，如补全阵容时的锁定球员
+
+    Returns:
+        (模型, 决策变量, 加权评分表达式, 薪资表达式)
+    """
+    plan = get_rule_plan()
+    position_map = plan.position_map
+    max_per_team = plan.max_per_team
+    slot_index = {slot: i for i, slot in enumerate(starter_slots)}
+    eligible_slots = {
+        position: [slot_index[slot] for slot in slots if slot in slot_index]
+        for position, slots in position_map.items()
     }
+    with_bench = bench_size > 0
 
+    ratings = [p["rating"] for p in players_data]
+    salaries = [p["salary"] for p in players_data]
+    variances = [p.get("rating_std", 0) ** 2 for p in players_data]
+    starter_coefs = [2 * r - risk * 4 * v for r, v in zip(ratings, variances)]
+    bench_coefs = [r - risk * v for r, v in zip(ratings, variances)]
 
-def solve_roster(players_data: List[Dict]) -> Optional[Dict]:
+    x = {}
+    rating_terms = []
+    salary_terms = []
+    player_terms = []
+    slot_terms = [[] for _ in starter_slots]
+    bench_terms = []
+    team_terms = {}
+
+    for i, p in enumerate(players_data):
+        pid = p["id"]
+        terms = []
+        for s in eligible_slots.get(p["position"], []):
+            var = pulp.LpVariable(f"x_{pid}_{starter_slots[s]}", cat="Binary")
+            x[(pid, starter_slots[s])] = var
+            rating_terms.append((var, starter_coefs[i]))
+            slot_terms[s].append((var, 1))
+            terms.append((var, 1))
+        if with_bench:
+            var = pulp.LpVariable(f"x_{pid}_BENCH", cat="Binary")
+            x[(pid, "BENCH")] = var
+            rating_terms.append((var, bench_coefs[i]))
+            bench_terms.append((var, 1))
+            terms.append((var, 1))
+        salary_terms.extend((var, salaries[i]) for var, _ in terms)
+        player_terms.append((pid, terms))
+        if max_per_team is not None:
+            team_terms.setdefault(p.get("team"), []).extend(terms)
+
+    prob = pulp.LpProblem("Basketball_Roster_Optimization", sense)
+    rating_expr = pulp.LpAffineExpression(rating_terms)
+    salary_expr = pulp.LpAffineExpression(salary_terms)
+
+    constraints = []
+    if salary_cap is not None:
+        constraints.append(
+            (salary_expr, pulp.LpConstraintLE, salary_cap, "Total_Salary")
+        )
+    for pid, terms in player_terms:
+        if terms:
+            constraints.append(
+                (
+                    pulp.LpAffineExpression(terms),
+                    pulp.LpConstraintLE,
+                    1,
+                    f"One_Role_{pid}",
+                )
+            )
+    for slot, terms in zip(starter_slots, slot_terms):
+        constraints.append(
+            (
+                pulp.LpAffineExpression(terms),
+                pulp.LpConstraintEQ,
+                1,
+                f"Fill_Starter_{slot}",
+            )
+        )
+    constraints.append(
+        (
+            pulp.LpAffineExpression(bench_terms),
+            pulp.LpConstraintEQ,
+            bench_size,
+            "Fill_Bench",
+        )
+    )
+
+    team_counts = team_counts or {}
+    for index, (team, terms) in enumerate(team_terms.items()):
+        constraints.append(
+            (
+                pulp.LpAffineExpression(terms),
+                pulp.LpConstraintLE,
+                max_per_team - team_counts.get(team, 0),
+                f"Max_Per_Team_{index}",
+            )
+        )
+
+    for expr, constraint_sense, rhs, name in constraints:
+        prob.addConstraint(
+            pulp.LpConstraint(e=expr, sense=constraint_sense, rhs=rhs, name=name)
+        )
+
+    return prob, x, rating_expr, salary_expr
+
+
+def _extract_roster(
+    players_data: List[Dict], starter_slots: List[str], x: Dict
+) -> Dict:
+    """
+    从已求解的模型中读取阵容
+
+    Args:
+        players_data: 球员数据列表
+        starter_slots: 首发位置
+        x: 决策变量
+
+    Returns:
+        阵容数据
+    """
+    players_by_id = {p["id"]: p for p in players_data}
+    roster = {"starters": {}, "bench": [], "total_rating": 0, "total_salary": 0}
+
+    chosen = [key for key, var in x.items() if var.varValue and var.varValue > 0.5]
+    for pid, role in chosen:
+        p = players_by_id[pid]
+        if role == "BENCH":
+            roster["bench"].append(p)
+            roster["total_rating"] += p["rating"]
+        else:
+            roster["starters"][role] = p
+            roster["total_rating"] += p["rating"] * 2
+        roster["total_salary"] += p["salary"]
+
+    roster["starters"] = {
+        slot: roster["starters"][slot]
+        for slot in starter_slots
+        if slot in roster["starters"]
+    }
+    return roster
+
+
+def solve_roster(
+    players_data: List[Dict],
+    starter_slots: Optional[List[str]] = None,
+    bench_size: Optional[int] = None,
+    salary_cap: Optional[int] = None,
+    risk: float = 0.0,
+    team_counts: Optional[Dict[str, int]] = None,
+) -> Optional[Dict]:
     """
     使用线性规划求解最佳阵容
 
+    首发位置、替补人数、薪资上限和同队上限在每次求解时从规则配置读取，
+    与阵容验证使用同一份规则。
+
     Args:
         players_data: 球员数据列表
+        starter_slots: 需要填充的首发位置，None表示规则中的全部首发位置
+        bench_size: 需要填充的替补人数，None表示规则中的替补人数
+        salary_cap: 薪资上限，None表示规则中的薪资上限
+        risk: 风险系数，0表示只最大化加权评分
+        team_counts: 模型外已占用的各队名额
 
     Returns:
         最佳阵容数据，无解返回None
     """
-    SALARY_CAP = 187895000
-    starter_slots = ["PG", "SG", "SF", "PF", "C"]
-    position_map = get_position_map()
+    plan = get_rule_plan()
+    if starter_slots is None:
+        starter_slots = plan.starter_slots
+    if bench_size is None:
+        bench_size = plan.bench_size
+    if salary_cap is None:
+        salary_cap = plan.salary_cap
+    started_at = time.perf_counter()
+
+    if not starter_slots and bench_size == 0:
+        roster = {"starters": {}, "bench": [], "total_rating": 0, "total_salary": 0}
+        roster["metrics"] = {
+            "variables": 0,
+            "constraints": 0,
+            "build_time_ms": 0.0,
+            "solve_time_ms": 0.0,
+        }
+        return roster
+
+    prob, x, rating_expr, _ = _build_roster_model(
+        players_data,
+        starter_slots,
+        bench_size,
+        salary_cap,
+        risk=risk,
+        team_counts=team_counts,
+    )
+    prob.setObjective(rating_expr)
+    built_at = time.perf_counter()
 
-    prob = pulp.LpProblem("Basketball_Roster_Optimization", pulp.LpMaximize)
+    status = prob.solve(pulp.PULP_CBC_CMD(msg=0))
+    solved_at = time.perf_counter()
 
-    x = {}
+    if pulp.LpStatus[status] != "Optimal":
+        return None
 
-    for p in players_data:
-        pid = p["id"]
-        p_pos = p["position"]
+    roster = _extract_roster(players_data, starter_slots, x)
+    roster["metrics"] = {
+        "variables": len(x),
+        "constraints": len(prob.constraints),
+        "build_time_ms": round((built_at - started_at) * 1000, 2),
+        "solve_time_ms": round((solved_at - built_at) * 1000, 2),
+    }
+    return roster
 
-        allowed_slots = position_map.get(p_pos, [])
-        for slot in allowed_slots:
-            x[(pid, slot)] = pulp.LpVariable(f"x_{pid}_{slot}", cat="Binary")
 
-        x[(pid, "BENCH")] = pulp.LpVariable(f"x_{pid}_BENCH", cat="Binary")
+def solve_min_salary_roster(
+    players_data: List[Dict], forced_id: int, min_rating: float
+) -> Optional[Dict]:
+    """
+    求解包含指定球员、加权评分不低于下限时薪资最低的阵容
 
-    objective_terms = []
-    for p in players_data:
-        pid = p["id"]
-        rating = p["rating"]
-        for slot in starter_slots:
-            if (pid, slot) in x:
-                objective_terms.append(2 * rating * x[(pid, slot)])
-        if (pid, "BENCH") in x:
-            objective_terms.append(1 * rating * x[(pid, "BENCH")])
+    Args:
+        players_data: 球员数据列表
+        forced_id: 必须入选的球员ID
+        min_rating: 加权评分下限
 
-    prob += pulp.lpSum(objective_terms)
+    Returns:
+        薪资最低的阵容数据，无解返回None
+    """
+    plan = get_rule_plan()
+    prob, x, rating_expr, salary_expr = _build_roster_model(
+        players_data,
+        plan.starter_slots,
+        plan.bench_size,
+        None,
+        sense=pulp.LpMinimize,
+    )
+    prob += salary_expr
+    prob += (
+        pulp.lpSum(var for (pid, _), var in x.items() if pid == forced_id) == 1,
+        "Force_Player",
+    )
+    prob += rating_expr >= min_rating, "Min_Rating"
 
-    salary_terms = []
-    for p in players_data:
-        pid = p["id"]
-        sal = p["salary"]
-        player_vars = [
-            x[(pid, role)] for role in starter_slots + ["BENCH"] if (pid, role) in x
-        ]
-        for var in player_vars:
-            salary_terms.append(sal * var)
-    prob += pulp.lpSum(salary_terms) <= SALARY_CAP, "Total_Salary"
+    status = prob.solve(pulp.PULP_CBC_CMD(msg=0))
 
-    for p in players_data:
-        pid = p["id"]
-        player_vars = [
-            x[(pid, role)] for role in starter_slots + ["BENCH"] if (pid, role) in x
-        ]
-        prob += pulp.lpSum(player_vars) <= 1, f"One_Role_{pid}"
-
-    for slot in starter_slots:
-        slot_vars = [
-            x[(pid, slot)]
-            for p in players_data
-            for pid in [p["id"]]
-            if (pid, slot) in x
-        ]
-        prob += pulp.lpSum(slot_vars) == 1, f"Fill_Starter_{slot}"
-
-    bench_vars = [
-        x[(pid, "BENCH")]
+    if pulp.LpStatus[status] != "Optimal":
+        return None
+    return _extract_roster(players_data, plan.starter_slots, x)
+
+
+def complete_roster(
+    players_data: List[Dict],
+    locked_starters: Dict[str, int],
+    locked_bench: List[int],
+    excluded_ids: List[int],
+) -> Optional[Dict]:
+    """
+    在锁定部分球员的前提下补全阵容
+
+    只对剩余的首发位置、替补名额和剩余薪资空间求解，锁定球员和排除球员
+    不进入模型，因此问题规模远小于完整求解。
+
+    Args:
+        players_data: 球员数据列表
+        locked_starters: 已锁定的首发球员，位置 -> 球员ID
+        locked_bench: 已锁定的替补球员ID列表
+        excluded_ids: 排除的球员ID列表
+
+    Returns:
+        补全后的阵容数据，无解返回None
+
+    Raises:
+        ValidationError: 锁定球员不合法
+    """
+    plan = get_rule_plan()
+    position_map = plan.position_map
+    players_by_id = {p["id"]: p for p in players_data}
+    excluded = set(excluded_ids)
+
+    locked_ids = list(locked_starters.values()) + list(locked_bench)
+    if len(set(locked_ids)) != len(locked_ids):
+        raise ValidationError("锁定球员不能重复")
+    if len(locked_bench) > plan.bench_size:
+        raise ValidationError(f"替补球员最多{plan.bench_size}名")
+
+    for slot, pid in locked_starters.items():
+        if slot not in plan.starter_slots:
+            raise ValidationError(f"无效的首发位置: {slot}")
+        player = players_by_id.get(pid)
+        if not player:
+            raise ValidationError(f"球员{pid}当日没有比赛数据")
+        if slot not in position_map.get(player["position"], []):
+            raise ValidationError(f"球员{player['name']}不能担任{slot}")
+
+    for pid in locked_bench:
+        if pid not in players_by_id:
+            raise ValidationError(f"球员{pid}当日没有比赛数据")
+
+    if excluded.intersection(locked_ids):
+        raise ValidationError("锁定球员不能同时被排除")
+
+    locked_salary = sum(players_by_id[pid]["salary"] for pid in locked_ids)
+    salary_cap = plan.salary_cap
+    remaining_cap = None if salary_cap is None else salary_cap - locked_salary
+    if remaining_cap is not None and remaining_cap < 0:
+        raise ValidationError("锁定球员薪资超过限制")
+
+    team_counts = {}
+    for pid in locked_ids:
+        team = players_by_id[pid].get("team")
+        team_counts[team] = team_counts.get(team, 0) + 1
+    max_per_team = plan.max_per_team
+    if max_per_team is not None and max(team_counts.values(), default=0) > max_per_team:
+        raise ValidationError(f"同一球队的锁定球员不能超过{max_per_team}名")
+
+    locked = set(locked_ids)
+    pool = [
+        p
         for p in players_data
-        for pid in [p["id"]]
-        if (pid, "BENCH") in x
+        if p["id"] not in locked
+        and p["id"] not in excluded
+        and (remaining_cap is None or p["salary"] <= remaining_cap)
+    ]
+    remaining_slots = [
+        slot for slot in plan.starter_slots if slot not in locked_starters
+    ]
+
+    residual = solve_roster(
+        pool,
+        starter_slots=remaining_slots,
+        bench_size=plan.bench_size - len(locked_bench),
+        salary_cap=remaining_cap,
+        team_counts=team_counts,
+    )
+    if residual is None:
+        return None
+
+    roster = {
+        "starters": {},
+        "bench": [],
+        "total_rating": residual["total_rating"],
+        "total_salary": residual["total_salary"] + locked_salary,
+        "metrics": residual["metrics"],
+    }
+    for slot in plan.starter_slots:
+        if slot in locked_starters:
+            player = players_by_id[locked_starters[slot]]
+            roster["starters"][slot] = player
+            roster["total_rating"] += player["rating"] * 2
+        else:
+            roster["starters"][slot] = residual["starters"][slot]
+    for pid in locked_bench:
+        player = players_by_id[pid]
+        roster["bench"].append(player)
+        roster["total_rating"] += player["rating"]
+    roster["bench"].extend(residual["bench"])
+
+    return roster
+
+
+def _prune_dominated(players_data: List[Dict], keep_ids: set) -> List[Dict]:
+    """
+    剔除被足够多球员支配的球员
+
+    若至少有 ROSTER_SIZE + 1 名球员评分不低于、薪资不高于且可担任位置包含
+    某球员，则任意包含该球员的阵容都可以用未入选的支配者替换而不变差，
+    即使再排除一名球员也成立，因此该球员可以安全地从重复求解中剔除。
+
+    启用同队球员上限时支配者可能都来自已满员的球队，替换不再总是可行，
+    此时不做剔除。
+
+    Args:
+        players_data: 球员数据列表
+        keep_ids: 必须保留的球员ID
+
+    Returns:
+        剔除后的球员数据列表
+    """
+    plan = get_rule_plan()
+    if plan.max_per_team is not None:
+        return list(players_data)
+
+    position_map = plan.position_map
+    slots = [set(position_map.get(p["position"], [])) for p in players_data]
+    threshold = len(plan.starter_slots) + plan.bench_size + 1
+
+    pruned = []
+    for i, p in enumerate(players_data):
+        if p["id"] in keep_ids:
+            pruned.append(p)
+            continue
+        dominators = 0
+        for j, q in enumerate(players_data):
+            if j == i or q["rating"] < p["rating"] or q["salary"] > p["salary"]:
+                continue
+            if not slots[j] >= slots[i]:
+                continue
+            if q["rating"] == p["rating"] and q["salary"] == p["salary"] and j > i:
+                continue
+            dominators += 1
+            if dominators >= threshold:
+                break
+        if dominators < threshold:
+            pruned.append(p)
+    return pruned
+
+
+def _solve_with_player(
+    players_data: List[Dict], forced_id: int, role: str
+) -> Optional[Dict]:
+    """
+    求解指定球员以首发或替补身份入选时的最佳阵容
+
+    首发身份只要求球员占据任一可担任的首发位置，因此一次求解即可得到
+    该球员作为首发时的最佳阵容，无需逐个位置锁定。
+
+    Args:
+        players_data: 球员数据列表
+        forced_id: 必须入选的球员ID
+        role: "STARTER" 或 "BENCH"
+
+    Returns:
+        最佳阵容数据，无解返回None
+    """
+    plan = get_rule_plan()
+    prob, x, rating_expr, _ = _build_roster_model(
+        players_data, plan.starter_slots, plan.bench_size, plan.salary_cap
+    )
+    forced = [
+        var
+        for (pid, slot), var in x.items()
+        if pid == forced_id and (slot == "BENCH") == (role == "BENCH")
     ]
-    prob += pulp.lpSum(bench_vars) == 7, "Fill_Bench"
+    if not forced:
+        return None
+    prob.setObjective(rating_expr)
+    prob += pulp.lpSum(forced) == 1, "Force_Player"
 
     status = prob.solve(pulp.PULP_CBC_CMD(msg=0))
 
     if pulp.LpStatus[status] != "Optimal":
         return None
+    return _extract_roster(players_data, plan.starter_slots, x)
 
-    roster = {"starters": {}, "bench": [], "total_rating": 0, "total_salary": 0}
 
-    for p in players_data:
-        pid = p["id"]
+def _swap_gain_bounds(player: Dict, roster: Dict) -> Dict[str, float]:
+    """
+    用单次替换估算未入选球员进入阵容所需的评分提升上界
 
-        for slot in starter_slots:
-            if (pid, slot) in x and pulp.value(x[(pid, slot)]) == 1:
-                roster["starters"][slot] = p
-                roster["total_rating"] += p["rating"] * 2
-                roster["total_salary"] += p["salary"]
+    替换后的阵容须满足薪资上限和同队上限，因此是一个可行阵容，由它得到
+    的提升是精确值的上界。
 
-        if (pid, "BENCH") in x and pulp.value(x[(pid, "BENCH")]) == 1:
-            roster["bench"].append(p)
-            roster["total_rating"] += p["rating"]
-            roster["total_salary"] += p["salary"]
+    Args:
+        player: 未入选球员
+        roster: 最佳阵容
 
-    return roster
+    Returns:
+        首发位置或"BENCH" -> 所需评分提升的上界，不含没有可行替换的位置
+    """
+    plan = get_rule_plan()
+    salary_cap = plan.salary_cap
+    max_per_team = plan.max_per_team
+    team_counts = {}
+    for p in list(roster["starters"].values()) + roster["bench"]:
+        team_counts[p.get("team")] = team_counts.get(p.get("team"), 0) + 1
+
+    candidates = [
+        (roster["starters"][slot], slot)
+        for slot in plan.position_map.get(player["position"], [])
+        if slot in roster["starters"]
+    ]
+    candidates += [(p, "BENCH") for p in roster["bench"]]
+
+    bounds = {}
+    for out, role in candidates:
+        salary = roster["total_salary"] - out["salary"] + player["salary"]
+        if salary_cap is not None and salary > salary_cap:
+            continue
+        if max_per_team is not None and out.get("team") != player.get("team"):
+            if team_counts.get(player.get("team"), 0) + 1 > max_per_team:
+                continue
+        gain = out["rating"] - player["rating"]
+        if role not in bounds or gain < bounds[role]:
+            bounds[role] = gain
+    return bounds
+
+
+def analyze_sensitivity(
+    players_data: List[Dict], near_miss_limit: int = 10
+) -> Optional[Dict]:
+    """
+    分析最佳阵容对球员评分和薪资变化的敏感度
+
+    对入选球员计算评分下降多少、薪资上涨多少会被挤出阵容；对未入选球员
+    先用单次替换的上界筛选出最接近入选的若干名，再计算其入选所需的评分
+    提升。所有阈值均由少量残差问题的精确求解得到，上下界重合或另一身份
+    已不可能更优时跳过对应的求解。
+
+    Args:
+        players_data: 球员数据列表
+        near_miss_limit: 分析的落选球员数量
+
+    Returns:
+        敏感度分析结果，无解返回None
+    """
+    started_at = time.perf_counter()
+    plan = get_rule_plan()
+    best = solve_roster(players_data)
+    if best is None:
+        return None
+    solves = 1
+    settled = 0
+    best_rating = best["total_rating"]
+
+    selected = [(slot, p) for slot, p in best["starters"].items()]
+    selected += [("BENCH", p) for p in best["bench"]]
+    selected_ids = {p["id"] for _, p in selected}
+
+    bounds = []
+    for p in players_data:
+        if p["id"] in selected_ids:
+            continue
+        role_bounds = _swap_gain_bounds(p, best)
+        if role_bounds:
+            bounds.append((min(role_bounds.values()), p, role_bounds))
+    bounds.sort(key=lambda item: item[0])
+    near_misses = bounds[:near_miss_limit]
+
+    pool = _prune_dominated(
+        players_data, selected_ids | {p["id"] for _, p, _ in near_misses}
+    )
+
+    def total_rating(roster: Optional[Dict]) -> Optional[float]:
+        return roster["total_rating"] if roster else None
+
+    withouts = {}
+    for _, player in selected:
+        pid = player["id"]
+        withouts[pid] = total_rating(solve_roster([p for p in pool if p["id"] != pid]))
+        solves += 1
+
+    player_results = []
+    for role, player in selected:
+        pid = player["id"]
+        without = withouts[pid]
+
+        rating_drop = None
+        salary_rise = None
+        if without is not None:
+            rating_drop = best_rating - without
+            if role != "BENCH":
+                rating_drop /= 2
+                as_bench = total_rating(_solve_with_player(pool, pid, "BENCH"))
+                solves += 1
+                if as_bench is not None:
+                    rating_drop = max(rating_drop, as_bench - without)
+
+            cheapest = solve_min_salary_roster(pool, pid, without)
+            solves += 1
+            if cheapest is not None and plan.salary_cap is not None:
+                salary_rise = plan.salary_cap - cheapest["total_salary"]
+
+        player_results.append(
+            {
+                "id": pid,
+                "name": player["name"],
+                "position": player["position"],
+                "salary": player["salary"],
+                "rating": player["rating"],
+                "role": role,
+                "rating_drop_to_leave": (
+                    round(rating_drop, 2) if rating_drop is not None else None
+                ),
+                "salary_rise_to_leave": salary_rise,
+            }
+        )
+
+    # 包含落选球员的阵容必然缺少某名入选球员，评分不超过缺少该球员时的
+    # 最优值，由此得到以替补和首发身份入选所需提升的下界
+    ceiling = max((w for w in withouts.values() if w is not None), default=None)
+    if ceiling is None:
+        near_misses = []
+    else:
+        lower = {"STARTER": (best_rating - ceiling) / 2, "BENCH": best_rating - ceiling}
+
+    near_miss_results = []
+    for _, player, role_bounds in near_misses:
+        pid = player["id"]
+        # 各身份的上界及取得上界的位置
+        upper = {}
+        for slot, gain in role_bounds.items():
+            kind = "BENCH" if slot == "BENCH" else "STARTER"
+            if kind not in upper or gain < upper[kind][0]:
+                upper[kind] = (gain, slot)
+
+        kinds = []
+        if any(
+            slot in plan.starter_slots
+            for slot in plan.position_map.get(player["position"], [])
+        ):
+            kinds.append("STARTER")
+        if plan.bench_size > 0:
+            kinds.append("BENCH")
+        kinds.sort(key=lambda kind: upper.get(kind, (float("inf"),))[0])
+
+        options = []
+        for kind in kinds:
+            if options and lower[kind] >= min(options)[0] - SENSITIVITY_TOLERANCE:
+                # 已求得的提升不高于该身份的下界
+                settled += 1
+                continue
+            if kind in upper and upper[kind][0] - lower[kind] <= SENSITIVITY_TOLERANCE:
+                # 单次替换已达到下界，无需求解
+                settled += 1
+                options.append(upper[kind])
+                continue
+            roster = _solve_with_player(pool, pid, kind)
+            solves += 1
+            if roster is None:
+                continue
+            if kind == "BENCH":
+                options.append((best_rating - roster["total_rating"], "BENCH"))
+            else:
+                slot = next(s for s, p in roster["starters"].items() if p["id"] == pid)
+                options.append(((best_rating - roster["total_rating"]) / 2, slot))
+        if not options:
+            continue
+        rating_gain, role = min(options, key=lambda option: option[0])
+        near_miss_results.append(
+            {
+                "id": pid,
+                "name": player["name"],
+                "position": player["position"],
+                "salary": player["salary"],
+                "rating": player["rating"],
+                "role": role,
+                "rating_gain_to_enter": round(rating_gain, 2),
+            }
+        )
+    near_miss_results.sort(key=lambda item: item["rating_gain_to_enter"])
+
+    return {
+        "lineup": best,
+        "players": player_results,
+        "near_misses": near_miss_results,
+        "metrics": {
+            "solves": solves,
+            "settled_by_bounds": settled,
+            "pool_size": len(pool),
+            "pruned_players": len(players_data) - len(pool),
+            "elapsed_ms": round((time.perf_counter() - started_at) * 1000, 2),
+        },
+    }
 
 
 def get_best_lineup(target_date_str: str) -> Optional[Dict]:
@@ -223,3 +813,91 @@ def get_best_lineup(target_date_str: str) -> Optional[Dict]:
     if not players_data:
         return None
     return solve_roster(players_data)
+
+
+def get_completed_lineup(
+    target_date_str: str,
+    locked_starters: Dict[str, int],
+    locked_bench: List[int],
+    excluded_ids: List[int],
+) -> Optional[Dict]:
+    """
+    获取指定日期在锁定球员基础上的最佳补全阵容
+
+    Args:
+        target_date_str: 目标日期字符串
+        locked_starters: 已锁定的首发球员，位置 -> 球员ID
+        locked_bench: 已锁定的替补球员ID列表
+        excluded_ids: 排除的球员ID列表
+
+    Returns:
+        补全后的阵容数据，无解返回None
+    """
+    players_data = get_player_data(target_date_str)
+    if not players_data:
+        return None
+    return complete_roster(players_data, locked_starters, locked_bench, excluded_ids)
+
+
+def get_lineup_sensitivity(
+    target_date_str: str, near_miss_limit: int = 10
+) -> Optional[Dict]:
+    """
+    获取指定日期最佳阵容的敏感度分析
+
+    Args:
+        target_date_str: 目标日期字符串
+        near_miss_limit: 分析的落选球员数量
+
+    Returns:
+        敏感度分析结果，无解返回None
+    """
+    players_data = get_player_data(target_date_str)
+    if not players_data:
+        return None
+    return analyze_sensitivity(players_data, near_miss_limit)
+
+
+def get_risk_adjusted_lineup(target_date_str: str, risk: float) -> Optional[Dict]:
+    """
+    基于历史评分均值和标准差获取指定日期的风险调整阵容
+
+    候选球员为当日有比赛的球员，评分使用该日期之前的历史单场评分均值，
+    目标函数为阵容总分均值减去risk倍方差。
+
+    Args:
+        target_date_str: 目标日期字符串
+        risk: 风险系数，正数偏好稳定（下限），负数偏好爆发（上限）
+
+    Returns:
+        阵容数据，包含总评分标准差，无解返回None
+    """
+    players_data = get_player_data(target_date_str)
+    if not players_data:
+        return None
+
+    db = SessionLocal()
+    try:
+        moments = get_player_rating_moments(
+            db,
+            player_ids=[p["id"] for p in players_data],
+            before=date.fromisoformat(target_date_str),
+        )
+    finally:
+        db.close()
+
+    projected = []
+    for p in players_data:
+        games, mean, std = moments.get(p["id"], (0, 0.0, 0.0))
+        if games < MIN_HISTORY_GAMES:
+            continue
+        projected.append({**p, "rating": mean, "rating_std": std})
+
+    roster = solve_roster(projected, risk=risk)
+    if roster is None:
+        return None
+
+    variance = sum(4 * p["rating_std"] ** 2 for p in roster["starters"].values())
+    variance += sum(p["rating_std"] ** 2 for p in roster["bench"])
+    roster["total_rating_std"] = variance**0.5
+    return roster
@@ -0,0 +1,97 @@
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from app.core.logger import logger
+from app.models import PlayerInformation
+from app.utils.cache import VersionedCache, table_version
+from sqlalchemy.orm import Session
+
+
+class PlayerRecord(NamedTuple):
+    """球员维度数据，字段与 PlayerInformation.to_dict() 一致"""
+
+    id: int
+    player_id: int
+    full_name: str
+    team_name: str
+    position: str
+    salary: int
+
+    def to_dict(self) -> Dict:
+        return self._asdict()
+
+
+class PlayerDirectory:
+    """
+    球员维度表的只读内存副本
+
+    以 player_id 为键保存不可变的 PlayerRecord，同一 player_id 有多行时
+    保留ID最大的一行。实例构建后不再修改，刷新时整体替换，读取方不需要加锁。
+    """
+
+    def __init__(self, records: Iterable[PlayerRecord]):
+        self.players: Dict[int, PlayerRecord] = {}
+        for record in records:
+            self.players[record.player_id] = record
+        self.teams: Dict[str, List[PlayerRecord]] = {}
+        for record in self.players.values():
+            self.teams.setdefault(record.team_name, []).append(record)
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def get(self, player_id: int) -> Optional[PlayerRecord]:
+        """按球员ID获取，不存在返回None"""
+        return self.players.get(player_id)
+
+    def get_many(self, player_ids: Iterable[int]) -> Dict[int, PlayerRecord]:
+        """批量获取，不存在的球员不包含在结果中"""
+        players = self.players
+        return {pid: players[pid] for pid in player_ids if pid in players}
+
+    def all(self) -> List[PlayerRecord]:
+        """全部球员，按首次出现的顺序"""
+        return list(self.players.values())
+
+    def by_team(self, team_name: str) -> List[PlayerRecord]:
+        """指定球队的球员"""
+        return list(self.teams.get(team_name, ()))
+
+    def team_names(self) -> List[str]:
+        """球队名称，按首次出现的顺序"""
+        return list(self.teams)
+
+    def memory_bytes(self) -> int:
+        """
+        估算占用的内存字节数，包括字典、记录及记录中的字符串和整数
+
+        共享的对象(如驻留的短字符串)会被重复计算，因此结果偏大。
+        """
+        total = sys.getsizeof(self.players) + sys.getsizeof(self.teams)
+        total += sum(sys.getsizeof(players) for players in self.teams.values())
+        for record in self.players.values():
+            total += sys.getsizeof(record)
+            total += sum(sys.getsizeof(value) for value in record)
+        return total
+
+
+def _load_player_directory(db: Session) -> PlayerDirectory:
+    rows = db.query(
+        PlayerInformation.id,
+        PlayerInformation.player_id,
+        PlayerInformation.full_name,
+        PlayerInformation.team_name,
+        PlayerInformation.position,
+        PlayerInformation.salary,
+    ).order_by(PlayerInformation.id)
+    directory = PlayerDirectory(PlayerRecord(*row) for row in rows)
+    logger.info(
+        f"Player directory loaded: {len(directory)} players, "
+        f"~{directory.memory_bytes() / 1024:.1f} KiB"
+    )
+    return directory
+
+
+player_directory = VersionedCache(
+    "player_directory", _load_player_directory, table_version(PlayerInformation)
+)
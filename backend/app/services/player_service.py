@@ -1,8 +1,93 @@
 from typing import Dict, List, Optional
 
-from app.models import PlayerInformation
+from app.exceptions.base import ValidationError
+from app.models import PlayerConsistency, PlayerInformation, Team
+from app.services.player_cache import PlayerRecord, player_directory
+from app.utils.cache import VersionedCache, table_version
+from app.utils.pagination import paginate_query
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import Session
 
+PLAYER_COLUMNS = (
+    PlayerInformation.id,
+    PlayerInformation.player_id,
+    PlayerInformation.full_name,
+    PlayerInformation.team_name,
+    PlayerInformation.position,
+    PlayerInformation.salary,
+)
+PLAYER_SORT_KEYS = ("salary", "name", "rating")
+
+
+def register_teams(db: Session) -> int:
+    """
+    将球员信息中新出现的球队登记到teams表并提交
+
+    直接读取球员信息表而不是球员目录缓存，新球队按其在球员信息中的出现
+    顺序分配ID，已有球队的ID保持不变。以 INSERT ... ON CONFLICT DO NOTHING
+    执行，多个进程同时登记时不会冲突。在球员数据更新后由服务启动和夜间
+    任务调用，读取注册表时不再写入。
+
+    Args:
+        db: 数据库会话
+
+    Returns:
+        新登记的球队数量
+    """
+    current = db.execute(
+        select(PlayerInformation.team_name)
+        .group_by(PlayerInformation.team_name)
+        .order_by(func.min(PlayerInformation.id))
+    ).scalars()
+    known = set(db.execute(select(Team.team_name)).scalars())
+    new_teams = [name for name in current if name not in known]
+    if new_teams:
+        db.execute(
+            insert(Team).on_conflict_do_nothing(index_elements=[Team.team_name]),
+            [{"team_name": name} for name in new_teams],
+        )
+    db.commit()
+    team_registry.invalidate()
+    return len(new_teams)
+
+
+def _load_team_registry(db: Session) -> Dict:
+    """
+    加载球队注册表，只读取teams表，不做任何写入
+
+    不再有球员的球队保留ID，但不出现在球队列表中；尚未登记的球队在
+    register_teams 运行前也不出现。
+
+    Args:
+        db: 数据库会话
+
+    Returns:
+        包含 teams(球队列表) 和 names(球队ID -> 球队名) 的字典
+    """
+    active = set(player_directory.get(db).team_names())
+    rows = db.query(Team.id, Team.team_name).order_by(Team.id).all()
+    teams = [
+        {"team_id": team_id, "team_name": team_name}
+        for team_id, team_name in rows
+        if team_name in active
+    ]
+    return {
+        "teams": teams,
+        "names": {team["team_id"]: team["team_name"] for team in teams},
+    }
+
+
+_player_information_version = table_version(PlayerInformation)
+_team_version = table_version(Team)
+
+# 球队由其他进程(如夜间任务)登记时，teams表的版本变化使缓存失效
+team_registry = VersionedCache(
+    "team_registry",
+    _load_team_registry,
+    lambda db: (_player_information_version(db), _team_version(db)),
+)
+
 
 class PlayerService:
     """球员服务"""
@@ -13,29 +98,86 @@ class PlayerService:
         salary_min: int = 0,
         salary_max: int = 60000000,
         teams: Optional[List[str]] = None,
-    ) -> List[Dict]:
+        page: int = 1,
+        per_page: int = 10,
+        sort_by: str = "salary",
+        sort_order: str = "desc",
+    ) -> Dict:
         """
-        获取球员列表
+        分页获取球员列表
+
+        排序、分页和计数都在数据库端完成，只查询列表需要的列。赛季评分为
+        player_consistency 表中保存的单场评分均值，由夜间任务刷新，以外连接
+        加入分页查询，不再对比赛数据做聚合。
 
         Args:
             db: 数据库会话
             salary_min: 最低薪资
             salary_max: 最高薪资
             teams: 球队列表
+            page: 页码
+            per_page: 每页数量
+            sort_by: 排序字段 salary/name/rating
+            sort_order: 排序顺序 asc/desc
 
         Returns:
-            球员列表
+            包含 players 和 pagination 的字典，每名球员包含 season_rating，
+            尚未计算稳定性指标的球员为None
+
+        Raises:
+            ValidationError: 排序参数无效
+            PaginationError: 分页参数无效
         """
-        query = db.query(PlayerInformation).filter(
+        if sort_by not in PLAYER_SORT_KEYS:
+            raise ValidationError(f"无效的排序字段: {sort_by}")
+        if sort_order not in ("asc", "desc"):
+            raise ValidationError(f"无效的排序顺序: {sort_order}")
+
+        filters = [
             PlayerInformation.salary >= salary_min,
             PlayerInformation.salary <= salary_max,
-        )
-
+        ]
         if teams:
-            query = query.filter(PlayerInformation.team_name.in_(teams))
-
-        players = query.order_by(PlayerInformation.salary.desc()).all()
-        return [player.to_dict() for player in players]
+            filters.append(PlayerInformation.team_name.in_(teams))
+
+        count_query = db.query(func.count(PlayerInformation.id)).filter(*filters)
+
+        # 赛季评分取夜间任务保存的稳定性指标均值，与列表在同一次查询中关联
+        season_rating = PlayerConsistency.rating_mean.label("season_rating")
+        query = (
+            db.query(*PLAYER_COLUMNS, season_rating)
+            .outerjoin(
+                PlayerConsistency,
+                PlayerConsistency.player_id == PlayerInformation.player_id,
+            )
+            .filter(*filters)
+        )
+        sort_column = {
+            "salary": PlayerInformation.salary,
+            "name": PlayerInformation.full_name,
+            "rating": PlayerConsistency.rating_mean,
+        }[sort_by]
+
+        order = sort_column.desc() if sort_order == "desc" else sort_column.asc()
+        if sort_by == "rating":
+            order = order.nulls_last()
+        query = query.order_by(order, PlayerInformation.id)
+
+        def to_players(rows) -> List[Dict]:
+            players = [row._asdict() for row in rows]
+            for player in players:
+                if player["season_rating"] is not None:
+                    player["season_rating"] = round(player["season_rating"], 2)
+            return players
+
+        return paginate_query(
+            query,
+            page,
+            per_page,
+            "players",
+            count_query=count_query,
+            transform=to_players,
+        )
 
     @staticmethod
     def get_teams(db: Session) -> List[Dict]:
@@ -48,11 +190,7 @@ class PlayerService:
         Returns:
             球队列表
         """
-        teams = db.query(PlayerInformation.team_name).distinct().all()
-        teams_list = []
-        for i, team in enumerate(teams, 1):
-            teams_list.append({"team_id": i, "team_name": team[0]})
-        return teams_list
+        return list(team_registry.get(db)["teams"])
 
     @staticmethod
     def get_team_players(db: Session, team_id: int) -> List[Dict]:
@@ -69,18 +207,16 @@ class PlayerService:
         Raises:
             ValidationError: 无效的球队ID
         """
-        teams = db.query(PlayerInformation.team_name).distinct().all()
-        if team_id <= 0 or team_id > len(teams):
-            from app.exceptions.base import ValidationError
-
+        team_name = team_registry.get(db)["names"].get(team_id)
+        if team_name is None:
             raise ValidationError("Invalid team ID")
 
-        team_name = teams[team_id - 1][0]
-        players = db.query(PlayerInformation).filter_by(team_name=team_name).all()
-        return [player.to_dict() for player in players]
+        return [
+            player.to_dict() for player in player_directory.get(db).by_team(team_name)
+        ]
 
     @staticmethod
-    def get_player_by_id(db: Session, player_id: int) -> Optional[PlayerInformation]:
+    def get_player_by_id(db: Session, player_id: int) -> Optional[PlayerRecord]:
         """
         通过ID获取球员
 
@@ -91,4 +227,4 @@ class PlayerService:
         Returns:
             球员对象，不存在返回None
         """
-        return db.query(PlayerInformation).filter_by(player_id=player_id).first()
+        return player_directory.get(db).get(player_id)
@@ -0,0 +1,288 @@
+import json
+from abc import ABC, abstractmethod
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+DEFAULT_RULE_DEFINITIONS = [
+    {
+        "type": "roster_size",
+        "description": "球员数量限制",
+        "starters": 5,
+        "bench": 7,
+    },
+    {"type": "unique_players", "description": "球员不可重复"},
+    {
+        "type": "starter_slots",
+        "description": "首发位置限制",
+        "slots": ["PG", "SG", "SF", "PF", "C"],
+        "position_map": {
+            "Guard": ["PG", "SG"],
+            "Guard-Forward": ["SG", "SF"],
+            "Forward-Guard": ["SG", "SF"],
+            "Forward": ["SF", "PF"],
+            "Forward-Center": ["PF", "C"],
+            "Center-Forward": ["PF", "C"],
+            "Center": ["C"],
+        },
+    },
+    {"type": "salary_cap", "description": "薪资限制", "max_salary": 187895000},
+]
+
+
+class Rule(ABC):
+    """规则基类"""
+
+    rule_type: str = ""
+    message: str = "阵容不符合规则"
+
+    def __init__(self, description: str, message: Optional[str] = None):
+        self.description = description
+        if message:
+            self.message = message
+
+    @classmethod
+    def from_definition(cls, definition: Dict) -> "Rule":
+        """由规则定义创建规则"""
+        params = {
+            key: value
+            for key, value in definition.items()
+            if key not in ("type", "description", "message")
+        }
+        rule = cls(**params)
+        rule.description = definition.get("description", rule.description)
+        rule.message = definition.get("message", rule.message)
+        return rule
+
+    @abstractmethod
+    def verify(self, starting_players: list, bench_players: list) -> bool:
+        pass
+
+    def params(self) -> Dict:
+        return {}
+
+    def to_dict(self) -> Dict:
+        return {
+            "type": self.rule_type,
+            "description": self.description,
+            "message": self.message,
+            **self.params(),
+        }
+
+
+class SalaryRule(Rule):
+    """薪资规则"""
+
+    rule_type = "salary_cap"
+    message = "阵容薪资超过限制"
+
+    def __init__(self, max_salary: int):
+        super().__init__("薪资限制")
+        self.max_salary = max_salary
+
+    def verify(self, starting_players: list, bench_players: list) -> bool:
+        total_salary = sum(p.get("salary", 0) for p in starting_players + bench_players)
+        return total_salary <= self.max_salary
+
+    def params(self) -> Dict:
+        return {"max_salary": self.max_salary}
+
+
+class PlayerCountRule(Rule):
+    """球员数量规则"""
+
+    rule_type = "roster_size"
+    message = "球员数量不符合规则"
+
+    def __init__(self, starters: int, bench: int):
+        super().__init__("球员数量限制")
+        self.starting_player_count = starters
+        self.bench_player_count = bench
+
+    def verify(self, starting_players: list, bench_players: list) -> bool:
+        starting_players = len(starting_players)
+        bench_players = len(bench_players)
+        return (
+            self.starting_player_count == starting_players
+            and self.bench_player_count == bench_players
+        )
+
+    def params(self) -> Dict:
+        return {
+            "starters": self.starting_player_count,
+            "bench": self.bench_player_count,
+        }
+
+
+class DuplicatePlayerRule(Rule):
+    """重复球员规则"""
+
+    rule_type = "unique_players"
+    message = "阵容中存在重复球员"
+
+    def __init__(self):
+        super().__init__("球员不可重复")
+
+    def verify(self, starting_players: list, bench_players: list) -> bool:
+        player_ids = [p.get("player_id") for p in starting_players + bench_players]
+        return len(player_ids) == len(set(player_ids))
+
+
+class SlotEligibilityRule(Rule):
+    """首发位置规则"""
+
+    rule_type = "starter_slots"
+    message = "首发球员位置不符合规则"
+
+    def __init__(self, slots: List[str], position_map: Dict[str, List[str]]):
+        super().__init__("首发位置限制")
+        self.starter_slots = list(slots)
+        self.position_map = {
+            position: list(eligible) for position, eligible in position_map.items()
+        }
+        self._required = Counter(self.starter_slots)
+        self._eligible = {
+            position: frozenset(eligible)
+            for position, eligible in self.position_map.items()
+        }
+
+    def verify(self, starting_players: list, bench_players: list) -> bool:
+        if Counter(p.get("slot") for p in starting_players) != self._required:
+            return False
+        return all(
+            p.get("slot") in self._eligible.get(p.get("position"), ())
+            for p in starting_players
+        )
+
+    def params(self) -> Dict:
+        return {"slots": self.starter_slots, "position_map": self.position_map}
+
+
+class MaxPerTeamRule(Rule):
+    """同队球员数量规则"""
+
+    rule_type = "max_per_team"
+    message = "同一球队的球员数量超过限制"
+
+    def __init__(self, max_players: int):
+        super().__init__("同队球员上限")
+        self.max_players = max_players
+
+    def verify(self, starting_players: list, bench_players: list) -> bool:
+        counts = Counter(p.get("team_name") for p in starting_players + bench_players)
+        return max(counts.values(), default=0) <= self.max_players
+
+    def params(self) -> Dict:
+        return {"max_players": self.max_players}
+
+
+RULE_TYPES = {
+    rule.rule_type: rule
+    for rule in (
+        SalaryRule,
+        PlayerCountRule,
+        DuplicatePlayerRule,
+        SlotEligibilityRule,
+        MaxPerTeamRule,
+    )
+}
+
+
+class RulePlan:
+    """
+    由规则定义编译得到的验证计划
+
+    规则按定义顺序执行，每条规则对阵容只遍历一次，返回第一条未通过的规则。
+    同时暴露优化器需要的参数(首发位置、替补人数、薪资上限、同队上限)。
+    """
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        by_type = {rule.rule_type: rule for rule in rules}
+        if "roster_size" not in by_type or "starter_slots" not in by_type:
+            raise ValueError("规则配置必须包含 roster_size 和 starter_slots")
+
+        roster_size = by_type["roster_size"]
+        starter_slots = by_type["starter_slots"]
+        if roster_size.starting_player_count != len(starter_slots.starter_slots):
+            raise ValueError("首发人数与首发位置数量不一致")
+
+        self.starter_slots = starter_slots.starter_slots
+        self.position_map = starter_slots.position_map
+        self.bench_size = roster_size.bench_player_count
+        self.salary_cap = (
+            by_type["salary_cap"].max_salary if "salary_cap" in by_type else None
+        )
+        self.max_per_team = (
+            by_type["max_per_team"].max_players if "max_per_team" in by_type else None
+        )
+
+    def evaluate(self, starting_players: list, bench_players: list) -> Tuple[bool, str]:
+        """
+        验证阵容
+
+        Args:
+            starting_players: 首发球员列表
+            bench_players: 替补球员列表
+
+        Returns:
+            (是否有效, 错误消息)
+        """
+        for rule in self.rules:
+            if not rule.verify(starting_players, bench_players):
+                return False, rule.message
+        return True, ""
+
+    def to_dict(self) -> List[Dict]:
+        return [rule.to_dict() for rule in self.rules]
+
+
+def compile_rules(definitions: List[Dict]) -> RulePlan:
+    """
+    将规则定义编译为验证计划
+
+    Args:
+        definitions: 规则定义列表，每项包含type及该类型的参数
+
+    Returns:
+        验证计划
+
+    Raises:
+        ValueError: 规则类型未知或参数不合法
+    """
+    rules = []
+    for definition in definitions:
+        rule_class = RULE_TYPES.get(definition.get("type"))
+        if rule_class is None:
+            raise ValueError(f"未知的规则类型: {definition.get('type')}")
+        try:
+            rules.append(rule_class.from_definition(definition))
+        except TypeError as e:
+            raise ValueError(f"规则 {definition['type']} 参数不合法: {e}")
+    return RulePlan(rules)
+
+
+def load_rule_definitions() -> List[Dict]:
+    """
+    读取规则定义，配置了 LINEUP_RULES_FILE 时从该JSON文件读取，否则使用默认规则
+
+    Returns:
+        规则定义列表
+    """
+    if settings.lineup_rules_file:
+        with open(settings.lineup_rules_file, encoding="utf-8") as f:
+            return json.load(f)
+    return DEFAULT_RULE_DEFINITIONS
+
+
+@lru_cache(maxsize=1)
+def get_rule_plan() -> RulePlan:
+    """
+    获取进程内共享的验证计划，规则只在首次调用时加载和编译
+
+    Returns:
+        验证计划
+    """
+    return compile_rules(load_rule_definitions())
@@ -0,0 +1,418 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.core.logger import logger
+from app.exceptions.base import ValidationError
+from app.models import (
+    DailyOptimalScore,
+    Lineup,
+    LineupPlayer,
+    PlayerGameStats,
+    PlayerMissedValue,
+    User,
+    UserStanding,
+)
+from app.services.optimization_service import get_best_lineup
+from app.services.stats_service import game_score_expression
+from app.utils.pagination import calculate_offset, paginate_query
+from sqlalchemy import and_, case, func, or_, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+
+def beijing_today():
+    """北京时间的今天，早于该日期的比赛视为已结束"""
+    return (datetime.utcnow() + timedelta(hours=8)).date()
+
+
+def lineup_score_query(db: Session, date_obj):
+    """
+    一次查询计算指定日期每个阵容的实际得分，首发系数为2，替补系数为1
+
+    未出场的球员计0分，因此没有任何出场球员的阵容得分为0。
+
+    Args:
+        db: 数据库会话
+        date_obj: 比赛日期
+
+    Returns:
+        返回(阵容ID, 用户ID, 原得分, 原排名, 实际得分)的查询
+    """
+    weighted_score = case((LineupPlayer.is_starting, 2), else_=1) * func.coalesce(
+        game_score_expression(), 0
+    )
+    return (
+        db.query(
+            Lineup.id,
+            Lineup.user_id,
+            Lineup.actual_score,
+            Lineup.rank,
+            func.coalesce(func.sum(weighted_score), 0).label("score"),
+        )
+        .outerjoin(LineupPlayer, LineupPlayer.lineup_id == Lineup.id)
+        .outerjoin(
+            PlayerGameStats,
+            and_(
+                PlayerGameStats.personId == LineupPlayer.player_id,
+                PlayerGameStats.game_date == Lineup.date,
+            ),
+        )
+        .filter(Lineup.date == date_obj)
+        .group_by(Lineup.id)
+    )
+
+
+def write_gap_analytics(db: Session, date_obj, best: Optional[Dict]) -> int:
+    """
+    写入指定日期的差距分析结果，不提交事务
+
+    以集合操作完成：一条UPDATE为全部已计分阵容写入与最佳阵容的差距；
+    一次分组查询统计最佳阵容中每名球员被多少阵容选中，据此计算错失价值
+    (该球员在最佳阵容中的加权得分 x 未选择他的阵容数)。
+
+    Args:
+        db: 数据库会话
+        date_obj: 比赛日期
+        best: 当日最佳阵容，None表示无解
+
+    Returns:
+        写入的错失价值记录数
+    """
+    db.query(PlayerMissedValue).filter(PlayerMissedValue.date == date_obj).delete(
+        synchronize_session=False
+    )
+    if best is None:
+        db.execute(
+            update(Lineup).where(Lineup.date == date_obj).values(gap_to_optimal=None)
+        )
+        return 0
+
+    db.execute(
+        update(Lineup)
+        .where(Lineup.date == date_obj, Lineup.actual_score.isnot(None))
+        .values(gap_to_optimal=round(best["total_rating"], 2) - Lineup.actual_score)
+    )
+
+    optimal = [(slot, player, 2) for slot, player in best["starters"].items()]
+    optimal += [("BENCH", player, 1) for player in best["bench"]]
+    optimal_ids = [player["id"] for _, player, _ in optimal]
+
+    total_lineups = (
+        db.query(func.count(Lineup.id)).filter(Lineup.date == date_obj).scalar()
+    )
+    picked = dict(
+        db.query(LineupPlayer.player_id, func.count(LineupPlayer.id))
+        .join(Lineup, Lineup.id == LineupPlayer.lineup_id)
+        .filter(Lineup.date == date_obj, LineupPlayer.player_id.in_(optimal_ids))
+        .group_by(LineupPlayer.player_id)
+        .all()
+    )
+
+    rows = []
+    for role, player, weight in optimal:
+        value = player["rating"] * weight
+        lineups_missed = total_lineups - picked.get(player["id"], 0)
+        rows.append(
+            {
+                "date": date_obj,
+                "player_id": player["id"],
+                "full_name": player["name"],
+                "role": role,
+                "rating": player["rating"],
+                "value": value,
+                "lineups_missed": lineups_missed,
+                "missed_value": value * lineups_missed,
+            }
+        )
+    db.execute(insert(PlayerMissedValue), rows)
+    return len(rows)
+
+
+def rank_scores(scores: List[float]) -> List[int]:
+    """
+    按得分由高到低计算排名，同分同名次(1, 2, 2, 4)
+
+    Args:
+        scores: 得分列表
+
+    Returns:
+        与输入顺序对应的排名列表
+    """
+    order = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+    ranks = [0] * len(scores)
+    for position, index in enumerate(order):
+        if position > 0 and scores[index] == scores[order[position - 1]]:
+            ranks[index] = ranks[order[position - 1]]
+        else:
+            ranks[index] = position + 1
+    return ranks
+
+
+class ScoringService:
+    """阵容计分与积分榜服务"""
+
+    @staticmethod
+    def score_date(db: Session, date_str: str) -> Dict:
+        """
+        为指定日期的全部阵容计分、排名，并增量更新用户积分榜
+
+        重复计分同一日期时只把新旧得分的差值计入积分榜，
+        因此比赛数据修正后可以安全地重新计分。同时求解并保存当日最佳阵容
+        得分，供阵容与最优解的差距计算使用。全部写入在同一个事务内提交。
+
+        Args:
+            db: 数据库会话
+            date_str: 日期字符串
+
+        Returns:
+            计分结果摘要
+
+        Raises:
+            ValidationError: 日期格式无效、日期尚未结束或该日期没有比赛数据
+        """
+        if not date_str:
+            raise ValidationError("日期参数不能为空")
+        try:
+            date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            raise ValidationError("日期格式不正确，请使用 YYYY-MM-DD 格式")
+        if date_obj >= beijing_today():
+            raise ValidationError(f"{date_str} 的比赛尚未全部结束，无法计分")
+
+        has_stats = db.query(
+            db.query(PlayerGameStats.id)
+            .filter(PlayerGameStats.game_date == date_obj)
+            .exists()
+        ).scalar()
+        if not has_stats:
+            raise ValidationError(f"{date_str} 暂无比赛数据，无法计分")
+
+        # 先完成只读的求解，再在一个短事务内写入
+        best = get_best_lineup(date_str)
+        optimal_score = round(best["total_rating"], 2) if best else None
+        if best is not None:
+            statement = insert(DailyOptimalScore).values(
+                date=date_obj,
+                optimal_score=optimal_score,
+                total_salary=best["total_salary"],
+                computed_at=datetime.utcnow(),
+            )
+            db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[DailyOptimalScore.date],
+                    set_={
+                        "optimal_score": statement.excluded.optimal_score,
+                        "total_salary": statement.excluded.total_salary,
+                        "computed_at": statement.excluded.computed_at,
+                    },
+                )
+            )
+
+        rows = lineup_score_query(db, date_obj).all()
+        if not rows:
+            db.commit()
+            return {
+                "date": date_str,
+                "lineups_scored": 0,
+                "users_updated": 0,
+                "top_score": None,
+                "optimal_score": optimal_score,
+            }
+
+        scores = [round(float(row.score), 2) for row in rows]
+        ranks = rank_scores(scores)
+
+        updates = []
+        deltas = defaultdict(
+            lambda: {"lineups_scored": 0, "total_score": 0.0, "wins": 0}
+        )
+        for row, score, rank in zip(rows, scores, ranks):
+            updates.append({"id": row.id, "actual_score": score, "rank": rank})
+            # 重新计分的阵容先扣除原得分和原名次，再计入新值
+            delta = deltas[row.user_id]
+            delta["total_score"] += score - (row.actual_score or 0.0)
+            if row.actual_score is None:
+                delta["lineups_scored"] += 1
+            delta["wins"] += int(rank == 1) - int(row.rank == 1)
+
+        db.execute(update(Lineup), updates)
+        write_gap_analytics(db, date_obj, best)
+
+        now = datetime.utcnow()
+        statement = insert(UserStanding).values(
+            [
+                {"user_id": user_id, "updated_at": now, **delta}
+                for user_id, delta in deltas.items()
+            ]
+        )
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[UserStanding.user_id],
+                set_={
+                    "lineups_scored": UserStanding.lineups_scored
+                    + statement.excluded.lineups_scored,
+                    "total_score": UserStanding.total_score
+                    + statement.excluded.total_score,
+                    "wins": UserStanding.wins + statement.excluded.wins,
+                    "updated_at": statement.excluded.updated_at,
+                },
+            )
+        )
+        db.commit()
+
+        logger.info(
+            f"Scored {len(updates)} lineups for {date_str}, "
+            f"{len(deltas)} users updated"
+        )
+        return {
+            "date": date_str,
+            "lineups_scored": len(updates),
+            "users_updated": len(deltas),
+            "top_score": max(scores),
+            "optimal_score": optimal_score,
+        }
+
+    @staticmethod
+    def run_nightly(db: Session) -> List[Dict]:
+        """
+        夜间计分流程：为所有已结束且尚未完成计分的日期计分并生成差距分析
+
+        已结束指北京时间今天之前的日期；尚未完成指没有最佳阵容得分或仍有
+        未计分的阵容。没有比赛数据的日期会被跳过。
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            每个处理日期的计分结果摘要
+        """
+        today = beijing_today()
+        pending = (
+            db.query(Lineup.date)
+            .outerjoin(DailyOptimalScore, DailyOptimalScore.date == Lineup.date)
+            .filter(Lineup.date < today)
+            .group_by(Lineup.date)
+            .having(
+                or_(
+                    func.max(DailyOptimalScore.optimal_score).is_(None),
+                    func.count(Lineup.id) > func.count(Lineup.actual_score),
+                )
+            )
+            .order_by(Lineup.date)
+            .all()
+        )
+
+        results = []
+        for (date_obj,) in pending:
+            date_str = date_obj.isoformat()
+            try:
+                results.append(ScoringService.score_date(db, date_str))
+            except ValidationError as e:
+                logger.warning(f"Skipped scoring {date_str}: {e}")
+        logger.info(f"Nightly scoring finished: {len(results)} dates scored")
+        return results
+
+    @staticmethod
+    def get_most_missed_players(
+        db: Session,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[Dict]:
+        """
+        按错失价值汇总最常被错过的最佳阵容球员
+
+        Args:
+            db: 数据库会话
+            date_from: 起始日期(含)
+            date_to: 结束日期(含)
+            limit: 返回数量
+
+        Returns:
+            球员错失价值汇总列表
+
+        Raises:
+            ValidationError: 日期格式无效
+        """
+        query = db.query(
+            PlayerMissedValue.player_id,
+            func.max(PlayerMissedValue.full_name).label("full_name"),
+            func.count(PlayerMissedValue.id).label("optimal_days"),
+            func.sum(PlayerMissedValue.value).label("optimal_value"),
+            func.sum(PlayerMissedValue.lineups_missed).label("lineups_missed"),
+            func.sum(PlayerMissedValue.missed_value).label("missed_value"),
+        )
+        try:
+            if date_from:
+                query = query.filter(
+                    PlayerMissedValue.date
+                    >= datetime.strptime(date_from, "%Y-%m-%d").date()
+                )
+            if date_to:
+                query = query.filter(
+                    PlayerMissedValue.date
+                    <= datetime.strptime(date_to, "%Y-%m-%d").date()
+                )
+        except ValueError:
+            raise ValidationError("日期格式不正确，请使用 YYYY-MM-DD 格式")
+
+        rows = (
+            query.group_by(PlayerMissedValue.player_id)
+            .order_by(func.sum(PlayerMissedValue.missed_value).desc())
+            .limit(limit)
+            .all()
+        )
+        return [
+            {
+                "player_id": row.player_id,
+                "full_name": row.full_name,
+                "optimal_days": row.optimal_days,
+                "optimal_value": round(row.optimal_value, 2),
+                "lineups_missed": row.lineups_missed,
+                "missed_value": round(row.missed_value, 2),
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def get_standings(db: Session, page: int = 1, per_page: int = 10) -> Dict:
+        """
+        分页获取用户累计积分榜
+
+        Args:
+            db: 数据库会话
+            page: 页码
+            per_page: 每页数量
+
+        Returns:
+            包含积分榜和分页信息的字典
+        """
+        query = (
+            db.query(UserStanding, User.username)
+            .outerjoin(User, User.id == UserStanding.user_id)
+            .order_by(
+                UserStanding.total_score.desc(),
+                UserStanding.wins.desc(),
+                UserStanding.user_id.asc(),
+            )
+        )
+        offset = calculate_offset(page, per_page)
+
+        def serialize(rows) -> List[Dict]:
+            result = []
+            for position, (standing, username) in enumerate(rows, start=offset + 1):
+                item = standing.to_dict()
+                item["rank"] = position
+                item["username"] = username if username else "未知用户"
+                result.append(item)
+            return result
+
+        return paginate_query(
+            query,
+            page,
+            per_page,
+            "standings",
+            count_query=db.query(func.count(UserStanding.user_id)),
+            transform=serialize,
+        )
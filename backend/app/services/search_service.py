@@ -0,0 +1,159 @@
+import heapq
+import re
+import unicodedata
+from typing import Dict, List, Set
+
+from app.models import PlayerInformation
+from app.services.player_cache import player_directory
+from app.utils.cache import VersionedCache, table_version
+from sqlalchemy.orm import Session
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_name(text: str) -> str:
+    """
+    规范化名称：去除重音符号、统一大小写，非字母数字字符视为分隔符
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        规范化后的文本，单词之间以一个空格分隔
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", stripped.casefold()).strip()
+
+
+def trigrams(token: str) -> Set[str]:
+    """返回单词的全部三字母组"""
+    return {token[i : i + 3] for i in range(len(token) - 2)}
+
+
+class PlayerSearchIndex:
+    """
+    球员姓名的内存检索索引
+
+    长度不少于3的查询词通过三字母组倒排表取交集得到候选，较短的查询词通过
+    单词前缀表查找，最后逐个校验候选并排序。候选集合通常只有几十项，因此
+    单次查询不随球员总数线性增长。
+    """
+
+    def __init__(self, players: List[Dict]):
+        self.players = players
+        self.names = [normalize_name(p["full_name"]) for p in players]
+        self.tokens = [name.split() for name in self.names]
+        self.trigram_postings: Dict[str, Set[int]] = {}
+        self.prefix_postings: Dict[str, Set[int]] = {}
+
+        for index, tokens in enumerate(self.tokens):
+            for token in tokens:
+                for gram in trigrams(token):
+                    self.trigram_postings.setdefault(gram, set()).add(index)
+                for length in (1, 2):
+                    if len(token) >= length:
+                        self.prefix_postings.setdefault(token[:length], set()).add(
+                            index
+                        )
+
+    def _candidates(self, token: str) -> Set[int]:
+        if len(token) < 3:
+            return self.prefix_postings.get(token, set())
+        postings = sorted(
+            (self.trigram_postings.get(gram, set()) for gram in trigrams(token)),
+            key=len,
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    def _rank(self, index: int, query: str, query_tokens: List[str]):
+        """
+        计算排序键，不匹配返回None
+
+        每个查询词需为某个单词的前缀(短查询词)或姓名的子串(长查询词)。
+        排序依次为：完全匹配、整名前缀、全部查询词均为单词前缀、姓名长度。
+        """
+        name = self.names[index]
+        tokens = self.tokens[index]
+        all_prefix = True
+        for token in query_tokens:
+            is_prefix = any(word.startswith(token) for word in tokens)
+            if not is_prefix:
+                if len(token) < 3 or token not in name:
+                    return None
+                all_prefix = False
+        return (
+            name != query,
+            not name.startswith(query),
+            not all_prefix,
+            len(name),
+            name,
+        )
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        检索球员
+
+        Args:
+            query: 查询文本，不区分大小写和重音
+            limit: 返回数量
+
+        Returns:
+            按相关度排序的球员列表
+        """
+        normalized = normalize_name(query)
+        query_tokens = normalized.split()
+        if not query_tokens:
+            return []
+
+        candidates = None
+        for token in sorted(query_tokens, key=len, reverse=True):
+            found = self._candidates(token)
+            candidates = set(found) if candidates is None else candidates & found
+            if not candidates:
+                return []
+
+        ranked = (
+            (key, index)
+            for index in candidates
+            for key in (self._rank(index, normalized, query_tokens),)
+            if key is not None
+        )
+        return [self.players[index] for _, index in heapq.nsmallest(limit, ranked)]
+
+
+def _build_player_search_index(db: Session) -> PlayerSearchIndex:
+    return PlayerSearchIndex(
+        [player.to_dict() for player in player_directory.get(db).all()]
+    )
+
+
+player_search_index = VersionedCache(
+    "player_search_index",
+    _build_player_search_index,
+    table_version(PlayerInformation),
+)
+
+
+class SearchService:
+    """球员检索服务"""
+
+    @staticmethod
+    def search_players(db: Session, query: str, limit: int = 10) -> List[Dict]:
+        """
+        按姓名检索球员
+
+        Args:
+            db: 数据库会话
+            query: 查询文本
+            limit: 返回数量
+
+        Returns:
+            按相关度排序的球员列表
+        """
+        return player_search_index.get(db).search(query, limit)
@@ -0,0 +1,285 @@
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from app.exceptions.base import ValidationError
+from app.models import Lineup, LineupPlayer, PlayerGameStats, User
+from app.services.lineup_service import LineupService
+from app.services.stats_service import game_score_expression
+from sqlalchemy.orm import Session
+
+PERCENTILES = [5, 10, 25, 50, 75, 90, 95]
+TRIAL_CHUNK = 5000
+
+
+def load_rating_samples(
+    db: Session, player_ids: List[int], before: Optional[date] = None
+) -> Dict[int, np.ndarray]:
+    """
+    一次查询加载多名球员的历史单场评分
+
+    Args:
+        db: 数据库会话
+        player_ids: 球员ID列表
+        before: 只使用该日期之前的比赛，None表示使用全部比赛
+
+    Returns:
+        球员ID -> 单场评分数组
+    """
+    if not player_ids:
+        return {}
+
+    query = db.query(PlayerGameStats.personId, game_score_expression()).filter(
+        PlayerGameStats.personId.in_(set(player_ids))
+    )
+    if before is not None:
+        query = query.filter(PlayerGameStats.game_date < before)
+
+    ratings = defaultdict(list)
+    for player_id, rating in query:
+        ratings[player_id].append(rating)
+    return {
+        player_id: np.asarray(values, dtype=np.float32)
+        for player_id, values in ratings.items()
+    }
+
+
+def sample_player_scores(
+    samples: Dict[int, np.ndarray],
+    player_ids: List[int],
+    trials: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    对每名球员的历史评分进行有放回抽样
+
+    同一次试验中同一球员只抽样一次，因此包含相同球员的阵容在该次试验中
+    得到相同的表现，比较阵容时保留了这种相关性。没有历史数据的球员记为0分。
+
+    Args:
+        samples: 球员ID -> 单场评分数组
+        player_ids: 参与抽样的球员ID，决定结果的行顺序
+        trials: 试验次数
+        rng: 随机数生成器
+
+    Returns:
+        形状为(球员数, 试验次数)的评分矩阵
+    """
+    scores = np.zeros((len(player_ids), trials), dtype=np.float32)
+    for row, player_id in enumerate(player_ids):
+        history = samples.get(player_id)
+        if history is None or len(history) == 0:
+            continue
+        scores[row] = history[rng.integers(0, len(history), size=trials)]
+    return scores
+
+
+def summarize_totals(totals: np.ndarray) -> Dict:
+    """
+    汇总单个阵容的模拟得分分布
+
+    Args:
+        totals: 每次试验的阵容总分
+
+    Returns:
+        均值、标准差和分位数
+    """
+    percentiles = np.percentile(totals, PERCENTILES)
+    return {
+        "mean": round(float(totals.mean()), 2),
+        "std": round(float(totals.std()), 2),
+        "min": round(float(totals.min()), 2),
+        "max": round(float(totals.max()), 2),
+        "percentiles": {
+            f"p{p}": round(float(value), 2)
+            for p, value in zip(PERCENTILES, percentiles)
+        },
+    }
+
+
+def _parse_date(date_str: Optional[str]) -> Optional[date]:
+    """
+    解析可选的日期参数
+
+    Args:
+        date_str: 日期字符串，格式为 YYYY-MM-DD
+
+    Returns:
+        日期对象，参数为空时返回None
+
+    Raises:
+        ValidationError: 日期格式无效
+    """
+    if not date_str:
+        return None
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValidationError("日期格式不正确，请使用 YYYY-MM-DD 格式")
+
+
+def _weight_matrix(
+    rosters: List[Tuple[List[int], List[int]]], player_ids: List[int]
+) -> np.ndarray:
+    """
+    构建阵容 x 球员的权重矩阵，首发系数为2，替补系数为1
+    """
+    column = {player_id: i for i, player_id in enumerate(player_ids)}
+    weights = np.zeros((len(rosters), len(player_ids)), dtype=np.float32)
+    for row, (starter_ids, bench_ids) in enumerate(rosters):
+        for player_id in starter_ids:
+            weights[row, column[player_id]] += 2
+        for player_id in bench_ids:
+            weights[row, column[player_id]] += 1
+    return weights
+
+
+class SimulationService:
+    """阵容得分模拟服务"""
+
+    @staticmethod
+    def simulate_lineup(
+        db: Session,
+        starter_ids: List[int],
+        bench_ids: List[int],
+        opponent: Optional[Tuple[List[int], List[int]]] = None,
+        date_str: Optional[str] = None,
+        trials: int = 20000,
+        seed: Optional[int] = None,
+    ) -> Dict:
+        """
+        模拟阵容得分分布，并可计算相对另一阵容的胜率
+
+        Args:
+            db: 数据库会话
+            starter_ids: 首发球员ID
+            bench_ids: 替补球员ID
+            opponent: 对手阵容(首发球员ID, 替补球员ID)
+            date_str: 比赛日期，只使用该日期之前的历史数据
+            trials: 试验次数
+            seed: 随机种子
+
+        Returns:
+            模拟结果
+
+        Raises:
+            ValidationError: 参数验证失败
+        """
+        if not starter_ids and not bench_ids:
+            raise ValidationError("阵容至少需要一名球员")
+
+        rosters = [(starter_ids, bench_ids)]
+        if opponent is not None:
+            rosters.append(opponent)
+
+        player_ids = sorted(
+            {pid for roster in rosters for ids in roster for pid in ids}
+        )
+        samples = load_rating_samples(db, player_ids, _parse_date(date_str))
+        rng = np.random.default_rng(seed)
+
+        scores = sample_player_scores(samples, player_ids, trials, rng)
+        totals = _weight_matrix(rosters, player_ids) @ scores
+
+        result = {
+            "trials": trials,
+            "lineup": summarize_totals(totals[0]),
+            "missing_player_ids": [pid for pid in player_ids if pid not in samples],
+        }
+        if opponent is not None:
+            result["opponent"] = summarize_totals(totals[1])
+            result["win_probability"] = round(
+                float(
+                    np.mean(totals[0] > totals[1])
+                    + 0.5 * np.mean(totals[0] == totals[1])
+                ),
+                4,
+            )
+        return result
+
+    @staticmethod
+    def simulate_lineups_by_date(
+        db: Session,
+        date_str: str,
+        current_user_id: int,
+        trials: int = 10000,
+        seed: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        批量模拟指定日期提交的全部阵容
+
+        所有阵容共享同一组球员抽样，并分块计算每次试验中得分最高的阵容，
+        得到每个阵容在全场中夺冠的概率。
+
+        Args:
+            db: 数据库会话
+            date_str: 日期字符串
+            current_user_id: 当前用户ID
+            trials: 试验次数
+            seed: 随机种子
+
+        Returns:
+            阵容模拟结果列表，不可查看的阵容不返回模拟数据
+
+        Raises:
+            ValidationError: 日期格式无效
+        """
+        date_obj = _parse_date(date_str)
+        if date_obj is None:
+            raise ValidationError("日期参数不能为空")
+
+        lineups = (
+            db.query(Lineup.id, Lineup.user_id, Lineup.name, User.username)
+            .outerjoin(User, User.id == Lineup.user_id)
+            .filter(Lineup.date == date_obj)
+            .order_by(Lineup.id)
+            .all()
+        )
+        if not lineups:
+            return []
+
+        members = defaultdict(lambda: ([], []))
+        for lineup_id, player_id, is_starting in (
+            db.query(
+                LineupPlayer.lineup_id, LineupPlayer.player_id, LineupPlayer.is_starting
+            )
+            .join(Lineup, Lineup.id == LineupPlayer.lineup_id)
+            .filter(Lineup.date == date_obj)
+        ):
+            members[lineup_id][0 if is_starting else 1].append(player_id)
+
+        rosters = [members[lineup.id] for lineup in lineups]
+        player_ids = sorted(
+            {pid for roster in rosters for ids in roster for pid in ids}
+        )
+        samples = load_rating_samples(db, player_ids, date_obj)
+        weights = _weight_matrix(rosters, player_ids)
+        rng = np.random.default_rng(seed)
+
+        totals = np.empty((len(lineups), trials), dtype=np.float32)
+        wins = np.zeros(len(lineups), dtype=np.float64)
+        for start in range(0, trials, TRIAL_CHUNK):
+            size = min(TRIAL_CHUNK, trials - start)
+            chunk = weights @ sample_player_scores(samples, player_ids, size, rng)
+            totals[:, start : start + size] = chunk
+            is_best = chunk == chunk.max(axis=0)
+            wins += (is_best / is_best.sum(axis=0)).sum(axis=1)
+
+        results = []
+        for row, lineup in enumerate(lineups):
+            can_view = LineupService.can_view_lineup(
+                lineup.user_id, current_user_id, date_obj
+            )
+            item = {
+                "lineup_id": lineup.id,
+                "user_id": lineup.user_id,
+                "name": lineup.name,
+                "username": lineup.username or "未知用户",
+                "can_view": can_view,
+            }
+            if can_view:
+                item["simulation"] = summarize_totals(totals[row])
+                item["win_probability"] = round(wins[row] / trials, 4)
+            results.append(item)
+        return results
@@ -1,11 +1,49 @@
-from collections import defaultdict
-from datetime import date
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime
 from typing import Dict, List, Optional, Tuple
 
 
-from app.models import PlayerGameStats, PlayerInformation
+from app.models import PlayerConsistency, PlayerGameStats, PlayerInformation
+from app.services.player_cache import player_directory
+from app.utils.cache import VersionedCache, VersionedLRUCache, table_version
+from sqlalchemy import case, func, insert, literal, true
 from sqlalchemy.orm import Session
 
+MAX_BATCH_PLAYERS = 100
+
+
+def _base_score(
+    three_pointers,
+    two_pointers,
+    free_throws,
+    offensive_rebounds,
+    defensive_rebounds,
+    assists,
+    steals,
+    blocks,
+    field_goals_attempted,
+    field_goals_made,
+    free_throws_attempted,
+    turnovers,
+    personal_fouls,
+):
+    """评分公式中不含胜负加成的线性部分，同时适用于数值和SQL表达式"""
+    return (
+        (three_pointers * 1.5)
+        + two_pointers
+        + (free_throws * 0.5)
+        + offensive_rebounds
+        + (defensive_rebounds * 0.7)
+        + assists
+        + (steals * 1.2)
+        + (blocks * 1.2)
+        - ((field_goals_attempted - field_goals_made) * 0.7)
+        - ((free_throws_attempted - free_throws) * 0.4)
+        - (turnovers * 1.2)
+        - (personal_fouls * 0.4)
+    )
+
 
 def calculate_player_score(
     three_pointers: int,
@@ -47,19 +85,20 @@ def calculate_player_score(
     Returns:
         球员评分
     """
-    score = (
-        (three_pointers * 1.5)
-        + two_pointers
-        + (free_throws * 0.5)
-        + offensive_rebounds
-        + (defensive_rebounds * 0.7)
-        + assists
-        + (steals * 1.2)
-        + (blocks * 1.2)
-        - ((field_goals_attempted - field_goals_made) * 0.7)
-        - ((free_throws_attempted - free_throws) * 0.4)
-        - (turnovers * 1.2)
-        - (personal_fouls * 0.4)
+    score = _base_score(
+        three_pointers=three_pointers,
+        two_pointers=two_pointers,
+        free_throws=free_throws,
+        offensive_rebounds=offensive_rebounds,
+        defensive_rebounds=defensive_rebounds,
+        assists=assists,
+        steals=steals,
+        blocks=blocks,
+        field_goals_attempted=field_goals_attempted,
+        field_goals_made=field_goals_made,
+        free_throws_attempted=free_throws_attempted,
+        turnovers=turnovers,
+        personal_fouls=personal_fouls,
     )
     if minutes_played > 0:
         if team_won:
@@ -69,6 +108,691 @@ def calculate_player_score(
     return score
 
 
+def player_score_expression(
+    three_pointers,
+    two_pointers,
+    free_throws,
+    offensive_rebounds,
+    defensive_rebounds,
+    assists,
+    steals,
+    blocks,
+    field_goals_attempted,
+    field_goals_made,
+    free_throws_attempted,
+    turnovers,
+    personal_fouls,
+    team_won,
+    minutes_played,
+):
+    """
+    球员评分的SQL表达式，与calculate_player_score保持一致
+
+    Args:
+        参数含义同calculate_player_score，均为SQL列或表达式
+
+    Returns:
+        SQL评分表达式
+    """
+    score = _base_score(
+        three_pointers=three_pointers,
+        two_pointers=two_pointers,
+        free_throws=free_throws,
+        offensive_rebounds=offensive_rebounds,
+        defensive_rebounds=defensive_rebounds,
+        assists=assists,
+        steals=steals,
+        blocks=blocks,
+        field_goals_attempted=field_goals_attempted,
+        field_goals_made=field_goals_made,
+        free_throws_attempted=free_throws_attempted,
+        turnovers=turnovers,
+        personal_fouls=personal_fouls,
+    )
+    return score + case(
+        (minutes_played > 0, case((team_won, 2), else_=-2)),
+        else_=0,
+    )
+
+
+def game_score_expression():
+    """
+    单场比赛评分的SQL表达式
+
+    Returns:
+        基于PlayerGameStats列的评分表达式
+    """
+    return player_score_expression(
+        three_pointers=PlayerGameStats.threePointersMade,
+        two_pointers=PlayerGameStats.twoPointersMade,
+        free_throws=PlayerGameStats.freeThrowsMade,
+        offensive_rebounds=PlayerGameStats.reboundsOffensive,
+        defensive_rebounds=PlayerGameStats.reboundsDefensive,
+        assists=PlayerGameStats.assists,
+        steals=PlayerGameStats.steals,
+        blocks=PlayerGameStats.blocks,
+        field_goals_attempted=PlayerGameStats.threePointersAttempted
+        + PlayerGameStats.twoPointersAttempted,
+        field_goals_made=PlayerGameStats.threePointersMade
+        + PlayerGameStats.twoPointersMade,
+        free_throws_attempted=PlayerGameStats.freeThrowsAttempted,
+        turnovers=PlayerGameStats.turnovers,
+        personal_fouls=PlayerGameStats.foulsPersonal,
+        team_won=PlayerGameStats.IS_WINNER,
+        minutes_played=PlayerGameStats.minutes,
+    )
+
+
+def get_player_rating_moments(
+    db: Session,
+    player_ids: Optional[List[int]] = None,
+    before: Optional[date] = None,
+) -> Dict[int, Tuple[int, float, float]]:
+    """
+    单次遍历比赛数据，计算球员单场评分的场次、均值和标准差
+
+    使用Welford算法逐行累加，不需要在内存中保留每名球员的全部比赛。
+
+    Args:
+        db: 数据库会话
+        player_ids: 球员ID列表，None表示全部球员
+        before: 只统计该日期之前的比赛，None表示全部比赛
+
+    Returns:
+        球员ID -> (场次, 均值, 标准差)
+    """
+    query = db.query(PlayerGameStats.personId, game_score_expression())
+    if player_ids is not None:
+        query = query.filter(PlayerGameStats.personId.in_(set(player_ids)))
+    if before is not None:
+        query = query.filter(PlayerGameStats.game_date < before)
+
+    accumulators = {}
+    for player_id, rating in query.yield_per(1000):
+        count, mean, m2 = accumulators.get(player_id, (0, 0.0, 0.0))
+        count += 1
+        delta = rating - mean
+        mean += delta / count
+        m2 += delta * (rating - mean)
+        accumulators[player_id] = (count, mean, m2)
+
+    return {
+        player_id: (count, mean, (m2 / (count - 1)) ** 0.5 if count > 1 else 0.0)
+        for player_id, (count, mean, m2) in accumulators.items()
+    }
+
+
+BOOM_RATING = 20.0
+BUST_RATING = 5.0
+
+
+def _percentile(values, q: float) -> float:
+    """已排序数组的线性插值分位数，与 numpy.percentile 的默认方法一致"""
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def compute_rating_consistency(db: Session) -> List[Dict]:
+    """
+    单次遍历比赛数据，计算每名球员单场评分的稳定性指标
+
+    按球员ID顺序流式读取评分(使用 personId 索引)，均值和方差用Welford算法
+    累加，爆发/低迷场次在遍历时计数；每名球员的评分暂存在紧凑的浮点数组中，
+    切换到下一名球员时排序取10%和90%分位数后释放，内存只与单名球员的场次
+    相关。
+
+    Args:
+        db: 数据库会话
+
+    Returns:
+        每名球员的 player_id、games、rating_mean、rating_std、rating_p10、
+        rating_p90、boom_rate(评分不低于 BOOM_RATING 的场次比例)和
+        bust_rate(评分不高于 BUST_RATING 的场次比例)
+    """
+    query = db.query(PlayerGameStats.personId, game_score_expression()).order_by(
+        PlayerGameStats.personId
+    )
+
+    profiles = []
+    current_id = None
+    ratings = array("d")
+    count, mean, m2, booms, busts = 0, 0.0, 0.0, 0, 0
+
+    def finish():
+        values = sorted(ratings)
+        profiles.append(
+            {
+                "player_id": current_id,
+                "games": count,
+                "rating_mean": mean,
+                "rating_std": (m2 / (count - 1)) ** 0.5 if count > 1 else 0.0,
+                "rating_p10": _percentile(values, 10),
+                "rating_p90": _percentile(values, 90),
+                "boom_rate": booms / count,
+                "bust_rate": busts / count,
+            }
+        )
+
+    for player_id, rating in query.yield_per(1000):
+        if player_id != current_id:
+            if count:
+                finish()
+            current_id = player_id
+            ratings = array("d")
+            count, mean, m2, booms, busts = 0, 0.0, 0.0, 0, 0
+        ratings.append(rating)
+        count += 1
+        delta = rating - mean
+        mean += delta / count
+        m2 += delta * (rating - mean)
+        booms += rating >= BOOM_RATING
+        busts += rating <= BUST_RATING
+    if count:
+        finish()
+    return profiles
+
+
+def _load_player_consistency(db: Session) -> Dict[int, Dict]:
+    return {row.player_id: row.to_dict() for row in db.query(PlayerConsistency)}
+
+
+def _consistency_version(db: Session) -> Tuple:
+    # 表由夜间任务整体替换，所有行的 computed_at 同时更新
+    return tuple(
+        db.query(
+            func.count(PlayerConsistency.player_id),
+            func.max(PlayerConsistency.computed_at),
+        ).one()
+    )
+
+
+player_consistency = VersionedCache(
+    "player_consistency", _load_player_consistency, _consistency_version
+)
+
+
+def refresh_player_consistency(db: Session) -> int:
+    """
+    重新计算稳定性指标并整体替换 player_consistency 表
+
+    计算需要扫描全部比赛数据，只由夜间任务调用；读取方通过
+    player_consistency 缓存读取表中已保存的结果。
+
+    Args:
+        db: 数据库会话
+
+    Returns:
+        写入的球员数量
+    """
+    profiles = compute_rating_consistency(db)
+    computed_at = datetime.utcnow()
+    db.query(PlayerConsistency).delete()
+    if profiles:
+        db.execute(
+            insert(PlayerConsistency),
+            [{**profile, "computed_at": computed_at} for profile in profiles],
+        )
+    db.commit()
+    player_consistency.invalidate()
+    return len(profiles)
+
+
+def _parse_date_param(value: Optional[str], name: str) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        from app.exceptions.base import ValidationError
+
+        raise ValidationError(f"{name} 日期格式不正确，请使用 YYYY-MM-DD 格式")
+
+
+def _season_totals_query(
+    db: Session,
+    player_ids: Optional[List[int]] = None,
+    window: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    min_games: Optional[int] = None,
+    min_minutes: Optional[int] = None,
+):
+    """
+    构建多名球员累计数据的分组聚合查询
+
+    内层查询按日期范围筛选比赛，并用窗口函数为每名球员的比赛按时间倒序编号、
+    取最近一场的球队；外层只保留每名球员最近 window 场比赛后分组汇总。
+    全部球员在同一次查询中完成，不满足场次或分钟下限的球员在 HAVING 中排除。
+
+    Args:
+        db: 数据库会话
+        player_ids: 球员ID列表，None表示全部球员
+        window: 只统计最近的场次，None表示统计范围内的全部比赛
+        start: 起始日期(含)
+        end: 结束日期(含)
+        min_games: 最少场次
+        min_minutes: 最少总上场分钟
+
+    Returns:
+        每名球员一行累计数据的查询，没有比赛数据或不满足下限的球员不包含在内
+    """
+    recency = (PlayerGameStats.game_date.desc(), PlayerGameStats.id.desc())
+    games = db.query(
+        PlayerGameStats,
+        game_score_expression().label("rating"),
+        func.row_number()
+        .over(partition_by=PlayerGameStats.personId, order_by=recency)
+        .label("recency"),
+        func.first_value(PlayerGameStats.teamName)
+        .over(partition_by=PlayerGameStats.personId, order_by=recency)
+        .label("latest_team"),
+    )
+    if player_ids is not None:
+        games = games.filter(PlayerGameStats.personId.in_(set(player_ids)))
+    if start is not None:
+        games = games.filter(PlayerGameStats.game_date >= start)
+    if end is not None:
+        games = games.filter(PlayerGameStats.game_date <= end)
+    g = games.subquery()
+
+    query = db.query(
+        g.c.personId,
+        func.max(g.c.latest_team).label("team_name"),
+        func.count(g.c.id).label("games"),
+        func.sum(g.c.minutes).label("minutes"),
+        func.sum(
+            g.c.threePointersMade * 3 + g.c.twoPointersMade * 2 + g.c.freeThrowsMade
+        ).label("points"),
+        func.sum(g.c.reboundsOffensive + g.c.reboundsDefensive).label("rebounds"),
+        func.sum(g.c.reboundsOffensive).label("offensive_rebounds"),
+        func.sum(g.c.reboundsDefensive).label("defensive_rebounds"),
+        func.sum(g.c.assists).label("assists"),
+        func.sum(g.c.steals).label("steals"),
+        func.sum(g.c.blocks).label("blocks"),
+        func.sum(g.c.turnovers).label("turnovers"),
+        func.sum(g.c.foulsPersonal).label("personal_fouls"),
+        func.sum(g.c.threePointersMade).label("three_made"),
+        func.sum(g.c.threePointersAttempted).label("three_attempted"),
+        func.sum(g.c.twoPointersMade).label("two_made"),
+        func.sum(g.c.twoPointersAttempted).label("two_attempted"),
+        func.sum(g.c.freeThrowsMade).label("free_made"),
+        func.sum(g.c.freeThrowsAttempted).label("free_attempted"),
+        func.avg(g.c.rating).label("rating"),
+    )
+    if window is not None:
+        query = query.filter(g.c.recency <= window)
+    query = query.group_by(g.c.personId)
+    if min_games:
+        query = query.having(func.count(g.c.id) >= min_games)
+    if min_minutes:
+        query = query.having(func.sum(g.c.minutes) >= min_minutes)
+    return query
+
+
+def _query_season_totals(
+    db: Session,
+    player_ids: Optional[List[int]] = None,
+    window: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    min_games: Optional[int] = None,
+    min_minutes: Optional[int] = None,
+) -> Dict:
+    """
+    一次分组聚合查询多名球员的累计数据
+
+    Args:
+        参数含义同 _season_totals_query
+
+    Returns:
+        球员ID -> 累计数据行，没有比赛数据或不满足下限的球员不包含在内
+    """
+    query = _season_totals_query(
+        db, player_ids, window, start, end, min_games, min_minutes
+    )
+    return {row.personId: row for row in query}
+
+
+def _average_stats_from_totals(player_id: int, totals) -> Dict:
+    """
+    将赛季累计数据换算为场均数据
+
+    Args:
+        player_id: 球员ID
+        totals: _query_season_totals 返回的累计数据行
+
+    Returns:
+        平均数据字典
+    """
+    total_games = totals.games
+    field_goals_made = totals.three_made + totals.two_made
+    field_goals_attempted = totals.three_attempted + totals.two_attempted
+    field_goal_percentage = (
+        (field_goals_made / field_goals_attempted * 100)
+        if field_goals_attempted > 0
+        else 0
+    )
+    three_point_percentage = (
+        (totals.three_made / totals.three_attempted * 100)
+        if totals.three_attempted > 0
+        else 0
+    )
+    free_throw_percentage = (
+        (totals.free_made / totals.free_attempted * 100)
+        if totals.free_attempted > 0
+        else 0
+    )
+
+    return {
+        "player_id": player_id,
+        "games_played": total_games,
+        "minutes_per_game": round(totals.minutes / total_games, 1),
+        "points_per_game": round(totals.points / total_games, 1),
+        "rebounds_per_game": round(totals.rebounds / total_games, 1),
+        "assists_per_game": round(totals.assists / total_games, 1),
+        "steals_per_game": round(totals.steals / total_games, 1),
+        "blocks_per_game": round(totals.blocks / total_games, 1),
+        "turnovers_per_game": round(totals.turnovers / total_games, 1),
+        "field_goal_percentage": round(field_goal_percentage, 1),
+        "three_point_percentage": round(three_point_percentage, 1),
+        "free_throw_percentage": round(free_throw_percentage, 1),
+    }
+
+
+LEADERBOARD_SORT_FIELDS = {
+    "salary",
+    "minutes",
+    "points",
+    "offensive_rebounds",
+    "defensive_rebounds",
+    "assists",
+    "steals",
+    "blocks",
+    "turnovers",
+    "personal_fouls",
+    "games_played",
+    "three_pointers_made",
+    "three_pointers_attempted",
+    "three_pointers_percentage",
+    "two_pointers_made",
+    "two_pointers_attempted",
+    "two_pointers_percentage",
+    "free_throws_made",
+    "free_throws_attempted",
+    "free_throws_percentage",
+    "rating",
+    "rating_std",
+    "rating_p10",
+    "rating_p90",
+    "boom_rate",
+    "bust_rate",
+}
+
+CONSISTENCY_FIELDS = (
+    "rating_std",
+    "rating_p10",
+    "rating_p90",
+    "boom_rate",
+    "bust_rate",
+)
+
+_game_stats_version = table_version(PlayerGameStats)
+_player_information_version = table_version(PlayerInformation)
+
+# 排行榜行包含球员信息和稳定性指标，三者任一变化都需要重新计算
+leaderboard_cache = VersionedLRUCache(
+    "stats_leaderboard",
+    lambda db: (
+        _game_stats_version(db),
+        _player_information_version(db),
+        _consistency_version(db),
+    ),
+)
+
+
+frontier_cache = VersionedLRUCache(
+    "salary_frontier",
+    lambda db: (_game_stats_version(db), _player_information_version(db)),
+)
+
+
+def salary_frontier(players: List[Dict]) -> List[Dict]:
+    """
+    计算薪资/评分的帕累托前沿及每名球员到前沿的距离
+
+    按薪资升序、评分降序排序后扫描一遍，记录已扫描球员的最高评分：评分
+    超过该值的球员不被任何更便宜(或同薪)且评分更高的球员支配，位于前沿上。
+    前沿按薪资升序时评分严格递增，再对每名球员二分查找达到其评分所需的
+    最低前沿薪资。总复杂度 O(n log n)。
+
+    Args:
+        players: 包含 salary 和 rating 的球员字典列表
+
+    Returns:
+        按薪资升序排列的新字典列表，附加 on_frontier、rating_gap(同等或更低
+        薪资下可得的最高评分与自身评分之差)和 salary_excess(前沿上达到同等
+        评分的最低薪资与自身薪资之差)
+    """
+    ordered = sorted(players, key=lambda p: (p["salary"], -p["rating"]))
+
+    results = []
+    frontier_salaries = []
+    frontier_ratings = []
+    best_rating = None
+    for player in ordered:
+        salary, rating = player["salary"], player["rating"]
+        on_frontier = best_rating is None or rating > best_rating
+        if (
+            not on_frontier
+            and frontier_salaries[-1] == salary
+            and frontier_ratings[-1] == rating
+        ):
+            # 与前沿上的球员薪资和评分都相同，互不支配
+            on_frontier = True
+        elif on_frontier:
+            frontier_salaries.append(salary)
+            frontier_ratings.append(rating)
+            best_rating = rating
+        results.append(
+            {**player, "on_frontier": on_frontier, "rating_gap": best_rating - rating}
+        )
+
+    for result in results:
+        cheapest = frontier_salaries[bisect_left(frontier_ratings, result["rating"])]
+        result["salary_excess"] = result["salary"] - cheapest
+    return results
+
+
+def _build_salary_frontier(db: Session, game_date: Optional[date]) -> List[Dict]:
+    """
+    汇总球员评分并计算薪资前沿，指定日期时使用当日单场评分，否则使用赛季平均评分
+    """
+    if game_date is not None:
+        ratings = db.query(PlayerGameStats.personId, game_score_expression()).filter(
+            PlayerGameStats.game_date == game_date
+        )
+    else:
+        ratings = (
+            (player_id, totals.rating)
+            for player_id, totals in _query_season_totals(db).items()
+        )
+
+    directory = player_directory.get(db)
+    players = []
+    for player_id, rating in ratings:
+        info = directory.get(player_id)
+        if info is None:
+            continue
+        players.append(
+            {
+                "player_id": player_id,
+                "player_name": info.full_name,
+                "team_name": info.team_name,
+                "position": info.position,
+                "salary": info.salary,
+                "rating": rating,
+            }
+        )
+    return salary_frontier(players)
+
+
+def _build_leaderboard(
+    db: Session,
+    window: Optional[int],
+    start: Optional[date],
+    end: Optional[date],
+    per: str = "game",
+    min_games: Optional[int] = None,
+    min_minutes: Optional[int] = None,
+    teams: Optional[Tuple[str, ...]] = None,
+    sort_by: str = "rating",
+    descending: bool = True,
+) -> List[Dict]:
+    """
+    一次查询计算、筛选并排序全部球员在统计范围内的平均数据
+
+    per 为 game 时各项数据为场均，为 36min 时为每36分钟数据(上场时间仍为
+    场均分钟)。换算后的数据、命中率和评分都是累计数据外层查询中的带标签列，
+    评分沿用排行榜原有口径：用换算后的数据计算，比赛结果按胜场计。球员信息
+    和稳定性指标以外连接加入，球队筛选和排序都在SQL中完成，同分按球员ID
+    升序。稳定性指标始终为整个赛季的单场评分统计。
+    """
+    if per == "36min":
+        # 按分钟换算时排除总上场时间为0的球员
+        min_minutes = max(min_minutes or 0, 1)
+
+    totals = _season_totals_query(
+        db, None, window, start, end, min_games, min_minutes
+    ).subquery()
+    units = totals.c.games if per == "game" else totals.c.minutes / 36.0
+
+    def per_unit(column):
+        return column * 1.0 / units
+
+    def percentage(made, attempted):
+        return case((attempted > 0, made / attempted * 100), else_=0)
+
+    averages = {
+        "minutes": totals.c.minutes * 1.0 / totals.c.games,
+        "three_pointers_made": per_unit(totals.c.three_made),
+        "three_pointers_attempted": per_unit(totals.c.three_attempted),
+        "two_pointers_made": per_unit(totals.c.two_made),
+        "two_pointers_attempted": per_unit(totals.c.two_attempted),
+        "free_throws_made": per_unit(totals.c.free_made),
+        "free_throws_attempted": per_unit(totals.c.free_attempted),
+        "offensive_rebounds": per_unit(totals.c.offensive_rebounds),
+        "defensive_rebounds": per_unit(totals.c.defensive_rebounds),
+        "assists": per_unit(totals.c.assists),
+        "steals": per_unit(totals.c.steals),
+        "blocks": per_unit(totals.c.blocks),
+        "turnovers": per_unit(totals.c.turnovers),
+        "personal_fouls": per_unit(totals.c.personal_fouls),
+        "points": per_unit(totals.c.points),
+    }
+    for kind in ("three_pointers", "two_pointers", "free_throws"):
+        averages[f"{kind}_percentage"] = percentage(
+            averages[f"{kind}_made"], averages[f"{kind}_attempted"]
+        )
+    averages["rating"] = player_score_expression(
+        three_pointers=averages["three_pointers_made"],
+        two_pointers=averages["two_pointers_made"],
+        free_throws=averages["free_throws_made"],
+        offensive_rebounds=averages["offensive_rebounds"],
+        defensive_rebounds=averages["defensive_rebounds"],
+        assists=averages["assists"],
+        steals=averages["steals"],
+        blocks=averages["blocks"],
+        field_goals_attempted=averages["three_pointers_attempted"]
+        + averages["two_pointers_attempted"],
+        field_goals_made=averages["three_pointers_made"]
+        + averages["two_pointers_made"],
+        free_throws_attempted=averages["free_throws_attempted"],
+        turnovers=averages["turnovers"],
+        personal_fouls=averages["personal_fouls"],
+        team_won=true(),
+        minutes_played=averages["minutes"] if per == "game" else literal(36),
+    )
+
+    columns = {
+        "salary": func.coalesce(PlayerInformation.salary, 0),
+        "games_played": totals.c.games,
+        **averages,
+        **{
+            field: func.coalesce(getattr(PlayerConsistency, field), 0.0)
+            for field in CONSISTENCY_FIELDS
+        },
+    }
+    query = (
+        db.query(
+            totals.c.personId.label("player_id"),
+            PlayerInformation.full_name,
+            totals.c.team_name,
+            func.coalesce(PlayerInformation.position, "").label("position"),
+            *(column.label(name) for name, column in columns.items()),
+        )
+        .outerjoin(PlayerInformation, PlayerInformation.player_id == totals.c.personId)
+        .outerjoin(PlayerConsistency, PlayerConsistency.player_id == totals.c.personId)
+    )
+    if teams:
+        query = query.filter(totals.c.team_name.in_(teams))
+    sort_column = columns[sort_by]
+    query = query.order_by(
+        sort_column.desc() if descending else sort_column.asc(), totals.c.personId
+    )
+
+    leaderboard = []
+    for row in query:
+        player = row._asdict()
+        full_name = player.pop("full_name")
+        player["player_name"] = full_name or f"Player {row.player_id}"
+        player["team_won"] = True
+        leaderboard.append(player)
+    return leaderboard
+
+
+GAME_LOG_COLUMNS = {
+    "teamName": PlayerGameStats.teamName,
+    "minutes": PlayerGameStats.minutes,
+    "points": (
+        PlayerGameStats.threePointersMade * 3
+        + PlayerGameStats.twoPointersMade * 2
+        + PlayerGameStats.freeThrowsMade
+    ),
+    "threePointersMade": PlayerGameStats.threePointersMade,
+    "threePointersAttempted": PlayerGameStats.threePointersAttempted,
+    "twoPointersMade": PlayerGameStats.twoPointersMade,
+    "twoPointersAttempted": PlayerGameStats.twoPointersAttempted,
+    "freeThrowsMade": PlayerGameStats.freeThrowsMade,
+    "freeThrowsAttempted": PlayerGameStats.freeThrowsAttempted,
+    "reboundsOffensive": PlayerGameStats.reboundsOffensive,
+    "reboundsDefensive": PlayerGameStats.reboundsDefensive,
+    "assists": PlayerGameStats.assists,
+    "steals": PlayerGameStats.steals,
+    "blocks": PlayerGameStats.blocks,
+    "turnovers": PlayerGameStats.turnovers,
+    "foulsPersonal": PlayerGameStats.foulsPersonal,
+    "IS_WINNER": PlayerGameStats.IS_WINNER,
+}
+
+
+def _decode_game_log_cursor(cursor: str) -> Tuple[date, int]:
+    """
+    解析比赛日志游标，格式为 "<比赛日期>_<比赛数据ID>"
+
+    Raises:
+        ValidationError: 游标格式无效
+    """
+    try:
+        game_date, stat_id = cursor.split("_")
+        return date.fromisoformat(game_date), int(stat_id)
+    except ValueError:
+        from app.exceptions.base import ValidationError
+
+        raise ValidationError("无效的游标")
+
+
 class StatsService:
     """统计服务"""
 
@@ -78,179 +802,64 @@ class StatsService:
         sort_order: str = "desc",
         sort_by: str = "rating",
         teams: Optional[List[str]] = None,
+        window: Optional[int] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        per: str = "game",
+        min_games: Optional[int] = None,
+        min_minutes: Optional[int] = None,
     ) -> List[Dict]:
         """
         获取球员平均数据排行榜
 
+        平均数据、评分、球队筛选和排序由一次窗口函数聚合查询完成，场次和
+        分钟下限在聚合查询中过滤。结果按统计范围、口径、球队和排序缓存，
+        比赛数据、球员信息或稳定性指标变化后失效。
+
         Args:
             db: 数据库会话
             sort_order: 排序顺序
+            sort_by: 排序字段
             teams: 球队列表，用于筛选
+            window: 只统计每名球员最近的场次，None表示全部比赛
+            date_from: 起始日期(含)
+            date_to: 结束日期(含)
+            per: 统计口径 game(场均)/36min(每36分钟)
+            min_games: 最少场次
+            min_minutes: 最少总上场分钟
 
         Returns:
             球员排行榜列表
-        """
-        stats = db.query(PlayerGameStats).all()
-
-        player_stats = defaultdict(list)
-        for stat in stats:
-            player_stats[stat.personId].append(stat)
-
-        players_with_score = []
-        for player_id, stat_list in player_stats.items():
-            total_games = len(stat_list)
-
-            total_minutes = sum(stat.minutes for stat in stat_list)
-            total_three_pointers_made = sum(
-                stat.threePointersMade for stat in stat_list
-            )
-            total_three_pointers_attempted = sum(
-                stat.threePointersAttempted for stat in stat_list
-            )
-            total_two_pointers_made = sum(stat.twoPointersMade for stat in stat_list)
-            total_two_pointers_attempted = sum(
-                stat.twoPointersAttempted for stat in stat_list
-            )
-            total_free_throws_made = sum(stat.freeThrowsMade for stat in stat_list)
-            total_free_throws_attempted = sum(
-                stat.freeThrowsAttempted for stat in stat_list
-            )
-            total_offensive_rebounds = sum(stat.reboundsOffensive for stat in stat_list)
-            total_defensive_rebounds = sum(stat.reboundsDefensive for stat in stat_list)
-            total_assists = sum(stat.assists for stat in stat_list)
-            total_steals = sum(stat.steals for stat in stat_list)
-            total_blocks = sum(stat.blocks for stat in stat_list)
-            total_turnovers = sum(stat.turnovers for stat in stat_list)
-            total_personal_fouls = sum(stat.foulsPersonal for stat in stat_list)
-            total_points = sum(
-                stat.threePointersMade * 3
-                + stat.twoPointersMade * 2
-                + stat.freeThrowsMade
-                for stat in stat_list
-            )
-
-            avg_minutes = total_minutes / total_games
-            avg_three_pointers_made = total_three_pointers_made / total_games
-            avg_three_pointers_attempted = total_three_pointers_attempted / total_games
-            avg_two_pointers_made = total_two_pointers_made / total_games
-            avg_two_pointers_attempted = total_two_pointers_attempted / total_games
-            avg_free_throws_made = total_free_throws_made / total_games
-            avg_free_throws_attempted = total_free_throws_attempted / total_games
-            avg_offensive_rebounds = total_offensive_rebounds / total_games
-            avg_defensive_rebounds = total_defensive_rebounds / total_games
-            avg_assists = total_assists / total_games
-            avg_steals = total_steals / total_games
-            avg_blocks = total_blocks / total_games
-            avg_turnovers = total_turnovers / total_games
-            avg_personal_fouls = total_personal_fouls / total_games
-            avg_points = total_points / total_games
-
-            avg_score = calculate_player_score(
-                three_pointers=avg_three_pointers_made,
-                two_pointers=avg_two_pointers_made,
-                free_throws=avg_free_throws_made,
-                offensive_rebounds=avg_offensive_rebounds,
-                defensive_rebounds=avg_defensive_rebounds,
-                assists=avg_assists,
-                steals=avg_steals,
-                blocks=avg_blocks,
-                field_goals_attempted=avg_three_pointers_attempted
-                + avg_two_pointers_attempted,
-                field_goals_made=avg_three_pointers_made + avg_two_pointers_made,
-                free_throws_attempted=avg_free_throws_attempted,
-                turnovers=avg_turnovers,
-                personal_fouls=avg_personal_fouls,
-                team_won=True,
-                minutes_played=avg_minutes,
-            )
-
-            player_info = (
-                db.query(PlayerInformation).filter_by(player_id=player_id).first()
-            )
-            player_name = (
-                player_info.full_name if player_info else f"Player {player_id}"
-            )
 
-            three_point_percentage = (
-                (avg_three_pointers_made / avg_three_pointers_attempted * 100)
-                if avg_three_pointers_attempted > 0
-                else 0
-            )
-            two_point_percentage = (
-                (avg_two_pointers_made / avg_two_pointers_attempted * 100)
-                if avg_two_pointers_attempted > 0
-                else 0
-            )
-            free_throw_percentage = (
-                (avg_free_throws_made / avg_free_throws_attempted * 100)
-                if avg_free_throws_attempted > 0
-                else 0
-            )
-
-            team_name = stat_list[0].teamName if stat_list else ""
-            
-            # 球队筛选
-            if teams and team_name not in teams:
-                continue
-
-            player_data = {
-                "player_id": player_id,
-                "player_name": player_name,
-                "team_name": team_name,
-                "position": player_info.position if player_info else "",
-                "salary": player_info.salary if player_info else 0,
-                "minutes": avg_minutes,
-                "three_pointers_made": avg_three_pointers_made,
-                "three_pointers_attempted": avg_three_pointers_attempted,
-                "three_pointers_percentage": three_point_percentage,
-                "two_pointers_made": avg_two_pointers_made,
-                "two_pointers_attempted": avg_two_pointers_attempted,
-                "two_pointers_percentage": two_point_percentage,
-                "free_throws_made": avg_free_throws_made,
-                "free_throws_attempted": avg_free_throws_attempted,
-                "free_throws_percentage": free_throw_percentage,
-                "offensive_rebounds": avg_offensive_rebounds,
-                "defensive_rebounds": avg_defensive_rebounds,
-                "assists": avg_assists,
-                "steals": avg_steals,
-                "blocks": avg_blocks,
-                "turnovers": avg_turnovers,
-                "personal_fouls": avg_personal_fouls,
-                "team_won": True,
-                "points": avg_points,
-                "rating": avg_score,
-                "games_played": total_games,
-            }
-            players_with_score.append(player_data)
-
-        valid_sort_fields = {
-            "salary",
-            "minutes",
-            "points",
-            "offensive_rebounds",
-            "defensive_rebounds",
-            "assists",
-            "steals",
-            "blocks",
-            "turnovers",
-            "personal_fouls",
-            "games_played",
-            "three_pointers_made",
-            "three_pointers_attempted",
-            "three_pointers_percentage",
-            "two_pointers_made",
-            "two_pointers_attempted",
-            "two_pointers_percentage",
-            "free_throws_made",
-            "free_throws_attempted",
-            "free_throws_percentage",
-            "rating",
-        }
-        sort_field = sort_by if sort_by in valid_sort_fields else "rating"
-        players_with_score.sort(
-            key=lambda x: x[sort_field], reverse=(sort_order == "desc")
+        Raises:
+            ValidationError: 日期格式或统计口径无效
+        """
+        from app.exceptions.base import ValidationError
+
+        if per not in ("game", "36min"):
+            raise ValidationError(f"无效的统计口径: {per}")
+        start = _parse_date_param(date_from, "from")
+        end = _parse_date_param(date_to, "to")
+        sort_field = sort_by if sort_by in LEADERBOARD_SORT_FIELDS else "rating"
+        team_filter = tuple(sorted(set(teams))) if teams else None
+        descending = sort_order == "desc"
+        return leaderboard_cache.get(
+            db,
+            (window, start, end, per, min_games, min_minutes)
+            + (team_filter, sort_field, descending),
+            lambda: _build_leaderboard(
+                db,
+                window,
+                start,
+                end,
+                per,
+                min_games,
+                min_minutes,
+                team_filter,
+                sort_field,
+                descending,
+            ),
         )
-        return players_with_score
 
     @staticmethod
     def get_player_game_stats(
@@ -288,6 +897,7 @@ class StatsService:
             .filter(PlayerGameStats.game_date == game_date_obj)
             .all()
         )
+        players = player_directory.get(db)
 
         players_with_score = []
         for stat in stats:
@@ -310,9 +920,7 @@ class StatsService:
                 minutes_played=stat.minutes,
             )
 
-            player_info = (
-                db.query(PlayerInformation).filter_by(player_id=stat.personId).first()
-            )
+            player_info = players.get(stat.personId)
             player_name = (
                 player_info.full_name if player_info else f"Player {stat.personId}"
             )
@@ -449,10 +1057,122 @@ class StatsService:
 
         return player_id, game_stats
 
+    @staticmethod
+    def get_player_game_log(
+        db: Session,
+        player_id: int,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        sort_order: str = "desc",
+    ) -> Dict:
+        """
+        获取球员逐场比赛数据
+
+        按 (personId, game_date) 索引做范围扫描，以 (比赛日期, ID) 为游标分页，
+        只查询请求的列，翻页代价与球员的比赛总数无关。
+
+        Args:
+            db: 数据库会话
+            player_id: 球员ID
+            date_from: 起始日期(含)
+            date_to: 结束日期(含)
+            limit: 每页场次
+            cursor: 上一页返回的 next_cursor
+            fields: 返回的列，None表示全部列；game_date 和 rating 之外的可选列
+                见 GAME_LOG_COLUMNS
+            sort_order: 按日期排序的顺序 asc/desc
+
+        Returns:
+            包含 player_id、games 和 next_cursor(没有下一页时为None) 的字典
+
+        Raises:
+            ValidationError: 参数无效
+        """
+        from app.exceptions.base import ValidationError
+
+        if sort_order not in ("asc", "desc"):
+            raise ValidationError(f"无效的排序顺序: {sort_order}")
+        if fields is None:
+            fields = list(GAME_LOG_COLUMNS) + ["rating"]
+        unknown = [
+            field
+            for field in fields
+            if field not in GAME_LOG_COLUMNS and field not in ("rating", "game_date")
+        ]
+        if unknown:
+            raise ValidationError(f"未知的列: {', '.join(unknown)}")
+
+        columns = [PlayerGameStats.id, PlayerGameStats.game_date]
+        selected = list(dict.fromkeys(f for f in fields if f != "game_date"))
+        for field in selected:
+            expression = (
+                game_score_expression()
+                if field == "rating"
+                else GAME_LOG_COLUMNS[field]
+            )
+            columns.append(expression.label(field))
+
+        query = db.query(*columns).filter(PlayerGameStats.personId == player_id)
+        start = _parse_date_param(date_from, "from")
+        end = _parse_date_param(date_to, "to")
+        if start is not None:
+            query = query.filter(PlayerGameStats.game_date >= start)
+        if end is not None:
+            query = query.filter(PlayerGameStats.game_date <= end)
+
+        descending = sort_order == "desc"
+        if cursor:
+            cursor_date, cursor_id = _decode_game_log_cursor(cursor)
+            if descending:
+                query = query.filter(
+                    (PlayerGameStats.game_date < cursor_date)
+                    | (
+                        (PlayerGameStats.game_date == cursor_date)
+                        & (PlayerGameStats.id < cursor_id)
+                    )
+                )
+            else:
+                query = query.filter(
+                    (PlayerGameStats.game_date > cursor_date)
+                    | (
+                        (PlayerGameStats.game_date == cursor_date)
+                        & (PlayerGameStats.id > cursor_id)
+                    )
+                )
+
+        if descending:
+            query = query.order_by(
+                PlayerGameStats.game_date.desc(), PlayerGameStats.id.desc()
+            )
+        else:
+            query = query.order_by(PlayerGameStats.game_date, PlayerGameStats.id)
+
+        rows = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = f"{rows[-1].game_date.isoformat()}_{rows[-1].id}"
+
+        games = []
+        for row in rows:
+            game = {"game_date": row.game_date.isoformat()}
+            for field in selected:
+                value = getattr(row, field)
+                game[field] = round(value, 2) if field == "rating" else value
+            games.append(game)
+
+        return {"player_id": player_id, "games": games, "next_cursor": next_cursor}
+
     @staticmethod
     def get_player_average_stats(
         db: Session,
         player_id: int,
+        window: Optional[int] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
     ) -> Dict:
         """
         获取指定球员的平均数据
@@ -460,82 +1180,133 @@ class StatsService:
         Args:
             db: 数据库会话
             player_id: 球员ID
+            window: 只统计最近的场次，None表示全部比赛
+            date_from: 起始日期(含)
+            date_to: 结束日期(含)
 
         Returns:
-            平均数据字典
+            平均数据字典，consistency 为赛季单场评分的稳定性指标
 
         Raises:
             ResourceNotFound: 球员数据不存在
+            ValidationError: 日期格式无效
         """
-        stats = (
-            db.query(PlayerGameStats)
-            .filter(PlayerGameStats.personId == player_id)
-            .all()
-        )
-        if not stats:
+        totals = _query_season_totals(
+            db,
+            [player_id],
+            window,
+            _parse_date_param(date_from, "from"),
+            _parse_date_param(date_to, "to"),
+        ).get(player_id)
+        if totals is None:
             from app.exceptions.base import ResourceNotFound
 
             raise ResourceNotFound("No stats found for this player")
 
-        total_games = len(stats)
+        average_stats = _average_stats_from_totals(player_id, totals)
+        average_stats["consistency"] = player_consistency.get(db).get(player_id)
+        return average_stats
 
-        total_minutes = sum(stat.minutes for stat in stats)
-        total_points = sum(
-            stat.threePointersMade * 3 + stat.twoPointersMade * 2 + stat.freeThrowsMade
-            for stat in stats
-        )
-        total_rebounds = sum(
-            stat.reboundsOffensive + stat.reboundsDefensive for stat in stats
-        )
-        total_assists = sum(stat.assists for stat in stats)
-        total_steals = sum(stat.steals for stat in stats)
-        total_blocks = sum(stat.blocks for stat in stats)
-        total_turnovers = sum(stat.turnovers for stat in stats)
-        total_three_pointers_made = sum(stat.threePointersMade for stat in stats)
-        total_three_pointers_attempted = sum(
-            stat.threePointersAttempted for stat in stats
-        )
-        total_two_pointers_made = sum(stat.twoPointersMade for stat in stats)
-        total_two_pointers_attempted = sum(stat.twoPointersAttempted for stat in stats)
-        total_free_throws_made = sum(stat.freeThrowsMade for stat in stats)
-        total_free_throws_attempted = sum(stat.freeThrowsAttempted for stat in stats)
-
-        field_goals_made = total_three_pointers_made + total_two_pointers_made
-        field_goals_attempted = (
-            total_three_pointers_attempted + total_two_pointers_attempted
-        )
-        field_goal_percentage = (
-            (field_goals_made / field_goals_attempted * 100)
-            if field_goals_attempted > 0
-            else 0
-        )
-        three_point_percentage = (
-            (total_three_pointers_made / total_three_pointers_attempted * 100)
-            if total_three_pointers_attempted > 0
-            else 0
-        )
-        free_throw_percentage = (
-            (total_free_throws_made / total_free_throws_attempted * 100)
-            if total_free_throws_attempted > 0
-            else 0
+    @staticmethod
+    def get_players_average_stats(
+        db: Session,
+        player_ids: List[int],
+        window: Optional[int] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> Dict:
+        """
+        批量获取球员信息和平均数据
+
+        所有球员的平均数据由一次分组聚合查询得到，球员信息来自球员缓存。
+
+        Args:
+            db: 数据库会话
+            player_ids: 球员ID列表
+            window: 只统计最近的场次，None表示全部比赛
+            date_from: 起始日期(含)
+            date_to: 结束日期(含)
+
+        Returns:
+            包含 players(按请求顺序，已去重) 和 missing_player_ids(没有比赛数据
+            的球员) 的字典
+
+        Raises:
+            ValidationError: 球员ID为空、数量超过限制或日期格式无效
+        """
+        from app.exceptions.base import ValidationError
+
+        player_ids = list(dict.fromkeys(player_ids))
+        if not player_ids:
+            raise ValidationError("球员ID不能为空")
+        if len(player_ids) > MAX_BATCH_PLAYERS:
+            raise ValidationError(f"一次最多查询{MAX_BATCH_PLAYERS}名球员")
+
+        season_totals = _query_season_totals(
+            db,
+            player_ids,
+            window,
+            _parse_date_param(date_from, "from"),
+            _parse_date_param(date_to, "to"),
         )
+        directory = player_directory.get(db)
+        consistency = player_consistency.get(db)
+
+        players = []
+        missing_player_ids = []
+        for player_id in player_ids:
+            totals = season_totals.get(player_id)
+            if totals is None:
+                missing_player_ids.append(player_id)
+                continue
+            info = directory.get(player_id)
+            average_stats = _average_stats_from_totals(player_id, totals)
+            average_stats["player"] = info.to_dict() if info else None
+            average_stats["rating"] = round(totals.rating, 2)
+            average_stats["consistency"] = consistency.get(player_id)
+            players.append(average_stats)
 
-        average_stats = {
-            "player_id": player_id,
-            "games_played": total_games,
-            "minutes_per_game": round(total_minutes / total_games, 1),
-            "points_per_game": round(total_points / total_games, 1),
-            "rebounds_per_game": round(total_rebounds / total_games, 1),
-            "assists_per_game": round(total_assists / total_games, 1),
-            "steals_per_game": round(total_steals / total_games, 1),
-            "blocks_per_game": round(total_blocks / total_games, 1),
-            "turnovers_per_game": round(total_turnovers / total_games, 1),
-            "field_goal_percentage": round(field_goal_percentage, 1),
-            "three_point_percentage": round(three_point_percentage, 1),
-            "free_throw_percentage": round(free_throw_percentage, 1),
-        }
+        return {"players": players, "missing_player_ids": missing_player_ids}
 
-        return average_stats
+    @staticmethod
+    def get_salary_frontier(
+        db: Session,
+        game_date: Optional[str] = None,
+        frontier_only: bool = False,
+    ) -> Dict:
+        """
+        获取薪资/评分帕累托前沿
+
+        结果按日期缓存，球员信息或比赛数据变化后失效。
+
+        Args:
+            db: 数据库会话
+            game_date: 比赛日期，None表示使用赛季平均评分
+            frontier_only: 只返回前沿上的球员
+
+        Returns:
+            包含 game_date、frontier_size 和 players(按薪资升序) 的字典
+
+        Raises:
+            ValidationError: 日期格式无效
+        """
+        date_obj = _parse_date_param(game_date, "game_date")
+        players = frontier_cache.get(
+            db, date_obj, lambda: _build_salary_frontier(db, date_obj)
+        )
+        frontier = [player for player in players if player["on_frontier"]]
+        return {
+            "game_date": game_date,
+            "frontier_size": len(frontier),
+            "players": [
+                {
+                    **player,
+                    "rating": round(player["rating"], 2),
+                    "rating_gap": round(player["rating_gap"], 2),
+                }
+                for player in (frontier if frontier_only else players)
+            ],
+        }
 
     @staticmethod
     def get_value_for_money(
@@ -555,7 +1326,7 @@ class StatsService:
         Raises:
             ValidationError: 日期格式无效
         """
-        players = db.query(PlayerInformation).all()
+        players = player_directory.get(db).all()
         player_data = []
 
         for player in players:
@@ -0,0 +1,197 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.logger import logger
+from app.db.session import SessionLocal
+from sqlalchemy.orm import Session
+
+_STOP = object()
+
+
+class LineupWriteQueue:
+    """
+    进程内单写入者队列
+
+    所有阵容写入由一个后台线程串行执行，线程把排队中的多个阵容合并为一次
+    事务提交(group commit)，避免并发提交在SQLite上产生 database is locked。
+    每个请求得到一个Future，在其所在事务提交后才返回阵容字典。
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_batch: int = 200,
+        max_wait_ms: float = 2.0,
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self._batches = 0
+        self._items = 0
+        self._commit_seconds = 0.0
+        self._max_commit_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """启动后台写入线程"""
+        if self.running:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="lineup-writer", daemon=True
+        )
+        self._thread.start()
+        logger.info("Lineup write queue started")
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """写完队列中剩余的阵容后停止后台线程"""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        logger.info(f"Lineup write queue stopped: {self.stats()}")
+
+    def submit(self, prepared: Tuple[Dict, List[Dict]]) -> Future:
+        """
+        提交一个待写入的阵容
+
+        Args:
+            prepared: LineupService._prepare_lineup 生成的(阵容行, 球员行列表)
+
+        Returns:
+            提交完成后结果为阵容字典的Future
+
+        Raises:
+            RuntimeError: 写入线程未启动
+        """
+        if not self.running:
+            raise RuntimeError("阵容写入队列未启动")
+        future: Future = Future()
+        self._queue.put((prepared, future))
+        return future
+
+    def stats(self) -> Dict:
+        """返回累计的批次数、写入数和提交耗时"""
+        with self._lock:
+            return {
+                "batches": self._batches,
+                "lineups": self._items,
+                "avg_batch_size": (
+                    round(self._items / self._batches, 2) if self._batches else 0
+                ),
+                "avg_commit_ms": (
+                    round(self._commit_seconds * 1000 / self._batches, 2)
+                    if self._batches
+                    else 0
+                ),
+                "max_commit_ms": round(self._max_commit_seconds * 1000, 2),
+            }
+
+    def _collect(self, first) -> Tuple[list, bool]:
+        """以第一个任务为起点，在max_wait内收集更多任务组成一批"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = (
+                    self._queue.get(timeout=remaining)
+                    if remaining > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch, stopping = self._collect(first)
+            self._write(batch)
+
+        # 停止前写完剩余任务
+        pending = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                pending.append(item)
+        for start in range(0, len(pending), self.max_batch):
+            self._write(pending[start : start + self.max_batch])
+
+    def _write(self, batch: list) -> None:
+        from app.services.lineup_service import LineupService
+
+        batch = [
+            (prepared, future)
+            for prepared, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+
+        db = self.session_factory()
+        try:
+            start = time.perf_counter()
+            results = LineupService._insert_lineups(
+                db, [prepared for prepared, _ in batch]
+            )
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            db.rollback()
+            db.close()
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+            else:
+                # 整批失败时逐个重试，只让有问题的阵容失败
+                logger.warning(f"Group commit failed, retrying one by one: {e}")
+                for item in batch:
+                    self._write_single(item)
+            return
+        db.close()
+
+        with self._lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._commit_seconds += elapsed
+            self._max_commit_seconds = max(self._max_commit_seconds, elapsed)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _write_single(self, item) -> None:
+        from app.services.lineup_service import LineupService
+
+        prepared, future = item
+        db = self.session_factory()
+        try:
+            result = LineupService._insert_lineups(db, [prepared])[0]
+        except Exception as e:
+            db.rollback()
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            db.close()
+
+
+lineup_write_queue = LineupWriteQueue()
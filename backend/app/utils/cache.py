@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar
+
+from app.core.logger import logger
+from app.models import DataVersion
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+
+def table_version(model: Any) -> Callable[[Session], Hashable]:
+    """
+    生成表数据版本函数，以行数、最大主键和 data_versions 中的版本号作为版本
+
+    行数和最大ID识别追加导入和整表重建，触发器维护的版本号识别原地更新和
+    删除，三者在一次查询中取得。模型需在 __table_args__ 中标记
+    info={"versioned": True}，init_db 才会为其创建触发器。
+
+    Args:
+        model: SQLAlchemy模型类，需包含id主键
+
+    Returns:
+        接收数据库会话、返回版本号的函数
+    """
+    data_version = (
+        select(DataVersion.version)
+        .where(DataVersion.table_name == model.__tablename__)
+        .scalar_subquery()
+    )
+
+    def version(db: Session) -> Hashable:
+        return tuple(
+            db.query(func.count(model.id), func.max(model.id), data_version).one()
+        )
+
+    return version
+
+
+class VersionedCache(Generic[T]):
+    """
+    按数据版本失效的进程内缓存
+
+    每次读取时最多每 check_interval 秒查询一次数据版本，版本变化时调用
+    loader 重新构建缓存值，其余时间直接返回内存中的值。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[Session], T],
+        version: Callable[[Session], Hashable],
+        check_interval: float = 5.0,
+    ):
+        self.name = name
+        self.loader = loader
+        self.version = version
+        self.check_interval = check_interval
+        self._value: Optional[T] = None
+        self._version: Optional[Hashable] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> T:
+        """
+        获取缓存值，必要时检查数据版本并重建
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            缓存值
+        """
+        if (
+            self._version is not None
+            and time.monotonic() - self._checked_at < self.check_interval
+        ):
+            return self._value
+
+        with self._lock:
+            if (
+                self._version is not None
+                and time.monotonic() - self._checked_at < self.check_interval
+            ):
+                return self._value
+            version = self.version(db)
+            if version != self._version:
+                started_at = time.perf_counter()
+                self._value = self.loader(db)
+                elapsed = (time.perf_counter() - started_at) * 1000
+                logger.info(
+                    f"Cache {self.name} rebuilt in {elapsed:.1f} ms "
+                    f"(version {version})"
+                )
+                self._version = version
+            self._checked_at = time.monotonic()
+            return self._value
+
+    def invalidate(self) -> None:
+        """使缓存失效，下次读取时重建"""
+        with self._lock:
+            self._value = None
+            self._version = None
+            self._checked_at = 0.0
+
+
+class VersionedLRUCache(Generic[T]):
+    """
+    按参数缓存计算结果、按数据版本整体失效的进程内缓存
+
+    数据版本由内部的 VersionedCache 跟踪，版本变化时换入一个新的空字典，
+    旧版本的全部结果随之丢弃。每个版本最多保留 maxsize 个结果，超出时淘汰
+    最久未使用的一项。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        version: Callable[[Session], Hashable],
+        maxsize: int = 64,
+        check_interval: float = 5.0,
+    ):
+        self.maxsize = maxsize
+        self._entries: VersionedCache[OrderedDict] = VersionedCache(
+            name, lambda db: OrderedDict(), version, check_interval
+        )
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, key: Hashable, compute: Callable[[], T]) -> T:
+        """
+        获取参数对应的结果，当前版本下没有缓存时调用 compute 计算
+
+        Args:
+            db: 数据库会话
+            key: 参数组成的缓存键
+            compute: 计算结果的函数
+
+        Returns:
+            缓存或新计算的结果
+        """
+        entries = self._entries.get(db)
+        with self._lock:
+            if key in entries:
+                entries.move_to_end(key)
+                return entries[key]
+
+        value = compute()
+        with self._lock:
+            entries[key] = value
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+        return value
+
+    def invalidate(self) -> None:
+        """丢弃全部缓存结果"""
+        self._entries.invalidate()
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 
 class PaginationError(Exception):
@@ -128,6 +128,66 @@ def paginate_with_metadata(
     return result
 
 
+def paginate_query(
+    query: Any,
+    page: int,
+    per_page: int,
+    items_key: str = "items",
+    count_query: Any = None,
+    transform: Optional[Callable[[List[Any]], List[Any]]] = None,
+    max_per_page: Optional[int] = None,
+    **metadata,
+) -> Dict[str, Any]:
+    """
+    在数据库端进行分页，只取出当前页的数据
+
+    Args:
+        query: 已排序的SQLAlchemy查询
+        page: 当前页码（从1开始）
+        per_page: 每页数量
+        items_key: 返回结果中数据项的键名，默认为"items"
+        count_query: 返回总数的标量查询，None表示对query计数
+        transform: 对当前页数据进行转换的函数
+        max_per_page: 每页最大数量限制，None表示不限制
+        **metadata: 额外的元数据，将直接添加到返回结果中
+
+    Returns:
+        包含分页数据、分页信息和额外元数据的字典
+
+    Raises:
+        InvalidPageError: 页码无效时抛出
+        InvalidPerPageError: 每页数量无效时抛出
+    """
+    validate_pagination_params(page, per_page, max_per_page)
+
+    if count_query is not None:
+        total_items = count_query.scalar() or 0
+    else:
+        total_items = query.order_by(None).count()
+    total_pages = (total_items + per_page - 1) // per_page if per_page > 0 else 0
+
+    if page > total_pages and total_pages > 0:
+        raise InvalidPageError(
+            f"页码超出范围，最大页码为{total_pages}，当前值: {page}"
+        )
+
+    items = query.offset(calculate_offset(page, per_page)).limit(per_page).all()
+    if transform is not None:
+        items = transform(items)
+
+    result = {
+        items_key: items,
+        "pagination": {
+            "current_page": page,
+            "per_page": per_page,
+            "total_items": total_items,
+            "total_pages": total_pages,
+        },
+    }
+    result.update(metadata)
+    return result
+
+
 def get_pagination_info(
     total_items: int, page: int, per_page: int
 ) -> Dict[str, int]:
@@ -0,0 +1,165 @@
+"""
+阵容写入吞吐基准测试
+
+模拟截止时间前的提交高峰，在临时SQLite数据库上比较三种写入方式：
+逐行ORM写入(旧实现)、单个阵容批量写入(create_lineup)和批量导入(create_lineups_bulk)。
+
+用法:
+    python benchmarks/lineup_insert_benchmark.py --lineups 2000 --batch-size 100
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.db.session import Base  # noqa: E402
+from app.models import Lineup, LineupPlayer, PlayerInformation, User  # noqa: E402
+from app.services.lineup_service import LineupService  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+SLOTS = ["PG", "SG", "SF", "PF", "C"]
+POSITIONS = ["Guard", "Guard", "Forward", "Forward", "Center"] + ["Guard"] * 7
+ROSTERS = 20
+
+
+def seed_players(db) -> None:
+    """写入基准测试阵容用到的全部球员信息"""
+    db.add_all(
+        PlayerInformation(
+            player_id=roster * 12 + i + 1,
+            full_name=f"Player {roster * 12 + i + 1}",
+            team_name="Team",
+            position=POSITIONS[i],
+            salary=1000000,
+        )
+        for roster in range(ROSTERS)
+        for i in range(12)
+    )
+    db.commit()
+
+
+def make_lineup(index: int) -> dict:
+    roster = index % ROSTERS
+    players = [
+        {
+            "player_id": roster * 12 + i + 1,
+            "full_name": f"Player {roster * 12 + i + 1}",
+            "team_name": "Team",
+            "position": POSITIONS[i],
+            "salary": 1000000,
+            "slot": SLOTS[i] if i < len(SLOTS) else None,
+        }
+        for i in range(12)
+    ]
+    return {
+        "name": f"lineup-{index}",
+        "date": "2025-12-01",
+        "starting_players": players[:5],
+        "bench_players": players[5:],
+    }
+
+
+def create_lineup_per_row(db, user_id: int, lineup: dict) -> None:
+    """旧实现：逐行add，flush获取ID后commit并refresh"""
+    new_lineup = Lineup(
+        user_id=user_id,
+        name=lineup["name"],
+        date=datetime.strptime(lineup["date"], "%Y-%m-%d").date(),
+        total_salary=LineupService.calculate_total_salary(
+            lineup["starting_players"], lineup["bench_players"]
+        ),
+    )
+    db.add(new_lineup)
+    db.flush()
+    for players, is_starting in (
+        (lineup["starting_players"], True),
+        (lineup["bench_players"], False),
+    ):
+        for player in players:
+            db.add(
+                LineupPlayer(
+                    lineup_id=new_lineup.id,
+                    is_starting=is_starting,
+                    **{k: v for k, v in player.items() if k != "slot" or is_starting},
+                )
+            )
+    db.commit()
+    db.refresh(new_lineup)
+
+
+def run(name: str, session_factory, lineups: list, write) -> None:
+    db = session_factory()
+    try:
+        start = time.perf_counter()
+        write(db, lineups)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    print(
+        f"{name:<28} {len(lineups):>6} lineups  {elapsed * 1000:>9.1f} ms  "
+        f"{len(lineups) / elapsed:>9.1f} lineups/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lineups", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    lineups = [make_lineup(i) for i in range(args.lineups)]
+    batches = [
+        lineups[i : i + args.batch_size]
+        for i in range(0, len(lineups), args.batch_size)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scenarios = [
+            (
+                "per-row ORM (old)",
+                lambda db, items: [
+                    create_lineup_per_row(db, 1, lineup) for lineup in items
+                ],
+            ),
+            (
+                "create_lineup",
+                lambda db, items: [
+                    LineupService.create_lineup(
+                        db,
+                        1,
+                        lineup["name"],
+                        lineup["date"],
+                        lineup["starting_players"],
+                        lineup["bench_players"],
+                    )
+                    for lineup in items
+                ],
+            ),
+            (
+                f"create_lineups_bulk x{args.batch_size}",
+                lambda db, items: [
+                    LineupService.create_lineups_bulk(db, 1, batch) for batch in batches
+                ],
+            ),
+        ]
+        for index, (name, write) in enumerate(scenarios):
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, f'{index}.db')}")
+            Base.metadata.create_all(bind=engine)
+            session_factory = sessionmaker(bind=engine)
+            with session_factory() as db:
+                db.add(User(id=1, username="benchmark", password="x"))
+                db.commit()
+                seed_players(db)
+            run(name, session_factory, lineups, write)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+球员姓名检索基准测试
+
+在临时SQLite数据库中生成带重音符号的球员姓名，比较内存三字母组索引
+(PlayerSearchIndex)与 SQL LIKE '%q%' 全表扫描的单次查询耗时。
+注意 SQLite 的 LIKE 只忽略ASCII大小写，不忽略重音，因此命中结果也会不同。
+
+用法:
+    python benchmarks/player_search_benchmark.py --players 20000 --queries 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.db.session import Base  # noqa: E402
+from app.models import PlayerInformation  # noqa: E402
+from app.services.search_service import (  # noqa: E402
+    _build_player_search_index,
+    normalize_name,
+)
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+SYLLABLES = [
+    "ka", "lu", "dō", "nči", "jo", "kić", "ma", "ré", "šar", "vi", "tan",
+    "gö", "ran", "bo", "zi", "ņģ", "el", "as", "tu", "mi", "no", "ür", "de",
+    "os", "ča", "li", "be", "rt", "án", "ko",
+]  # fmt: skip
+
+
+def make_name(rng: random.Random) -> str:
+    def word() -> str:
+        text = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        return text.capitalize()
+
+    return f"{word()} {word()}"
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def report(name: str, timings: list, hits: int) -> None:
+    print(
+        f"{name:<16} avg {sum(timings) / len(timings) * 1000:>8.3f} ms  "
+        f"p50 {percentile(timings, 50) * 1000:>8.3f} ms  "
+        f"p99 {percentile(timings, 99) * 1000:>8.3f} ms  "
+        f"queries with hits {hits}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--players", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = [make_name(rng) for _ in range(args.players)]
+    queries = []
+    for _ in range(args.queries):
+        name = normalize_name(rng.choice(names))
+        start = rng.randrange(len(name) - 3)
+        queries.append(name[start : start + rng.randint(3, 7)].strip() or name[:3])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'search.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        with session_factory() as db:
+            db.add_all(
+                PlayerInformation(
+                    player_id=i,
+                    full_name=name,
+                    team_name=f"Team{i % 30}",
+                    position="Guard",
+                    salary=1000000,
+                )
+                for i, name in enumerate(names)
+            )
+            db.commit()
+
+            start = time.perf_counter()
+            index = _build_player_search_index(db)
+            print(
+                f"index build: {(time.perf_counter() - start) * 1000:.1f} ms "
+                f"for {args.players} players"
+            )
+
+            timings, hits = [], 0
+            for query in queries:
+                start = time.perf_counter()
+                results = index.search(query, 10)
+                timings.append(time.perf_counter() - start)
+                hits += bool(results)
+            report("trigram index", timings, hits)
+
+            timings, hits = [], 0
+            for query in queries:
+                start = time.perf_counter()
+                results = (
+                    db.query(PlayerInformation)
+                    .filter(PlayerInformation.full_name.like(f"%{query}%"))
+                    .limit(10)
+                    .all()
+                )
+                timings.append(time.perf_counter() - start)
+                hits += bool(results)
+            report("SQL LIKE", timings, hits)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
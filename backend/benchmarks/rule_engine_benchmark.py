@@ -0,0 +1,89 @@
+"""
+规则引擎批量验证基准测试
+
+在内存中生成大批阵容(包含一定比例的违规阵容)，测量编译后的验证计划
+逐个验证的吞吐量，并对比启用同队球员上限规则后的开销。
+
+用法:
+    python benchmarks/rule_engine_benchmark.py --lineups 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.services.rule_engine import (  # noqa: E402
+    DEFAULT_RULE_DEFINITIONS,
+    compile_rules,
+)
+
+SLOT_POSITIONS = {
+    "PG": "Guard",
+    "SG": "Guard",
+    "SF": "Forward",
+    "PF": "Forward",
+    "C": "Center",
+}
+
+
+def make_lineup(rng: random.Random, index: int) -> tuple:
+    def player(player_id, position, slot=None):
+        return {
+            "player_id": player_id,
+            "position": position,
+            "team_name": f"Team{rng.randrange(30)}",
+            "salary": rng.randrange(1000000, 30000000),
+            "slot": slot,
+        }
+
+    starting = [
+        player(index * 12 + i, position, slot)
+        for i, (slot, position) in enumerate(SLOT_POSITIONS.items())
+    ]
+    bench = [player(index * 12 + 5 + i, "Guard") for i in range(7)]
+    # 约十分之一的阵容包含重复球员或错误位置
+    if index % 20 == 0:
+        bench[0]["player_id"] = starting[0]["player_id"]
+    elif index % 20 == 1:
+        starting[4]["slot"], starting[0]["slot"] = "PG", "C"
+    return starting, bench
+
+
+def run(name: str, plan, lineups: list) -> None:
+    start = time.perf_counter()
+    valid = sum(1 for starting, bench in lineups if plan.evaluate(starting, bench)[0])
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<24} {len(lineups):>8} lineups  {valid:>8} valid  "
+        f"{elapsed * 1000:>9.1f} ms  {len(lineups) / elapsed:>11.0f} lineups/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lineups", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lineups = [make_lineup(rng, i) for i in range(args.lineups)]
+
+    start = time.perf_counter()
+    plan = compile_rules(DEFAULT_RULE_DEFINITIONS)
+    print(f"compile: {(time.perf_counter() - start) * 1000:.2f} ms")
+    run("default rules", plan, lineups)
+
+    team_plan = compile_rules(
+        DEFAULT_RULE_DEFINITIONS
+        + [{"type": "max_per_team", "description": "同队球员上限", "max_players": 3}]
+    )
+    run("default + max_per_team", team_plan, lineups)
+
+
+if __name__ == "__main__":
+    main()
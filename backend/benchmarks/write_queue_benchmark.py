@@ -0,0 +1,143 @@
+"""
+并发阵容提交基准测试
+
+模拟锁定时间前多个用户同时提交阵容，在临时SQLite数据库上比较：
+每个请求各自提交事务(create_lineup)与经单写入者队列合并提交(LineupWriteQueue)。
+输出吞吐量、提交延迟分位数和失败次数。
+
+用法:
+    python benchmarks/write_queue_benchmark.py --clients 50 --lineups 2000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.db.session import Base, _configure_sqlite  # noqa: E402
+from app.models import User  # noqa: E402
+from app.services.lineup_service import LineupService, LineupValidator  # noqa: E402
+from app.services.write_queue import LineupWriteQueue  # noqa: E402
+from lineup_insert_benchmark import make_lineup, seed_players  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def run_clients(clients: int, lineups: list, submit) -> tuple:
+    """启动clients个线程并发提交，返回(耗时, 延迟列表, 失败次数)"""
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def worker(items):
+        for lineup in items:
+            start = time.perf_counter()
+            try:
+                submit(lineup)
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [
+        threading.Thread(target=worker, args=(lineups[i::clients],))
+        for i in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies, errors
+
+
+def report(name: str, elapsed: float, latencies: list, errors: list) -> None:
+    print(
+        f"{name:<18} {len(latencies):>6} ok {len(errors):>4} failed  "
+        f"{len(latencies) / elapsed:>8.1f} lineups/s  "
+        f"p50 {percentile(latencies, 50) * 1000:>7.1f} ms  "
+        f"p95 {percentile(latencies, 95) * 1000:>7.1f} ms  "
+        f"p99 {percentile(latencies, 99) * 1000:>7.1f} ms"
+    )
+    if errors:
+        print(f"{'':<18} first error: {errors[0]}")
+
+
+def create_database(path: str):
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}
+    )
+    event.listen(engine, "connect", _configure_sqlite)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.add(User(id=1, username="benchmark", password="x"))
+        db.commit()
+        seed_players(db)
+    return engine, session_factory
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--lineups", type=int, default=2000)
+    args = parser.parse_args()
+
+    lineups = [make_lineup(i) for i in range(args.lineups)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, session_factory = create_database(os.path.join(tmp, "direct.db"))
+
+        def submit_direct(lineup):
+            with session_factory() as db:
+                LineupService.create_lineup(
+                    db,
+                    1,
+                    lineup["name"],
+                    lineup["date"],
+                    lineup["starting_players"],
+                    lineup["bench_players"],
+                )
+
+        report("per-request commit", *run_clients(args.clients, lineups, submit_direct))
+        engine.dispose()
+
+        engine, session_factory = create_database(os.path.join(tmp, "queue.db"))
+        write_queue = LineupWriteQueue(session_factory=session_factory)
+        write_queue.start()
+
+        def submit_queued(lineup):
+            players = (lineup["starting_players"], lineup["bench_players"])
+            with session_factory() as db:
+                validator = LineupValidator.load(db, [players])
+            prepared = LineupService._prepare_lineup(
+                validator,
+                1,
+                lineup["name"],
+                lineup["date"],
+                lineup["starting_players"],
+                lineup["bench_players"],
+            )
+            write_queue.submit(prepared).result()
+
+        report("group commit queue", *run_clients(args.clients, lineups, submit_queued))
+        write_queue.stop()
+        print(f"{'':<18} queue stats: {write_queue.stats()}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,10 @@ from app.api.rules import router as rules_router
 from app.api.stats import router as stats_router
 from app.core.config import settings
 from app.core.logger import logger
-from app.db.session import init_db
+from app.db.session import SessionLocal, init_db
+from app.services.player_service import register_teams
+from app.services.search_service import player_search_index
+from app.services.write_queue import lineup_write_queue
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -17,8 +20,13 @@ async def lifespan(app: FastAPI):
     logger.info("Starting ScoutsLens API...")
     init_db()
     logger.info("Database initialized successfully")
+    with SessionLocal() as db:
+        register_teams(db)
+        player_search_index.get(db)
+    lineup_write_queue.start()
     yield
     logger.info("Shutting down ScoutsLens API...")
+    lineup_write_queue.stop()
 
 
 app = FastAPI(
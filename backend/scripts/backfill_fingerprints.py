@@ -0,0 +1,30 @@
+"""
+阵容指纹补算任务
+
+为引入阵容指纹之前保存的阵容补算精确指纹和球员集合指纹。新阵容在写入时
+已计算指纹，本脚本只需在升级后运行一次，重复运行不会修改已有指纹。
+
+用法:
+    python scripts/backfill_fingerprints.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal, init_db  # noqa: E402
+from app.services.lineup_service import LineupService  # noqa: E402
+
+
+def main() -> None:
+    init_db()
+    db = SessionLocal()
+    try:
+        print(f"lineups backfilled: {LineupService.backfill_fingerprints(db)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
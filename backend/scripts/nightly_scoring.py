@@ -0,0 +1,36 @@
+"""
+夜间计分任务
+
+登记球员信息中新出现的球队，为所有已结束且尚未完成计分的日期计分、
+更新积分榜并生成差距分析，随后刷新球员评分稳定性指标，
+可由cron等调度器每天运行一次。
+
+用法:
+    python scripts/nightly_scoring.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal, init_db  # noqa: E402
+from app.services.player_service import register_teams  # noqa: E402
+from app.services.scoring_service import ScoringService  # noqa: E402
+from app.services.stats_service import refresh_player_consistency  # noqa: E402
+
+
+def main() -> None:
+    init_db()
+    db = SessionLocal()
+    try:
+        print(f"new teams: {register_teams(db)}")
+        for result in ScoringService.run_nightly(db):
+            print(result)
+        print(f"consistency profiles: {refresh_player_consistency(db)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import os
+from datetime import date
+
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.db.session import Base, _create_version_triggers  # noqa: E402
+from app.models import PlayerGameStats, PlayerInformation  # noqa: E402
+from app.services import optimization_service  # noqa: E402
+from app.services.player_cache import player_directory  # noqa: E402
+from app.services.player_service import team_registry  # noqa: E402
+from app.services.rule_engine import (  # noqa: E402
+    DEFAULT_RULE_DEFINITIONS,
+    compile_rules,
+)
+from app.services.search_service import player_search_index  # noqa: E402
+from app.services.stats_service import (  # noqa: E402
+    frontier_cache,
+    leaderboard_cache,
+    player_consistency,
+)
+
+CACHES = (
+    player_directory,
+    player_consistency,
+    leaderboard_cache,
+    frontier_cache,
+    optimization_service.sensitivity_cache,
+    team_registry,
+    player_search_index,
+)
+
+
+@pytest.fixture
+def db():
+    """每个测试使用独立的内存数据库，并清空进程内缓存"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    _create_version_triggers(engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    for cache in CACHES:
+        cache.invalidate()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+        for cache in CACHES:
+            cache.invalidate()
+
+
+@pytest.fixture
+def add_game(db):
+    """写入一场比赛数据，未指定的数据项为0"""
+
+    def add(person_id, game_date=date(2025, 1, 10), **stats):
+        stats.setdefault("minutes", 30)
+        stats.setdefault("teamName", "Team A")
+        game = PlayerGameStats(personId=person_id, game_date=game_date, **stats)
+        db.add(game)
+        db.commit()
+        return game
+
+    return add
+
+
+@pytest.fixture
+def add_player(db):
+    """写入一名球员的基础信息"""
+
+    def add(player_id, team_name="Team A", position="Guard", salary=1000000, **fields):
+        fields.setdefault("full_name", f"Player {player_id}")
+        player = PlayerInformation(
+            player_id=player_id,
+            team_name=team_name,
+            position=position,
+            salary=salary,
+            **fields,
+        )
+        db.add(player)
+        db.commit()
+        return player
+
+    return add
+
+
+@pytest.fixture
+def lineup_payload(add_player):
+    """
+    写入一套符合默认规则的球员(5名首发、7名替补，ID 1-12)，返回生成阵容
+    请求数据的函数；客户端提交的薪资等字段故意与数据库不一致
+    """
+    slots = ["PG", "SG", "SF", "PF", "C"]
+    positions = ["Guard", "Guard", "Forward", "Forward", "Center"]
+    for player_id in range(1, 13):
+        add_player(
+            player_id,
+            team_name=f"Team {player_id % 4}",
+            position=positions[player_id - 1] if player_id <= 5 else "Guard",
+            salary=player_id * 1000000,
+        )
+
+    def payload(name=None, date_str="2099-01-01", starters=None, bench=None):
+        starters = starters or dict(zip(slots, range(1, 6)))
+        bench = bench if bench is not None else list(range(6, 13))
+        return {
+            "name": name,
+            "date": date_str,
+            "starting_players": [
+                {"player_id": player_id, "slot": slot, "salary": 1}
+                for slot, player_id in starters.items()
+            ],
+            "bench_players": [
+                {"player_id": player_id, "salary": 1} for player_id in bench
+            ],
+        }
+
+    return payload
+
+
+@pytest.fixture
+def rule_plan(monkeypatch):
+    """以指定规则定义替换优化器使用的验证计划，默认为内置规则"""
+
+    def use(definitions=DEFAULT_RULE_DEFINITIONS):
+        plan = compile_rules(definitions)
+        monkeypatch.setattr(optimization_service, "get_rule_plan", lambda: plan)
+        return plan
+
+    return use
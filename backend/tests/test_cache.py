@@ -0,0 +1,38 @@
+from app.models import PlayerInformation
+from app.utils.cache import VersionedLRUCache, table_version
+
+
+def test_lru_cache_evicts_least_recently_used(db):
+    cache = VersionedLRUCache("test", table_version(PlayerInformation), maxsize=2)
+    computed = []
+
+    def compute(key):
+        computed.append(key)
+        return key * 10
+
+    assert cache.get(db, 1, lambda: compute(1)) == 10
+    assert cache.get(db, 2, lambda: compute(2)) == 20
+    assert cache.get(db, 1, lambda: compute(1)) == 10
+    cache.get(db, 3, lambda: compute(3))
+    cache.get(db, 1, lambda: compute(1))
+    cache.get(db, 2, lambda: compute(2))
+
+    # 第3次写入时淘汰最久未使用的键2，键1仍在缓存中
+    assert computed == [1, 2, 3, 2]
+
+
+def test_lru_cache_drops_results_when_version_changes(db, add_player):
+    cache = VersionedLRUCache(
+        "test", table_version(PlayerInformation), check_interval=0
+    )
+    add_player(1)
+    assert cache.get(db, "key", lambda: "old") == "old"
+    assert cache.get(db, "key", lambda: "new") == "old"
+
+    db.query(PlayerInformation).update({"salary": 1})
+    db.commit()
+
+    assert cache.get(db, "key", lambda: "new") == "new"
+
+    cache.invalidate()
+    assert cache.get(db, "key", lambda: "newer") == "newer"
@@ -0,0 +1,481 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.exceptions.base import PermissionDenied, ValidationError
+from app.models import (
+    DailyOptimalScore,
+    Lineup,
+    LineupPlayer,
+    PlayerGameStats,
+    User,
+)
+from app.services.lineup_service import (
+    LineupService,
+    LineupValidator,
+    roster_fingerprints,
+)
+from app.services.stats_service import game_score_expression
+
+GAME_DATE = date(2025, 1, 10)
+
+
+@pytest.fixture
+def unscored_lineups(db, add_game):
+    """两名用户在已锁定但尚未计分的日期提交的阵容"""
+    db.add_all(
+        [
+            User(id=1, username="alice", password="x"),
+            User(id=2, username="bob", password="x"),
+        ]
+    )
+    for person_id, made in ((1, 10), (2, 4), (3, 7), (4, 1)):
+        add_game(person_id, game_date=GAME_DATE, twoPointersMade=made)
+
+    rosters = {
+        # 阵容名称: (用户ID, [(球员ID, 是否首发)])
+        "starter-heavy": (1, [(1, True), (4, False)]),
+        "bench-heavy": (2, [(4, True), (1, False)]),
+        "middle": (2, [(3, True), (2, False)]),
+        "no-games": (1, [(99, True)]),
+    }
+    for name, (user_id, players) in rosters.items():
+        lineup = Lineup(
+            user_id=user_id,
+            name=name,
+            date=GAME_DATE,
+            total_salary=0,
+            created_at=datetime(2025, 1, 9),
+        )
+        lineup.players = [
+            LineupPlayer(
+                player_id=player_id,
+                full_name=f"Player {player_id}",
+                team_name="Team A",
+                position="Guard",
+                salary=0,
+                slot="PG" if is_starting else None,
+                is_starting=is_starting,
+            )
+            for player_id, is_starting in players
+        ]
+        db.add(lineup)
+    db.commit()
+
+    ratings = dict(db.query(PlayerGameStats.personId, game_score_expression()))
+    return {
+        name: sum(
+            ratings.get(player_id, 0) * (2 if is_starting else 1)
+            for player_id, is_starting in players
+        )
+        for name, (_, players) in rosters.items()
+    }
+
+
+@pytest.mark.parametrize("sort_order", ["desc", "asc"])
+def test_actual_score_sort_uses_live_scores_for_unscored_date(
+    db, unscored_lineups, sort_order
+):
+    result = LineupService.get_lineups_by_date(
+        db,
+        GAME_DATE.isoformat(),
+        current_user_id=1,
+        sort_by="actual_score",
+        sort_order=sort_order,
+    )
+
+    expected = sorted(
+        unscored_lineups.items(),
+        key=lambda item: item[1],
+        reverse=sort_order == "desc",
+    )
+    lineups = result["lineups"]
+    assert [lineup["name"] for lineup in lineups] == [name for name, _ in expected]
+    for lineup, (_, score) in zip(lineups, expected):
+        assert lineup["actual_score"] == pytest.approx(round(score, 2))
+
+
+def test_actual_score_sort_prefers_stored_scores(db, unscored_lineups):
+    middle = db.query(Lineup).filter(Lineup.name == "middle").one()
+    middle.actual_score = 1000.0
+    db.commit()
+
+    result = LineupService.get_lineups_by_date(
+        db, GAME_DATE.isoformat(), current_user_id=1, sort_by="actual_score"
+    )
+
+    assert result["lineups"][0]["name"] == "middle"
+    assert result["lineups"][0]["actual_score"] == 1000.0
+
+
+FUTURE_DATE = date(2099, 1, 1)
+
+
+@pytest.fixture
+def future_lineups(db):
+    """尚未锁定日期的阵容，alice 3个、bob 4个，薪资各不相同"""
+    db.add_all(
+        [
+            User(id=1, username="alice", password="x"),
+            User(id=2, username="bob", password="x"),
+        ]
+    )
+    for index in range(7):
+        lineup = Lineup(
+            user_id=1 if index < 3 else 2,
+            name=f"lineup-{index}",
+            date=FUTURE_DATE,
+            total_salary=(index * 3 % 7) * 1000000,
+            created_at=datetime(2098, 12, 1, index),
+        )
+        lineup.players = [
+            LineupPlayer(
+                player_id=100 + index,
+                full_name=f"Player {100 + index}",
+                team_name="Team A",
+                position="Guard",
+                salary=0,
+                slot="PG",
+                is_starting=True,
+            )
+        ]
+        db.add(lineup)
+    db.commit()
+
+
+@pytest.mark.parametrize("sort_by", ["created_at", "total_salary"])
+@pytest.mark.parametrize("sort_order", ["desc", "asc"])
+def test_lineups_by_date_pages_cover_every_lineup_once(
+    db, future_lineups, sort_by, sort_order
+):
+    pages = [
+        LineupService.get_lineups_by_date(
+            db,
+            FUTURE_DATE.isoformat(),
+            current_user_id=1,
+            page=page,
+            per_page=3,
+            sort_by=sort_by,
+            sort_order=sort_order,
+        )
+        for page in (1, 2, 3)
+    ]
+
+    assert pages[0]["pagination"]["total_items"] == 7
+    assert pages[0]["pagination"]["total_pages"] == 3
+    lineups = [lineup for page in pages for lineup in page["lineups"]]
+    assert len({lineup["id"] for lineup in lineups}) == 7
+    values = [lineup[sort_by] for lineup in lineups]
+    assert values == sorted(values, reverse=sort_order == "desc")
+
+
+def test_lineups_by_date_hides_other_users_players_before_lock(db, future_lineups):
+    result = LineupService.get_lineups_by_date(
+        db, FUTURE_DATE.isoformat(), current_user_id=1, per_page=10
+    )
+
+    for lineup in result["lineups"]:
+        mine = lineup["user_id"] == 1
+        assert lineup["can_view"] == mine
+        assert bool(lineup["players"]) == mine
+
+
+@pytest.mark.parametrize(
+    "filters, expected",
+    [
+        ({"mine_only": True}, 3),
+        ({"user_id": 2}, 4),
+        ({"mine_only": True, "user_id": 2}, 3),
+        ({"min_salary": 4000000}, 3),
+        ({"user_id": 2, "min_salary": 4000000}, 2),
+    ],
+)
+def test_lineups_by_date_filters(db, future_lineups, filters, expected):
+    result = LineupService.get_lineups_by_date(
+        db, FUTURE_DATE.isoformat(), current_user_id=1, per_page=10, **filters
+    )
+
+    assert result["pagination"]["total_items"] == expected
+    assert len(result["lineups"]) == expected
+    if filters.get("mine_only"):
+        assert {lineup["user_id"] for lineup in result["lineups"]} == {1}
+    if "min_salary" in filters:
+        assert all(
+            lineup["total_salary"] >= filters["min_salary"]
+            for lineup in result["lineups"]
+        )
+
+
+@pytest.mark.parametrize("date_str", ["", "2099-13-01"])
+def test_lineups_by_date_rejects_invalid_date(db, date_str):
+    with pytest.raises(ValidationError):
+        LineupService.get_lineups_by_date(db, date_str, current_user_id=1)
+
+
+def _create(db, user_id, payload):
+    return LineupService.create_lineup(
+        db,
+        user_id,
+        payload["name"],
+        payload["date"],
+        payload["starting_players"],
+        payload["bench_players"],
+    )
+
+
+def test_create_lineup_returns_the_stored_lineup(db, lineup_payload):
+    db.add(User(id=1, username="alice", password="x"))
+    db.commit()
+
+    created = _create(db, 1, lineup_payload("first"))
+
+    stored = db.get(Lineup, created["id"])
+    assert created == stored.to_dict()
+    assert created["total_salary"] == sum(range(1, 13)) * 1000000
+    assert [p["slot"] for p in created["players"][:5]] == [
+        "PG",
+        "SG",
+        "SF",
+        "PF",
+        "C",
+    ]
+    assert not any(p["is_starting"] for p in created["players"][5:])
+
+
+def test_create_lineups_bulk_writes_in_order(db, lineup_payload):
+    payloads = [lineup_payload(f"bulk-{index}") for index in range(3)]
+
+    created = LineupService.create_lineups_bulk(db, 1, payloads)
+
+    assert [lineup["name"] for lineup in created] == ["bulk-0", "bulk-1", "bulk-2"]
+    assert [lineup["id"] for lineup in created] == sorted(
+        lineup["id"] for lineup in created
+    )
+    assert db.query(LineupPlayer).count() == 3 * 12
+    for lineup in created:
+        assert lineup == db.get(Lineup, lineup["id"]).to_dict()
+
+
+def test_create_lineups_bulk_rejects_whole_batch(db, lineup_payload):
+    payloads = [lineup_payload("ok"), lineup_payload("bad", bench=[6, 7])]
+
+    with pytest.raises(ValidationError, match="第2个阵容无效"):
+        LineupService.create_lineups_bulk(db, 1, payloads)
+
+    assert db.query(Lineup).count() == 0
+    assert db.query(LineupPlayer).count() == 0
+
+
+def test_create_lineups_bulk_requires_lineups(db):
+    with pytest.raises(ValidationError):
+        LineupService.create_lineups_bulk(db, 1, [])
+
+
+def test_validate_lineups_uses_authoritative_player_data(
+    db, lineup_payload, add_player
+):
+    add_player(13, position="Guard", salary=200000000)
+    valid = lineup_payload()
+    unknown = lineup_payload(bench=list(range(6, 12)) + [999])
+    # 客户端声称6号球员是中锋，数据库中他是后卫
+    wrong_slot = lineup_payload(
+        starters={"PG": 1, "SG": 2, "SF": 3, "PF": 4, "C": 6},
+        bench=[5] + list(range(7, 13)),
+    )
+    wrong_slot["starting_players"][4]["position"] = "Center"
+    over_cap = lineup_payload(bench=list(range(6, 12)) + [13])
+
+    results = LineupService.validate_lineups(db, [valid, unknown, wrong_slot, over_cap])
+
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert [result["valid"] for result in results] == [True, False, False, False]
+    assert results[1]["message"] == "球员不存在: 999"
+    assert results[2]["message"] == "首发球员位置不符合规则"
+    assert results[3]["message"] == "阵容薪资超过限制"
+
+
+def test_lineup_validator_loads_only_referenced_players(db, lineup_payload):
+    payload = lineup_payload()
+    validator = LineupValidator.load(
+        db, [(payload["starting_players"][:2], payload["bench_players"][:1])]
+    )
+
+    assert set(validator.players) == {1, 2, 6}
+    starters, bench = validator.resolve(
+        payload["starting_players"][:2], payload["bench_players"][:1]
+    )
+    assert [(p["player_id"], p["slot"], p["salary"]) for p in starters] == [
+        (1, "PG", 1000000),
+        (2, "SG", 2000000),
+    ]
+    assert bench[0]["slot"] is None and bench[0]["salary"] == 6000000
+
+
+def test_roster_fingerprints():
+    starters = [{"player_id": 1, "slot": "PG"}, {"player_id": 2, "slot": "SG"}]
+    bench = [{"player_id": 3}, {"player_id": 4}]
+    exact, player_set = roster_fingerprints(starters, bench)
+
+    # 输入顺序不影响指纹
+    assert roster_fingerprints(starters[::-1], bench[::-1]) == (exact, player_set)
+    # 调换首发位置只改变精确指纹
+    swapped = [{"player_id": 1, "slot": "SG"}, {"player_id": 2, "slot": "PG"}]
+    assert roster_fingerprints(swapped, bench) != (exact, player_set)
+    assert roster_fingerprints(swapped, bench)[1] == player_set
+    # 首发和替补互换也只改变精确指纹
+    moved = [{"player_id": 3, "slot": "PG"}, {"player_id": 2, "slot": "SG"}]
+    assert roster_fingerprints(moved, [{"player_id": 1}, {"player_id": 4}])[1] == (
+        player_set
+    )
+
+
+@pytest.fixture
+def owned_lineups(db, lineup_payload, add_player):
+    """同一已锁定日期的4个阵容：两个完全相同、一个调换首发位置、一个不同"""
+    add_player(13, position="Guard", salary=13000000)
+    date_str = GAME_DATE.isoformat()
+    same = lineup_payload("same", date_str)
+    reordered = lineup_payload("reordered", date_str)
+    reordered["starting_players"].reverse()
+    reordered["bench_players"].reverse()
+    swapped = lineup_payload(
+        "swapped", date_str, starters={"PG": 2, "SG": 1, "SF": 3, "PF": 4, "C": 5}
+    )
+    other = lineup_payload("other", date_str, bench=list(range(6, 12)) + [13])
+    created = LineupService.create_lineups_bulk(db, 1, [same, reordered])
+    created += LineupService.create_lineups_bulk(db, 2, [swapped, other])
+    return {lineup["name"]: lineup["id"] for lineup in created}
+
+
+def test_ownership_groups_duplicates_by_fingerprint(db, owned_lineups):
+    result = LineupService.get_ownership(db, GAME_DATE.isoformat(), current_user_id=3)
+
+    assert result["total_lineups"] == 4
+    assert result["unique_rosters"] == 3
+    groups = {group["kind"]: group for group in result["duplicates"]}
+    assert groups["exact"]["lineup_ids"] == sorted(
+        [owned_lineups["same"], owned_lineups["reordered"]]
+    )
+    assert groups["exact"]["users"] == 1
+    assert groups["player_set"]["lineup_ids"] == sorted(
+        owned_lineups[name] for name in ("same", "reordered", "swapped")
+    )
+    assert groups["player_set"]["users"] == 2
+
+    players = {player["player_id"]: player for player in result["players"]}
+    assert players[1]["ownership"] == 100.0
+    assert players[12]["ownership"] == 75.0
+    assert players[13]["ownership"] == 25.0
+    assert players[13]["start_rate"] == 0.0
+
+
+def test_backfill_fingerprints_restores_duplicate_groups(db, owned_lineups):
+    expected = LineupService.get_ownership(db, GAME_DATE.isoformat(), 1)
+    db.query(Lineup).update(
+        {Lineup.roster_fingerprint: None, Lineup.player_set_fingerprint: None}
+    )
+    db.commit()
+
+    # 尚未补算指纹的阵容不参与重复分组，读取持有率不会写入指纹
+    assert LineupService.get_ownership(db, GAME_DATE.isoformat(), 1)["duplicates"] == []
+    assert db.query(Lineup).filter(Lineup.roster_fingerprint.isnot(None)).count() == 0
+
+    assert LineupService.backfill_fingerprints(db, batch_size=3) == 4
+    assert LineupService.backfill_fingerprints(db) == 0
+    assert LineupService.get_ownership(db, GAME_DATE.isoformat(), 1) == expected
+
+
+def test_ownership_before_lock_and_without_lineups(db):
+    with pytest.raises(PermissionDenied):
+        LineupService.get_ownership(db, "2099-01-01", current_user_id=1)
+
+    empty = LineupService.get_ownership(db, GAME_DATE.isoformat(), current_user_id=1)
+    assert empty["total_lineups"] == 0
+    assert empty["unique_rosters"] == 0
+
+
+@pytest.fixture
+def scored_history(db):
+    """alice 在三个已计分日期的阵容以及一个未计分的阵容，bob 一个阵容"""
+    db.add_all(
+        [
+            User(id=1, username="alice", password="x"),
+            User(id=2, username="bob", password="x"),
+            DailyOptimalScore(
+                date=date(2025, 1, 1), optimal_score=100.0, total_salary=1
+            ),
+            DailyOptimalScore(
+                date=date(2025, 1, 2), optimal_score=90.0, total_salary=1
+            ),
+        ]
+    )
+    rows = [
+        # (用户ID, 日期, 得分, 名次, 与最佳阵容的差距)
+        (1, date(2025, 1, 1), 80.0, 1, 20.0),
+        (1, date(2025, 1, 2), 60.0, 3, 30.0),
+        (1, date(2025, 1, 2), 70.0, 2, 20.0),
+        (1, date(2025, 1, 3), None, None, None),
+        (2, date(2025, 1, 2), 90.0, 1, 0.0),
+    ]
+    for index, (user_id, day, score, rank, gap) in enumerate(rows):
+        db.add(
+            Lineup(
+                user_id=user_id,
+                name=f"lineup-{index}",
+                date=day,
+                total_salary=0,
+                created_at=datetime(2025, 1, 1, index),
+                actual_score=score,
+                rank=rank,
+                gap_to_optimal=gap,
+            )
+        )
+    db.commit()
+
+
+def test_user_lineups_pages_newest_first_with_summary(db, scored_history):
+    result = LineupService.get_user_lineups(db, 1, page=1, per_page=2)
+
+    assert result["pagination"]["total_items"] == 4
+    assert [lineup["name"] for lineup in result["lineups"]] == [
+        "lineup-3",
+        "lineup-2",
+    ]
+    assert [lineup["optimal_score"] for lineup in result["lineups"]] == [None, 90.0]
+    assert result["summary"] == {
+        "lineups": 4,
+        "scored": 3,
+        "average_score": 70.0,
+        "best_score": 80.0,
+        "best_rank": 1,
+        "wins": 1,
+        "average_gap_to_optimal": pytest.approx(23.33),
+    }
+
+    second = LineupService.get_user_lineups(db, 1, page=2, per_page=2)
+    assert [lineup["name"] for lineup in second["lineups"]] == [
+        "lineup-1",
+        "lineup-0",
+    ]
+    assert second["summary"] == result["summary"]
+
+
+def test_user_lineups_date_range(db, scored_history):
+    result = LineupService.get_user_lineups(
+        db, 1, date_from="2025-01-02", date_to="2025-01-02"
+    )
+
+    assert [lineup["name"] for lineup in result["lineups"]] == [
+        "lineup-2",
+        "lineup-1",
+    ]
+    assert result["summary"]["wins"] == 0
+    assert result["summary"]["average_gap_to_optimal"] == 25.0
+
+    empty = LineupService.get_user_lineups(db, 2, date_from="2025-01-03")
+    assert empty["lineups"] == []
+    assert empty["summary"]["wins"] == 0
+    assert empty["summary"]["average_score"] is None
+
+    with pytest.raises(ValidationError):
+        LineupService.get_user_lineups(db, 1, date_from="2025/01/02")
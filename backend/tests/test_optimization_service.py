@@ -0,0 +1,339 @@
+import itertools
+import random
+
+import pytest
+
+from app.exceptions.base import ValidationError
+from app.services.optimization_service import (
+    _swap_gain_bounds,
+    analyze_sensitivity,
+    complete_roster,
+    solve_roster,
+)
+from app.services.rule_engine import DEFAULT_RULE_DEFINITIONS, compile_rules
+
+POSITIONS = ["Guard", "Guard-Forward", "Forward", "Forward-Center", "Center"]
+DEFAULT_BENCH_SIZE = compile_rules(DEFAULT_RULE_DEFINITIONS).bench_size
+
+# 两个首发位置、一名替补、同队最多一人的精简规则
+SMALL_RULES = [
+    {"type": "roster_size", "starters": 2, "bench": 1},
+    {"type": "unique_players"},
+    {
+        "type": "starter_slots",
+        "slots": ["PG", "C"],
+        "position_map": {"Guard": ["PG", "SG"], "Center": ["C"]},
+    },
+    {"type": "salary_cap", "max_salary": 3000000},
+    {"type": "max_per_team", "max_players": 1},
+]
+
+
+@pytest.fixture
+def players():
+    # 每个位置4名球员，薪资足够低，任意组合都不超过薪资上限
+    return [
+        {
+            "id": 100 + index,
+            "name": f"Player {index}",
+            "position": POSITIONS[index % len(POSITIONS)],
+            "salary": 1000000 + index * 10000,
+            "team": f"Team {index % 10}",
+            "rating": float(10 + index),
+        }
+        for index in range(20)
+    ]
+
+
+def _roster_ids(roster):
+    return [p["id"] for p in roster["starters"].values()] + [
+        p["id"] for p in roster["bench"]
+    ]
+
+
+def test_complete_roster_keeps_locked_players(players, rule_plan):
+    plan = rule_plan()
+    center = next(p for p in players if p["position"] == "Center")
+    guard = next(p for p in players if p["position"] == "Guard")
+
+    roster = complete_roster(players, {"C": center["id"]}, [guard["id"]], [])
+
+    assert roster["starters"]["C"]["id"] == center["id"]
+    assert guard["id"] in [p["id"] for p in roster["bench"]]
+    assert list(roster["starters"]) == plan.starter_slots
+    assert len(roster["bench"]) == plan.bench_size
+    ids = _roster_ids(roster)
+    assert len(set(ids)) == len(ids)
+    assert roster["total_salary"] == sum(p["salary"] for p in players if p["id"] in ids)
+
+
+def test_complete_roster_skips_excluded_players(players, rule_plan):
+    rule_plan()
+    excluded = [p["id"] for p in players[-4:]]
+
+    roster = complete_roster(players, {}, [], excluded)
+
+    assert not set(excluded) & set(_roster_ids(roster))
+
+
+@pytest.mark.parametrize(
+    "locked_starters, locked_bench, excluded, message",
+    [
+        ({"PG": 100}, [100], [], "锁定球员不能重复"),
+        (
+            {},
+            list(range(100, 100 + DEFAULT_BENCH_SIZE + 1)),
+            [],
+            f"替补球员最多{DEFAULT_BENCH_SIZE}名",
+        ),
+        ({"XX": 100}, [], [], "无效的首发位置: XX"),
+        ({"PG": 999}, [], [], "球员999当日没有比赛数据"),
+        ({}, [999], [], "球员999当日没有比赛数据"),
+        ({"PG": 104}, [], [], "球员Player 4不能担任PG"),
+        ({"PG": 100}, [], [100], "锁定球员不能同时被排除"),
+    ],
+)
+def test_complete_roster_rejects_invalid_locks(
+    players, rule_plan, locked_starters, locked_bench, excluded, message
+):
+    rule_plan()
+    with pytest.raises(ValidationError, match=message):
+        complete_roster(players, locked_starters, locked_bench, excluded)
+
+
+def test_complete_roster_rejects_locked_salary_over_cap(players, rule_plan):
+    plan = rule_plan()
+    players[0]["salary"] = plan.salary_cap + 1
+
+    with pytest.raises(ValidationError, match="锁定球员薪资超过限制"):
+        complete_roster(players, {"PG": players[0]["id"]}, [], [])
+
+
+def test_optimizer_follows_current_rule_plan(rule_plan):
+    players = [
+        {"id": 1, "position": "Guard", "salary": 1000000, "team": "A", "rating": 30.0},
+        {"id": 2, "position": "Guard", "salary": 1000000, "team": "A", "rating": 25.0},
+        {"id": 3, "position": "Guard", "salary": 1000000, "team": "B", "rating": 5.0},
+        {"id": 4, "position": "Center", "salary": 2500000, "team": "C", "rating": 40.0},
+        {"id": 5, "position": "Center", "salary": 1000000, "team": "C", "rating": 8.0},
+    ]
+    rule_plan(SMALL_RULES)
+
+    roster = solve_roster(players)
+
+    # 薪资上限排除了40分的中锋，同队上限排除了第二名A队后卫
+    assert {slot: p["id"] for slot, p in roster["starters"].items()} == {
+        "PG": 1,
+        "C": 5,
+    }
+    assert [p["id"] for p in roster["bench"]] == [3]
+    with pytest.raises(ValidationError, match="无效的首发位置: SF"):
+        complete_roster(players, {"SF": 1}, [], [])
+    with pytest.raises(ValidationError, match="替补球员最多1名"):
+        complete_roster(players, {}, [2, 3], [])
+
+
+def _brute_force_rosters(players, plan, salary_cap):
+    """枚举所有满足位置、同队和薪资规则的阵容，返回 (角色 -> 球员, 评分, 薪资)"""
+    slots = plan.starter_slots + ["BENCH"] * plan.bench_size
+    rosters = []
+    for chosen in itertools.permutations(players, len(slots)):
+        bench = chosen[len(plan.starter_slots) :]
+        if any(a["id"] > b["id"] for a, b in zip(bench, bench[1:])):
+            continue
+        if any(
+            slot not in plan.position_map.get(p["position"], [])
+            for slot, p in zip(plan.starter_slots, chosen)
+        ):
+            continue
+        teams = [p["team"] for p in chosen]
+        if plan.max_per_team is not None and any(
+            teams.count(team) > plan.max_per_team for team in teams
+        ):
+            continue
+        salary = sum(p["salary"] for p in chosen)
+        if salary_cap is not None and salary > salary_cap:
+            continue
+        coefs = {
+            p["id"]: (2 if slot != "BENCH" else 1) for slot, p in zip(slots, chosen)
+        }
+        rating = sum(p["rating"] * coefs[p["id"]] for p in chosen)
+        rosters.append((coefs, rating, salary))
+    return rosters
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("max_per_team", [None, 1])
+def test_analyze_sensitivity_matches_brute_force(rule_plan, seed, max_per_team):
+    rng = random.Random(seed)
+    rules = [r for r in SMALL_RULES if r["type"] != "max_per_team"]
+    if max_per_team is not None:
+        rules.append({"type": "max_per_team", "max_players": max_per_team})
+    plan = rule_plan(rules)
+    players = [
+        {
+            "id": i,
+            "name": f"Player {i}",
+            "position": ["Guard", "Center"][i] if i < 2 else rng.choice(POSITIONS),
+            "salary": rng.randint(5, 15) * 100000,
+            "team": "ABCD"[i % 4],
+            "rating": float(rng.randint(0, 30)),
+        }
+        for i in range(9)
+    ]
+
+    report = analyze_sensitivity(players, near_miss_limit=len(players))
+
+    feasible = _brute_force_rosters(players, plan, plan.salary_cap)
+    uncapped = _brute_force_rosters(players, plan, None)
+    best = max(rating for _, rating, _ in feasible)
+    assert report["lineup"]["total_rating"] == pytest.approx(best)
+
+    for result in report["players"]:
+        pid = result["id"]
+        without = max(
+            (rating for coefs, rating, _ in feasible if pid not in coefs),
+            default=None,
+        )
+        if without is None:
+            # 缺少该球员时没有可行阵容
+            assert result["rating_drop_to_leave"] is None
+            assert result["salary_rise_to_leave"] is None
+            continue
+        # 评分下降d后，所有包含该球员的阵容都不优于不含该球员的最优阵容
+        drop = max(
+            (rating - without) / coefs[pid]
+            for coefs, rating, _ in feasible
+            if pid in coefs
+        )
+        cheapest = min(
+            salary
+            for coefs, rating, salary in uncapped
+            if pid in coefs and rating >= without
+        )
+        assert result["rating_drop_to_leave"] == pytest.approx(round(drop, 2))
+        assert result["salary_rise_to_leave"] == plan.salary_cap - cheapest
+
+    selected_ids = {result["id"] for result in report["players"]}
+    for result in report["near_misses"]:
+        pid = result["id"]
+        assert pid not in selected_ids
+        gains = {
+            (best - rating) / coefs[pid]: coefs[pid]
+            for coefs, rating, _ in feasible
+            if pid in coefs
+        }
+        gain = min(gains)
+        assert result["rating_gain_to_enter"] == pytest.approx(round(gain, 2))
+        assert (result["role"] == "BENCH") == (gains[gain] == 1)
+
+        bounds = _swap_gain_bounds(
+            next(p for p in players if p["id"] == pid), report["lineup"]
+        )
+        assert min(bounds.values()) >= gain - 1e-9
+
+
+def test_swap_gain_bounds_respect_slots_and_team_limit(rule_plan):
+    rule_plan(SMALL_RULES)
+    guard = {
+        "id": 1,
+        "position": "Guard",
+        "salary": 1000000,
+        "team": "A",
+        "rating": 20.0,
+    }
+    center = {
+        "id": 2,
+        "position": "Center",
+        "salary": 1000000,
+        "team": "B",
+        "rating": 20.0,
+    }
+    bench = {
+        "id": 3,
+        "position": "Center",
+        "salary": 500000,
+        "team": "C",
+        "rating": 5.0,
+    }
+    roster = {
+        "starters": {"PG": guard, "C": center},
+        "bench": [bench],
+        "total_rating": 85.0,
+        "total_salary": 2500000,
+    }
+
+    # 规则中的SG不是首发位置，不应被当作可替换的位置
+    same_team = {
+        "id": 4,
+        "position": "Guard",
+        "salary": 1000000,
+        "team": "A",
+        "rating": 8.0,
+    }
+    assert _swap_gain_bounds(same_team, roster) == {"PG": 12.0}
+
+    # 替换C队以外的球员会使B队超过同队上限
+    other_team = {
+        "id": 5,
+        "position": "Guard",
+        "salary": 500000,
+        "team": "C",
+        "rating": 8.0,
+    }
+    assert _swap_gain_bounds(other_team, roster) == {"BENCH": -3.0}
+
+
+@pytest.mark.parametrize("risk", [-0.5, 0.0, 0.2, 1.0])
+def test_solve_roster_risk_objective_matches_brute_force(rule_plan, risk):
+    plan = rule_plan(SMALL_RULES)
+    rng = random.Random(11)
+    players = [
+        {
+            "id": i,
+            "name": f"Player {i}",
+            "position": ["Guard", "Center"][i % 2],
+            "salary": rng.randint(5, 12) * 100000,
+            "team": "ABCDEFGH"[i],
+            "rating": float(rng.randint(5, 25)),
+            "rating_std": float(rng.randint(0, 8)),
+        }
+        for i in range(8)
+    ]
+    std = {p["id"]: p["rating_std"] for p in players}
+    rating = {p["id"]: p["rating"] for p in players}
+
+    def objective(coefs):
+        return sum(
+            w * rating[pid] - risk * w * w * std[pid] ** 2 for pid, w in coefs.items()
+        )
+
+    roster = solve_roster(players, risk=risk)
+
+    best = max(
+        objective(coefs)
+        for coefs, _, _ in _brute_force_rosters(players, plan, plan.salary_cap)
+    )
+    chosen = {p["id"]: 2 for p in roster["starters"].values()}
+    chosen.update({p["id"]: 1 for p in roster["bench"]})
+    assert objective(chosen) == pytest.approx(best)
+
+
+def test_risk_sign_chooses_between_steady_and_volatile(rule_plan):
+    rule_plan(SMALL_RULES)
+    players = [
+        {"id": 1, "position": "Guard", "salary": 500000, "team": "A", "rating": 20.0},
+        {"id": 2, "position": "Center", "salary": 500000, "team": "B", "rating": 20.0},
+        {"id": 3, "position": "Center", "salary": 500000, "team": "C", "rating": 19.0},
+        {"id": 4, "position": "Forward", "salary": 500000, "team": "D", "rating": 5.0},
+    ]
+    players[0]["rating_std"] = 0.0
+    players[1]["rating_std"] = 10.0
+    players[2]["rating_std"] = 1.0
+    players[3]["rating_std"] = 0.0
+
+    steady = solve_roster(players, risk=0.5)
+    volatile = solve_roster(players, risk=-0.5)
+
+    assert steady["starters"]["C"]["id"] == 3
+    assert volatile["starters"]["C"]["id"] == 2
@@ -0,0 +1,92 @@
+from app.models import DataVersion, PlayerInformation
+from app.services.player_cache import (
+    PlayerDirectory,
+    PlayerRecord,
+    _load_player_directory,
+    player_directory,
+)
+from app.utils.cache import VersionedCache, table_version
+
+
+def _record(row_id, player_id, team_name="Team A", salary=1000):
+    return PlayerRecord(
+        row_id, player_id, f"Player {player_id}", team_name, "Guard", salary
+    )
+
+
+def test_directory_keeps_latest_row_per_player():
+    directory = PlayerDirectory(
+        [
+            _record(1, 10, "Team B", salary=1000),
+            _record(2, 20, "Team A"),
+            _record(3, 10, "Team C", salary=3000),
+        ]
+    )
+
+    assert len(directory) == 2
+    assert directory.get(10).salary == 3000
+    assert directory.get(99) is None
+    assert list(directory.get_many([20, 99, 10])) == [20, 10]
+    assert directory.team_names() == ["Team C", "Team A"]
+    assert directory.by_team("Team B") == []
+    assert directory.get(20).to_dict()["full_name"] == "Player 20"
+    assert directory.memory_bytes() > 0
+
+
+def test_directory_loads_rows_in_id_order(db, add_player):
+    add_player(1, team_name="Team B", salary=1000)
+    add_player(1, team_name="Team C", salary=2000)
+
+    directory = _load_player_directory(db)
+
+    assert directory.get(1).team_name == "Team C"
+    assert directory.get(1).to_dict() == db.get(PlayerInformation, 2).to_dict()
+
+
+def test_table_version_detects_in_place_updates(db, add_player):
+    version = table_version(PlayerInformation)
+    add_player(1)
+    add_player(2)
+    before = version(db)
+
+    db.query(PlayerInformation).filter_by(player_id=1).update({"salary": 5})
+    db.commit()
+    updated = version(db)
+
+    # 行数和最大ID不变，触发器递增的版本号使版本变化
+    assert updated[:2] == before[:2]
+    assert updated != before
+    assert db.get(DataVersion, "player_information").version == updated[2]
+
+    db.query(PlayerInformation).filter_by(player_id=2).delete()
+    db.commit()
+    assert version(db) not in (before, updated)
+
+
+def test_cache_rebuilds_after_salary_update(db, add_player):
+    add_player(1, salary=1000)
+    cache = VersionedCache(
+        "test_player_directory",
+        _load_player_directory,
+        table_version(PlayerInformation),
+        check_interval=0,
+    )
+    first = cache.get(db)
+    assert cache.get(db) is first
+
+    db.query(PlayerInformation).update({"salary": 2000})
+    db.commit()
+
+    assert cache.get(db).get(1).salary == 2000
+    assert first.get(1).salary == 1000
+
+
+def test_shared_directory_invalidate(db, add_player):
+    add_player(1)
+    assert len(player_directory.get(db)) == 1
+
+    add_player(2)
+    # 检查间隔内不查询版本，失效后立即重建
+    assert len(player_directory.get(db)) == 1
+    player_directory.invalidate()
+    assert len(player_directory.get(db)) == 2
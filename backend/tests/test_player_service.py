@@ -0,0 +1,94 @@
+from datetime import date
+
+import pytest
+
+from app.models import PlayerConsistency, PlayerInformation, Team
+from app.services.player_cache import player_directory
+from app.services.player_service import PlayerService, register_teams
+from app.services.stats_service import refresh_player_consistency
+
+
+def test_team_registry_is_read_only(db, add_player):
+    add_player(1, team_name="Lakers")
+
+    assert PlayerService.get_teams(db) == []
+    assert db.query(Team).count() == 0
+
+
+def test_register_teams_keeps_existing_ids(db, add_player):
+    add_player(1, team_name="Lakers")
+    add_player(2, team_name="Celtics")
+    add_player(3, team_name="Lakers")
+
+    assert register_teams(db) == 2
+    assert PlayerService.get_teams(db) == [
+        {"team_id": 1, "team_name": "Lakers"},
+        {"team_id": 2, "team_name": "Celtics"},
+    ]
+
+    # 新球队追加ID，已有球队的ID不变，已没有球员的球队不出现在列表中
+    add_player(4, team_name="Bulls")
+    db.query(PlayerInformation).filter_by(player_id=2).delete()
+    db.commit()
+    assert register_teams(db) == 1
+    assert register_teams(db) == 0
+    # 球员目录每隔几秒才检查一次版本，这里直接使其过期
+    player_directory.invalidate()
+    assert PlayerService.get_teams(db) == [
+        {"team_id": 1, "team_name": "Lakers"},
+        {"team_id": 3, "team_name": "Bulls"},
+    ]
+    assert db.query(Team).count() == 3
+
+
+@pytest.fixture
+def listed_players(db, add_player, add_game):
+    """四名球员，其中一名没有比赛数据"""
+    for player_id, salary, made in (
+        (1, 300, 5),
+        (2, 200, 12),
+        (3, 100, 8),
+        (4, 400, None),
+    ):
+        add_player(player_id, salary=salary, full_name=f"Player {5 - player_id}")
+        if made is not None:
+            add_game(player_id, twoPointersMade=made)
+            add_game(player_id, game_date=date(2025, 1, 11), twoPointersMade=made + 2)
+    refresh_player_consistency(db)
+
+
+@pytest.mark.parametrize(
+    "sort_by, sort_order, expected",
+    [
+        ("rating", "desc", [2, 3, 1, 4]),
+        ("rating", "asc", [1, 3, 2, 4]),
+        ("salary", "desc", [4, 1, 2, 3]),
+        ("name", "asc", [4, 3, 2, 1]),
+    ],
+)
+def test_get_players_sorts_with_stored_season_rating(
+    db, listed_players, sort_by, sort_order, expected
+):
+    result = PlayerService.get_players(
+        db, salary_min=0, sort_by=sort_by, sort_order=sort_order
+    )
+
+    players = result["players"]
+    assert [p["player_id"] for p in players] == expected
+    ratings = {
+        profile.player_id: round(profile.rating_mean, 2)
+        for profile in db.query(PlayerConsistency)
+    }
+    for player in players:
+        assert player["season_rating"] == ratings.get(player["player_id"])
+
+
+def test_get_players_pages_by_rating(db, listed_players):
+    pages = [
+        PlayerService.get_players(db, per_page=3, page=page, sort_by="rating")
+        for page in (1, 2)
+    ]
+
+    assert [p["player_id"] for p in pages[0]["players"]] == [2, 3, 1]
+    assert [p["player_id"] for p in pages[1]["players"]] == [4]
+    assert pages[1]["players"][0]["season_rating"] is None
@@ -0,0 +1,82 @@
+import pytest
+
+from app.core.config import settings
+from app.services.rule_engine import (
+    DEFAULT_RULE_DEFINITIONS,
+    compile_rules,
+    load_rule_definitions,
+)
+
+STARTERS = [
+    {"player_id": 1, "slot": "PG", "position": "Guard", "salary": 10000000},
+    {"player_id": 2, "slot": "SG", "position": "Guard-Forward", "salary": 10000000},
+    {"player_id": 3, "slot": "SF", "position": "Forward", "salary": 10000000},
+    {"player_id": 4, "slot": "PF", "position": "Forward-Center", "salary": 10000000},
+    {"player_id": 5, "slot": "C", "position": "Center", "salary": 10000000},
+]
+BENCH = [
+    {"player_id": pid, "position": "Guard", "salary": 5000000} for pid in range(6, 13)
+]
+
+
+@pytest.fixture
+def plan(monkeypatch):
+    monkeypatch.setattr(settings, "lineup_rules_file", "")
+    return compile_rules(load_rule_definitions())
+
+
+def test_default_plan_parameters(plan):
+    assert plan.starter_slots == ["PG", "SG", "SF", "PF", "C"]
+    assert plan.bench_size == 7
+    assert plan.salary_cap == 187895000
+    assert plan.max_per_team is None
+    assert plan.position_map["Center-Forward"] == ["PF", "C"]
+    assert [rule["type"] for rule in plan.to_dict()] == [
+        definition["type"] for definition in DEFAULT_RULE_DEFINITIONS
+    ]
+
+
+def test_default_plan_accepts_valid_lineup(plan):
+    assert plan.evaluate(STARTERS, BENCH) == (True, "")
+
+
+@pytest.mark.parametrize(
+    "starters, bench, message",
+    [
+        (STARTERS, BENCH[:-1], "球员数量不符合规则"),
+        (STARTERS, BENCH[:-1] + [dict(BENCH[0])], "阵容中存在重复球员"),
+        (
+            [dict(STARTERS[0], slot="C")] + STARTERS[1:4] + [dict(STARTERS[4])],
+            BENCH,
+            "首发球员位置不符合规则",
+        ),
+        (
+            [dict(STARTERS[4], player_id=99, slot="PG")] + STARTERS[1:],
+            BENCH,
+            "首发球员位置不符合规则",
+        ),
+        (
+            [dict(STARTERS[0], salary=200000000)] + STARTERS[1:],
+            BENCH,
+            "阵容薪资超过限制",
+        ),
+    ],
+)
+def test_default_plan_rejects_invalid_lineup(plan, starters, bench, message):
+    assert plan.evaluate(starters, bench) == (False, message)
+
+
+def test_compile_rules_rejects_unknown_type():
+    with pytest.raises(ValueError):
+        compile_rules(DEFAULT_RULE_DEFINITIONS + [{"type": "unknown"}])
+
+
+def test_compile_rules_requires_roster_and_slots():
+    definitions = [d for d in DEFAULT_RULE_DEFINITIONS if d["type"] != "starter_slots"]
+    with pytest.raises(ValueError):
+        compile_rules(definitions)
+
+
+def test_compile_rules_without_salary_cap():
+    definitions = [d for d in DEFAULT_RULE_DEFINITIONS if d["type"] != "salary_cap"]
+    assert compile_rules(definitions).salary_cap is None
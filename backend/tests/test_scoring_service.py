@@ -0,0 +1,221 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.exceptions.base import ValidationError
+from app.models import (
+    DailyOptimalScore,
+    Lineup,
+    LineupPlayer,
+    PlayerGameStats,
+    PlayerMissedValue,
+    User,
+    UserStanding,
+)
+from app.services import scoring_service
+from app.services.scoring_service import ScoringService
+from app.services.stats_service import game_score_expression
+
+GAME_DATE = date(2025, 1, 10)
+
+
+@pytest.fixture
+def lineups(db, add_game, monkeypatch):
+    """两名用户的阵容，alice 另有此前日期累计的积分"""
+    monkeypatch.setattr(scoring_service, "get_best_lineup", lambda date_str: None)
+    db.add_all(
+        [
+            User(id=1, username="alice", password="x"),
+            User(id=2, username="bob", password="x"),
+            UserStanding(user_id=1, lineups_scored=3, total_score=100.0, wins=1),
+        ]
+    )
+    for person_id, made in ((1, 10), (2, 4), (3, 7)):
+        add_game(person_id, game_date=GAME_DATE, twoPointersMade=made)
+
+    for user_id, name, players in (
+        (1, "alice-1", [(1, True), (2, False)]),
+        (2, "bob-1", [(3, True), (1, False)]),
+        (2, "bob-2", [(2, True)]),
+    ):
+        lineup = Lineup(
+            user_id=user_id,
+            name=name,
+            date=GAME_DATE,
+            total_salary=0,
+            created_at=datetime(2025, 1, 9),
+        )
+        lineup.players = [
+            LineupPlayer(
+                player_id=player_id,
+                full_name=f"Player {player_id}",
+                team_name="Team A",
+                position="Guard",
+                salary=0,
+                slot="PG" if is_starting else None,
+                is_starting=is_starting,
+            )
+            for player_id, is_starting in players
+        ]
+        db.add(lineup)
+    db.commit()
+
+
+def _expected_standings(db, previous):
+    """由已计分阵容汇总积分，再加上此前日期的积分"""
+    standings = {user_id: dict(totals) for user_id, totals in previous.items()}
+    for lineup in db.query(Lineup).filter(Lineup.actual_score.isnot(None)):
+        totals = standings.setdefault(
+            lineup.user_id, {"lineups_scored": 0, "total_score": 0.0, "wins": 0}
+        )
+        totals["lineups_scored"] += 1
+        totals["total_score"] += lineup.actual_score
+        totals["wins"] += int(lineup.rank == 1)
+    return standings
+
+
+def _standings(db):
+    db.expire_all()
+    return {
+        row.user_id: {
+            "lineups_scored": row.lineups_scored,
+            "total_score": pytest.approx(row.total_score),
+            "wins": row.wins,
+        }
+        for row in db.query(UserStanding)
+    }
+
+
+def test_rescoring_applies_only_score_changes(db, lineups):
+    previous = {1: {"lineups_scored": 3, "total_score": 100.0, "wins": 1}}
+
+    first = ScoringService.score_date(db, GAME_DATE.isoformat())
+    assert first["lineups_scored"] == 3
+    assert first["users_updated"] == 2
+    assert _standings(db) == _expected_standings(db, previous)
+
+    # 比赛数据修正后重新计分，名次第一的阵容发生变化
+    db.query(PlayerGameStats).filter(PlayerGameStats.personId == 2).update(
+        {PlayerGameStats.twoPointersMade: 30}
+    )
+    db.commit()
+    second = ScoringService.score_date(db, GAME_DATE.isoformat())
+
+    assert second["top_score"] > first["top_score"]
+    assert _standings(db) == _expected_standings(db, previous)
+    ratings = dict(db.query(PlayerGameStats.personId, game_score_expression()))
+    bob_2 = db.query(Lineup).filter(Lineup.name == "bob-2").one()
+    assert bob_2.actual_score == pytest.approx(round(ratings[2] * 2, 2))
+    assert bob_2.rank == 1
+
+
+def test_score_date_without_lineups_returns_same_shape(db, lineups, add_game):
+    add_game(1, game_date=date(2025, 1, 11))
+
+    empty = ScoringService.score_date(db, "2025-01-11")
+    scored = ScoringService.score_date(db, GAME_DATE.isoformat())
+
+    assert set(empty) == set(scored)
+    assert empty["lineups_scored"] == 0
+    assert empty["top_score"] is None
+
+
+def _best_lineup(total_rating, starters, bench=()):
+    """构造 get_best_lineup 形式的最佳阵容，starters 为 {位置: (球员ID, 评分)}"""
+
+    def player(player_id, rating):
+        return {"id": player_id, "name": f"Player {player_id}", "rating": rating}
+
+    return {
+        "total_rating": total_rating,
+        "total_salary": 1000,
+        "starters": {slot: player(*values) for slot, values in starters.items()},
+        "bench": [player(*values) for values in bench],
+    }
+
+
+def test_score_date_upserts_optimal_score(db, lineups, monkeypatch):
+    best = _best_lineup(40.0, {"PG": (1, 20.0)})
+    monkeypatch.setattr(scoring_service, "get_best_lineup", lambda date_str: best)
+
+    assert ScoringService.score_date(db, GAME_DATE.isoformat())["optimal_score"] == 40.0
+
+    best = _best_lineup(45.556, {"PG": (1, 22.0)})
+    result = ScoringService.score_date(db, GAME_DATE.isoformat())
+
+    assert result["optimal_score"] == 45.56
+    stored = db.query(DailyOptimalScore).one()
+    assert stored.date == GAME_DATE
+    assert stored.optimal_score == 45.56
+
+
+@pytest.fixture
+def best_lineup(monkeypatch):
+    """最佳阵容：首发球员1、3，替补球员2和无人选择的球员9"""
+    best = _best_lineup(
+        100.0, {"PG": (1, 20.0), "SG": (3, 12.0)}, bench=[(2, 5.0), (9, 4.0)]
+    )
+    monkeypatch.setattr(scoring_service, "get_best_lineup", lambda date_str: best)
+    return best
+
+
+def test_score_date_writes_gaps_and_missed_values(db, lineups, best_lineup):
+    ScoringService.score_date(db, GAME_DATE.isoformat())
+
+    for lineup in db.query(Lineup):
+        assert lineup.gap_to_optimal == pytest.approx(100.0 - lineup.actual_score)
+
+    # 3个阵容中：球员1和2各被选2次，球员3被选1次，球员9无人选择
+    missed = ScoringService.get_most_missed_players(db)
+    assert [
+        (row["player_id"], row["lineups_missed"], row["missed_value"]) for row in missed
+    ] == [(3, 2, 48.0), (1, 1, 40.0), (9, 3, 12.0), (2, 1, 5.0)]
+    assert missed[0]["optimal_days"] == 1
+    assert missed[0]["optimal_value"] == 24.0
+
+    # 重新计分时替换当日的错失价值
+    ScoringService.score_date(db, GAME_DATE.isoformat())
+    assert db.query(PlayerMissedValue).count() == 4
+
+
+def test_score_date_without_optimal_lineup_clears_gaps(
+    db, lineups, best_lineup, monkeypatch
+):
+    ScoringService.score_date(db, GAME_DATE.isoformat())
+    monkeypatch.setattr(scoring_service, "get_best_lineup", lambda date_str: None)
+
+    ScoringService.score_date(db, GAME_DATE.isoformat())
+
+    db.expire_all()
+    assert all(lineup.gap_to_optimal is None for lineup in db.query(Lineup))
+    assert ScoringService.get_most_missed_players(db) == []
+
+
+def test_most_missed_players_date_range(db, lineups, best_lineup):
+    ScoringService.score_date(db, GAME_DATE.isoformat())
+
+    assert ScoringService.get_most_missed_players(db, date_to="2025-01-09") == []
+    assert len(ScoringService.get_most_missed_players(db, limit=2)) == 2
+    assert len(ScoringService.get_most_missed_players(db, date_from="2025-01-10")) == 4
+    with pytest.raises(ValidationError):
+        ScoringService.get_most_missed_players(db, date_from="10/01/2025")
+
+
+def test_run_nightly_scores_pending_dates_once(db, lineups, best_lineup):
+    # 没有比赛数据的日期被跳过
+    db.add(
+        Lineup(
+            user_id=1,
+            name="no-games",
+            date=date(2025, 1, 12),
+            total_salary=0,
+            created_at=datetime(2025, 1, 11),
+        )
+    )
+    db.commit()
+
+    results = ScoringService.run_nightly(db)
+
+    assert [result["date"] for result in results] == [GAME_DATE.isoformat()]
+    assert results[0]["lineups_scored"] == 3
+    assert ScoringService.run_nightly(db) == []
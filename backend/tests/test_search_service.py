@@ -0,0 +1,72 @@
+from app.services.player_cache import player_directory
+from app.services.search_service import (
+    PlayerSearchIndex,
+    SearchService,
+    player_search_index,
+    normalize_name,
+    trigrams,
+)
+
+NAMES = [
+    "Nikola Jokić",
+    "Nikola Vučević",
+    "Shai Gilgeous-Alexander",
+    "LeBron James",
+    "James Harden",
+    "Jalen Brunson",
+]
+
+
+def _search(query, limit=10):
+    index = PlayerSearchIndex([{"full_name": name} for name in NAMES])
+    return [player["full_name"] for player in index.search(query, limit)]
+
+
+def test_normalize_name_folds_accents_case_and_punctuation():
+    assert normalize_name("Nikola Jokić") == "nikola jokic"
+    assert normalize_name("Shai Gilgeous-Alexander") == "shai gilgeous alexander"
+    # NFKD 同时展开全角字符
+    assert normalize_name("  ＬｅＢｒｏｎ   JAMES ") == "lebron james"
+    assert normalize_name(None) == ""
+
+
+def test_trigrams():
+    assert trigrams("jokic") == {"jok", "oki", "kic"}
+    assert trigrams("jo") == set()
+
+
+def test_search_ignores_accents():
+    assert _search("jokic") == ["Nikola Jokić"]
+    assert _search("VUČEVIĆ") == ["Nikola Vučević"]
+
+
+def test_search_matches_substrings_and_word_prefixes():
+    # 长查询词可匹配单词中间的子串，短查询词只匹配单词前缀
+    assert _search("okic") == ["Nikola Jokić"]
+    assert _search("ok") == []
+    assert _search("ja") == ["James Harden", "Jalen Brunson", "LeBron James"]
+    assert _search("alexander shai") == ["Shai Gilgeous-Alexander"]
+    assert _search("nikola xyz") == []
+    assert _search("-") == []
+
+
+def test_search_ranks_exact_and_prefix_matches_first():
+    # 完全匹配优先，其次为整名前缀，再按姓名长度
+    assert _search("james") == ["James Harden", "LeBron James"]
+    assert _search("lebron james") == ["LeBron James"]
+    assert _search("nikola") == ["Nikola Jokić", "Nikola Vučević"]
+    assert _search("nikola", limit=1) == ["Nikola Jokić"]
+
+
+def test_search_players_rebuilds_when_players_change(db, add_player):
+    add_player(1, full_name="Nikola Jokić")
+
+    assert [p["player_id"] for p in SearchService.search_players(db, "jok")] == [1]
+
+    add_player(2, full_name="Nikola Jović")
+    # 两层缓存都按间隔检查数据版本，测试中直接失效
+    player_directory.invalidate()
+    player_search_index.invalidate()
+    results = SearchService.search_players(db, "nikola jo")
+
+    assert [p["player_id"] for p in results] == [1, 2]
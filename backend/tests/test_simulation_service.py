@@ -0,0 +1,121 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from app.exceptions.base import ValidationError
+from app.models import Lineup, LineupPlayer, User
+from app.services.simulation_service import (
+    SimulationService,
+    load_rating_samples,
+    sample_player_scores,
+)
+
+GAME_DATE = date(2025, 1, 10)
+
+
+@pytest.fixture
+def history(db, add_game):
+    """球员1两场比赛、球员2一场，GAME_DATE 当天的比赛不属于历史数据"""
+    add_game(1, game_date=date(2025, 1, 1), twoPointersMade=10, twoPointersAttempted=10)
+    add_game(1, game_date=date(2025, 1, 2), twoPointersMade=20, twoPointersAttempted=20)
+    add_game(2, game_date=date(2025, 1, 3), twoPointersMade=5, twoPointersAttempted=5)
+    add_game(2, game_date=GAME_DATE, twoPointersMade=50, twoPointersAttempted=50)
+    return load_rating_samples(db, [1, 2], GAME_DATE)
+
+
+def test_load_rating_samples_uses_games_before_date(history):
+    # 未赢球的比赛评分扣2分
+    assert sorted(history[1].tolist()) == [8.0, 18.0]
+    assert history[2].tolist() == [3.0]
+
+
+def test_sample_player_scores_draws_from_history(history):
+    rng = np.random.default_rng(0)
+
+    scores = sample_player_scores(history, [1, 2, 99], 1000, rng)
+
+    assert scores.shape == (3, 1000)
+    assert set(scores[0].tolist()) == {8.0, 18.0}
+    assert set(scores[1].tolist()) == {3.0}
+    assert not scores[2].any()
+
+
+def test_simulate_lineup_against_opponent(db, history):
+    result = SimulationService.simulate_lineup(
+        db,
+        [1],
+        [99],
+        opponent=([2], [1]),
+        date_str=GAME_DATE.isoformat(),
+        trials=2000,
+        seed=1,
+    )
+
+    # 阵容得分为 2*球员1，对手为 2*3 + 球员1。同一次试验中球员1的表现相同，
+    # 因此阵容总是获胜；若分别抽样，球员1为8分时会输给18分的对手
+    assert result["lineup"]["min"] == 16.0
+    assert result["lineup"]["max"] == 36.0
+    assert result["opponent"]["min"] == 14.0
+    assert result["opponent"]["max"] == 24.0
+    assert result["win_probability"] == 1.0
+    assert result["missing_player_ids"] == [99]
+
+
+def test_simulate_lineup_against_itself_is_a_coin_flip(db, history):
+    result = SimulationService.simulate_lineup(
+        db, [1], [2], opponent=([1], [2]), trials=500, seed=3
+    )
+    assert result["win_probability"] == 0.5
+
+
+def test_simulate_lineup_requires_players(db):
+    with pytest.raises(ValidationError):
+        SimulationService.simulate_lineup(db, [], [])
+
+
+def test_simulate_lineups_by_date(db, history):
+    db.add_all(
+        [
+            User(id=1, username="alice", password="x"),
+            User(id=2, username="bob", password="x"),
+        ]
+    )
+    for user_id, starters in ((1, [1]), (2, [2]), (2, [1])):
+        lineup = Lineup(
+            user_id=user_id,
+            name=f"lineup-{user_id}",
+            date=GAME_DATE,
+            total_salary=0,
+            created_at=datetime(2025, 1, 9),
+        )
+        lineup.players = [
+            LineupPlayer(
+                player_id=player_id,
+                full_name=f"Player {player_id}",
+                team_name="Team A",
+                position="Guard",
+                salary=0,
+                slot="PG",
+                is_starting=True,
+            )
+            for player_id in starters
+        ]
+        db.add(lineup)
+    db.commit()
+
+    results = SimulationService.simulate_lineups_by_date(
+        db, GAME_DATE.isoformat(), current_user_id=1, trials=3000, seed=2
+    )
+
+    assert [item["user_id"] for item in results] == [1, 2, 2]
+    assert all(item["can_view"] for item in results)
+    # 两个相同的阵容平分胜场，球员2的阵容永远最低
+    probabilities = [item["win_probability"] for item in results]
+    assert probabilities == [0.5, 0.0, 0.5]
+    assert results[1]["simulation"]["mean"] == 6.0
+
+
+def test_simulate_lineups_by_date_requires_date(db):
+    with pytest.raises(ValidationError):
+        SimulationService.simulate_lineups_by_date(db, "", current_user_id=1)
@@ -0,0 +1,443 @@
+import random
+from datetime import date
+
+import numpy as np
+import pytest
+from sqlalchemy import func
+
+from app.exceptions.base import ValidationError
+from app.models import PlayerGameStats
+from app.services.stats_service import (
+    MAX_BATCH_PLAYERS,
+    StatsService,
+    _decode_game_log_cursor,
+    _query_season_totals,
+    calculate_player_score,
+    compute_rating_consistency,
+    game_score_expression,
+    get_player_rating_moments,
+    refresh_player_consistency,
+    salary_frontier,
+)
+
+
+def _brute_force_frontier(players):
+    results = {}
+    for player in players:
+        salary, rating = player["salary"], player["rating"]
+        dominated = any(
+            other["salary"] <= salary
+            and other["rating"] >= rating
+            and (other["salary"] < salary or other["rating"] > rating)
+            for other in players
+        )
+        best = max(p["rating"] for p in players if p["salary"] <= salary)
+        cheapest = min(p["salary"] for p in players if p["rating"] >= rating)
+        results[player["id"]] = (not dominated, best - rating, salary - cheapest)
+    return results
+
+
+def test_salary_frontier_matches_brute_force():
+    rng = random.Random(7)
+    players = [
+        {
+            "id": i,
+            "salary": rng.randint(1, 30) * 100000,
+            "rating": float(rng.randint(0, 40)),
+        }
+        for i in range(300)
+    ]
+
+    results = salary_frontier(players)
+
+    assert [p["salary"] for p in results] == sorted(p["salary"] for p in players)
+    expected = _brute_force_frontier(players)
+    for result in results:
+        assert (
+            result["on_frontier"],
+            result["rating_gap"],
+            result["salary_excess"],
+        ) == expected[result["id"]]
+
+
+def test_salary_frontier_keeps_identical_players_on_frontier():
+    players = [
+        {"id": 1, "salary": 100, "rating": 10.0},
+        {"id": 2, "salary": 100, "rating": 10.0},
+        {"id": 3, "salary": 200, "rating": 8.0},
+    ]
+
+    results = {p["id"]: p for p in salary_frontier(players)}
+
+    assert results[1]["on_frontier"] and results[2]["on_frontier"]
+    assert not results[3]["on_frontier"]
+    assert results[3]["rating_gap"] == 2.0
+    assert results[3]["salary_excess"] == 100
+
+
+def test_salary_frontier_empty():
+    assert salary_frontier([]) == []
+
+
+def test_compute_rating_consistency_matches_numpy(db, add_game):
+    rng = random.Random(3)
+    for person_id, games in ((11, 1), (12, 7), (13, 25)):
+        for day in range(games):
+            add_game(
+                person_id,
+                game_date=date(2025, 1, 1 + day),
+                twoPointersMade=rng.randint(0, 12),
+                twoPointersAttempted=15,
+                threePointersMade=rng.randint(0, 5),
+                threePointersAttempted=6,
+                assists=rng.randint(0, 10),
+                reboundsDefensive=rng.randint(0, 10),
+                turnovers=rng.randint(0, 5),
+                minutes=rng.randint(5, 40),
+            )
+
+    ratings = {}
+    for person_id, rating in db.query(
+        PlayerGameStats.personId, game_score_expression()
+    ):
+        ratings.setdefault(person_id, []).append(rating)
+
+    profiles = {p["player_id"]: p for p in compute_rating_consistency(db)}
+
+    assert set(profiles) == set(ratings)
+    for person_id, values in ratings.items():
+        values = np.array(values)
+        profile = profiles[person_id]
+        assert profile["games"] == len(values)
+        assert profile["rating_mean"] == pytest.approx(values.mean())
+        expected_std = values.std(ddof=1) if len(values) > 1 else 0.0
+        assert profile["rating_std"] == pytest.approx(expected_std)
+        assert profile["rating_p10"] == pytest.approx(np.percentile(values, 10))
+        assert profile["rating_p90"] == pytest.approx(np.percentile(values, 90))
+        assert 0 <= profile["boom_rate"] <= 1
+        assert 0 <= profile["bust_rate"] <= 1
+
+
+def test_compute_rating_consistency_without_games(db):
+    assert compute_rating_consistency(db) == []
+
+
+def test_decode_game_log_cursor():
+    assert _decode_game_log_cursor("2025-01-10_42") == (date(2025, 1, 10), 42)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["", "2025-01-10", "2025-01-10_", "2025-13-01_1", "2025-01-10_x", "a_b_c"],
+)
+def test_decode_game_log_cursor_rejects_invalid(cursor):
+    with pytest.raises(ValidationError):
+        _decode_game_log_cursor(cursor)
+
+
+@pytest.fixture
+def game_log(db, add_game):
+    # 同一天两场比赛，用于检验游标按 (日期, ID) 排序
+    days = [1, 2, 2, 3, 5, 5, 8, 9]
+    for points, day in enumerate(days):
+        add_game(21, game_date=date(2025, 1, day), twoPointersMade=points)
+    add_game(22, game_date=date(2025, 1, 2), twoPointersMade=20)
+    return days
+
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_game_log_pages_cover_every_game_once(db, game_log, sort_order):
+    everything = StatsService.get_player_game_log(
+        db, 21, limit=200, sort_order=sort_order
+    )
+    assert everything["next_cursor"] is None
+    assert len(everything["games"]) == len(game_log)
+
+    games, cursor, pages = [], None, 0
+    while True:
+        page = StatsService.get_player_game_log(
+            db, 21, limit=3, cursor=cursor, sort_order=sort_order
+        )
+        games.extend(page["games"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert games == everything["games"]
+    dates = [game["game_date"] for game in games]
+    assert dates == sorted(dates, reverse=sort_order == "desc")
+
+
+def test_game_log_date_range_and_fields(db, game_log):
+    page = StatsService.get_player_game_log(
+        db,
+        21,
+        date_from="2025-01-02",
+        date_to="2025-01-05",
+        fields=["twoPointersMade"],
+        sort_order="asc",
+    )
+
+    assert page["games"] == [
+        {"game_date": "2025-01-02", "twoPointersMade": 1},
+        {"game_date": "2025-01-02", "twoPointersMade": 2},
+        {"game_date": "2025-01-03", "twoPointersMade": 3},
+        {"game_date": "2025-01-05", "twoPointersMade": 4},
+        {"game_date": "2025-01-05", "twoPointersMade": 5},
+    ]
+
+
+def test_game_log_rejects_unknown_fields(db, game_log):
+    with pytest.raises(ValidationError):
+        StatsService.get_player_game_log(db, 21, fields=["secret"])
+
+
+@pytest.fixture
+def leaderboard_games(db, add_player, add_game):
+    """三名球员的比赛，球员33没有基础信息"""
+    rng = random.Random(5)
+    games = {}
+    for person_id, team, count in (
+        (31, "Team A", 4),
+        (32, "Team B", 3),
+        (33, "Team C", 2),
+    ):
+        if person_id != 33:
+            add_player(person_id, team_name=team, salary=person_id * 100000)
+        for day in range(count):
+            stats = {
+                "threePointersMade": rng.randint(0, 4),
+                "threePointersAttempted": 6,
+                "twoPointersMade": rng.randint(0, 8),
+                "twoPointersAttempted": rng.choice([0, 10]),
+                "freeThrowsMade": rng.randint(0, 3),
+                "freeThrowsAttempted": 4,
+                "assists": rng.randint(0, 9),
+                "turnovers": rng.randint(0, 4),
+                "minutes": rng.randint(10, 38),
+            }
+            stats["twoPointersMade"] *= stats["twoPointersAttempted"] > 0
+            add_game(
+                person_id, game_date=date(2025, 1, 1 + day), teamName=team, **stats
+            )
+            games.setdefault(person_id, []).append(stats)
+    refresh_player_consistency(db)
+    return games
+
+
+def _reference_leaderboard(games, per):
+    expected = {}
+    for person_id, rows in games.items():
+        totals = {key: sum(row[key] for row in rows) for key in rows[0]}
+        units = len(rows) if per == "game" else totals["minutes"] / 36
+        made = {
+            kind: totals[f"{kind}Made"] / units
+            for kind in ("threePointers", "twoPointers", "freeThrows")
+        }
+        attempted = {
+            kind: totals[f"{kind}Attempted"] / units
+            for kind in ("threePointers", "twoPointers", "freeThrows")
+        }
+        minutes = totals["minutes"] / len(rows)
+        expected[person_id] = {
+            "points": (
+                totals["threePointersMade"] * 3
+                + totals["twoPointersMade"] * 2
+                + totals["freeThrowsMade"]
+            )
+            / units,
+            "two_pointers_percentage": (
+                made["twoPointers"] / attempted["twoPointers"] * 100
+                if attempted["twoPointers"] > 0
+                else 0
+            ),
+            "rating": calculate_player_score(
+                three_pointers=made["threePointers"],
+                two_pointers=made["twoPointers"],
+                free_throws=made["freeThrows"],
+                offensive_rebounds=0,
+                defensive_rebounds=0,
+                assists=totals["assists"] / units,
+                steals=0,
+                blocks=0,
+                field_goals_attempted=attempted["threePointers"]
+                + attempted["twoPointers"],
+                field_goals_made=made["threePointers"] + made["twoPointers"],
+                free_throws_attempted=attempted["freeThrows"],
+                turnovers=totals["turnovers"] / units,
+                personal_fouls=0,
+                team_won=True,
+                minutes_played=minutes if per == "game" else 36,
+            ),
+            "minutes": minutes,
+        }
+    return expected
+
+
+@pytest.mark.parametrize("per", ["game", "36min"])
+@pytest.mark.parametrize("sort_by", ["rating", "points", "salary", "rating_std"])
+@pytest.mark.parametrize("sort_order", ["desc", "asc"])
+def test_leaderboard_matches_python_reference(
+    db, leaderboard_games, per, sort_by, sort_order
+):
+    leaderboard = StatsService.get_player_average_stats_leaderboard(
+        db, sort_order=sort_order, sort_by=sort_by, per=per
+    )
+
+    expected = _reference_leaderboard(leaderboard_games, per)
+    assert {row["player_id"] for row in leaderboard} == set(expected)
+    for row in leaderboard:
+        for field, value in expected[row["player_id"]].items():
+            assert row[field] == pytest.approx(value)
+    values = [row[sort_by] for row in leaderboard]
+    assert values == sorted(values, reverse=sort_order == "desc")
+
+    unknown = next(row for row in leaderboard if row["player_id"] == 33)
+    assert unknown["player_name"] == "Player 33"
+    assert unknown["salary"] == 0
+    assert unknown["position"] == ""
+
+
+def test_leaderboard_filters_teams_and_minimums(db, leaderboard_games):
+    filtered = StatsService.get_player_average_stats_leaderboard(
+        db, teams=["Team A", "Team C"], min_games=3
+    )
+    assert [row["player_id"] for row in filtered] == [31]
+    assert filtered[0]["games_played"] == 4
+
+    # 未知排序字段按评分排序
+    by_rating = StatsService.get_player_average_stats_leaderboard(db, sort_by="x")
+    ratings = [row["rating"] for row in by_rating]
+    assert ratings == sorted(ratings, reverse=True)
+
+
+def test_player_rating_moments_match_numpy(db, add_game):
+    rng = random.Random(9)
+    for person_id, games in ((41, 1), (42, 6)):
+        for day in range(games):
+            add_game(
+                person_id,
+                game_date=date(2025, 1, 1 + day),
+                twoPointersMade=rng.randint(0, 12),
+                twoPointersAttempted=12,
+                assists=rng.randint(0, 8),
+            )
+
+    before = date(2025, 1, 5)
+    moments = get_player_rating_moments(db, before=before)
+
+    ratings = {}
+    for person_id, rating in db.query(
+        PlayerGameStats.personId, game_score_expression()
+    ).filter(PlayerGameStats.game_date < before):
+        ratings.setdefault(person_id, []).append(rating)
+    assert set(moments) == set(ratings)
+    for person_id, values in ratings.items():
+        games, mean, std = moments[person_id]
+        assert games == len(values)
+        assert mean == pytest.approx(np.mean(values))
+        expected_std = np.std(values, ddof=1) if len(values) > 1 else 0.0
+        assert std == pytest.approx(expected_std)
+
+    assert set(get_player_rating_moments(db, player_ids=[41])) == {41}
+
+
+def test_players_average_stats_batch_matches_single_player(db, leaderboard_games):
+    result = StatsService.get_players_average_stats(db, [32, 99, 33, 31, 32])
+
+    assert [player["player_id"] for player in result["players"]] == [32, 33, 31]
+    assert result["missing_player_ids"] == [99]
+
+    ratings = dict(
+        db.query(PlayerGameStats.personId, func.avg(game_score_expression())).group_by(
+            PlayerGameStats.personId
+        )
+    )
+    for player in result["players"]:
+        player_id = player["player_id"]
+        single = StatsService.get_player_average_stats(db, player_id)
+        assert {
+            key: value
+            for key, value in player.items()
+            if key not in ("player", "rating")
+        } == single
+        assert player["rating"] == pytest.approx(round(ratings[player_id], 2))
+        rows = leaderboard_games[player_id]
+        assert player["games_played"] == len(rows)
+        assert player["assists_per_game"] == round(
+            sum(row["assists"] for row in rows) / len(rows), 1
+        )
+
+    players = {player["player_id"]: player for player in result["players"]}
+    assert players[31]["player"]["team_name"] == "Team A"
+    assert players[33]["player"] is None
+
+
+@pytest.mark.parametrize("player_ids", [[], list(range(MAX_BATCH_PLAYERS + 1))])
+def test_players_average_stats_rejects_invalid_batch(db, player_ids):
+    with pytest.raises(ValidationError):
+        StatsService.get_players_average_stats(db, player_ids)
+
+
+def test_players_average_stats_window(db, leaderboard_games):
+    result = StatsService.get_players_average_stats(db, [31, 32], window=2)
+
+    for player in result["players"]:
+        assert player["games_played"] == 2
+        assert player == {
+            **StatsService.get_player_average_stats(db, player["player_id"], window=2),
+            "player": player["player"],
+            "rating": player["rating"],
+        }
+
+
+@pytest.mark.parametrize(
+    "window, date_from, date_to, days",
+    [
+        (2, None, None, slice(-2, None)),
+        (None, "2025-01-02", "2025-01-03", slice(1, 3)),
+        (1, None, "2025-01-02", slice(1, 2)),
+    ],
+)
+def test_leaderboard_recent_form(
+    db, leaderboard_games, window, date_from, date_to, days
+):
+    leaderboard = StatsService.get_player_average_stats_leaderboard(
+        db, window=window, date_from=date_from, date_to=date_to
+    )
+
+    games = {
+        person_id: rows[days]
+        for person_id, rows in leaderboard_games.items()
+        if rows[days]
+    }
+    expected = _reference_leaderboard(games, "game")
+    assert {row["player_id"] for row in leaderboard} == set(expected)
+    for row in leaderboard:
+        assert row["games_played"] == len(games[row["player_id"]])
+        for field, value in expected[row["player_id"]].items():
+            assert row[field] == pytest.approx(value)
+
+
+def test_season_totals_use_latest_team_in_range(db, add_game):
+    # 按比赛日期而不是写入顺序判断最近一场
+    add_game(40, game_date=date(2025, 1, 3), teamName="Team Y", assists=5)
+    add_game(40, game_date=date(2025, 1, 1), teamName="Team X", assists=1)
+    add_game(40, game_date=date(2025, 1, 2), teamName="Team X", assists=2)
+
+    latest = _query_season_totals(db, [40], window=2)[40]
+    assert (latest.team_name, latest.games, latest.assists) == ("Team Y", 2, 7)
+
+    earlier = _query_season_totals(db, [40], end=date(2025, 1, 2))[40]
+    assert (earlier.team_name, earlier.games, earlier.assists) == ("Team X", 2, 3)
+
+    assert _query_season_totals(db, [40], start=date(2025, 1, 4)) == {}
+
+
+def test_average_stats_reject_invalid_dates(db, leaderboard_games):
+    with pytest.raises(ValidationError):
+        StatsService.get_player_average_stats(db, 31, date_from="2025/01/01")
+    with pytest.raises(ValidationError):
+        StatsService.get_player_average_stats_leaderboard(db, date_to="yesterday")
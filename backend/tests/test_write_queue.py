@@ -0,0 +1,99 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models import Lineup, LineupPlayer
+from app.services.write_queue import LineupWriteQueue
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """写入线程使用独立连接，因此使用临时文件数据库"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def write_queue(session_factory):
+    # 较长的等待时间使连续提交的阵容合并为一批
+    writer = LineupWriteQueue(session_factory, max_batch=50, max_wait_ms=200)
+    writer.start()
+    yield writer
+    writer.stop()
+
+
+def _prepared(name, player_ids=(1, 2)):
+    lineup_row = {
+        "user_id": 1,
+        "name": name,
+        "date": date(2099, 1, 1),
+        "total_salary": 0,
+        "created_at": datetime(2098, 12, 31),
+    }
+    player_rows = [
+        {
+            "player_id": player_id,
+            "full_name": f"Player {player_id}",
+            "team_name": "Team A",
+            "position": "Guard",
+            "salary": 0,
+            "slot": None,
+            "is_starting": False,
+        }
+        for player_id in player_ids
+    ]
+    return lineup_row, player_rows
+
+
+def test_concurrent_submissions_share_one_commit(write_queue, session_factory):
+    futures = [write_queue.submit(_prepared(f"lineup-{i}")) for i in range(20)]
+    results = [future.result(timeout=5) for future in futures]
+
+    assert [result["name"] for result in results] == [f"lineup-{i}" for i in range(20)]
+    assert len({result["id"] for result in results}) == 20
+    stats = write_queue.stats()
+    assert stats["lineups"] == 20
+    assert stats["batches"] < 20
+
+    with session_factory() as db:
+        assert db.query(Lineup).count() == 20
+        assert db.query(LineupPlayer).count() == 40
+        stored = db.get(Lineup, results[3]["id"])
+        assert stored.to_dict() == results[3]
+
+
+def test_failed_batch_is_retried_one_by_one(write_queue, session_factory):
+    futures = [
+        write_queue.submit(_prepared("ok-1")),
+        write_queue.submit(_prepared(None)),
+        write_queue.submit(_prepared("ok-2")),
+    ]
+
+    assert futures[0].result(timeout=5)["name"] == "ok-1"
+    assert futures[2].result(timeout=5)["name"] == "ok-2"
+    with pytest.raises(IntegrityError):
+        futures[1].result(timeout=5)
+    with session_factory() as db:
+        assert sorted(name for name, in db.query(Lineup.name)) == ["ok-1", "ok-2"]
+
+
+def test_stop_writes_pending_lineups(session_factory):
+    writer = LineupWriteQueue(session_factory, max_batch=3, max_wait_ms=50)
+    writer.start()
+    futures = [writer.submit(_prepared(f"lineup-{i}")) for i in range(10)]
+    writer.stop()
+
+    assert not writer.running
+    assert all(future.done() for future in futures)
+    assert len({future.result()["id"] for future in futures}) == 10
+
+
+def test_submit_requires_running_queue(session_factory):
+    with pytest.raises(RuntimeError):
+        LineupWriteQueue(session_factory).submit(_prepared("idle"))